@@ -0,0 +1,212 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+# Recorded responses, named <provider>.json (or rss.xml), replace the synthetic ones when present
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+PROVIDER_HOSTS = {
+    "newsapi.org": "newsapi",
+    "gnews.io": "gnews",
+    "api.mediastack.com": "mediastack",
+    "api.currentsapi.services": "currents",
+    "content.guardianapis.com": "guardian",
+    "api.nytimes.com": "nytimes",
+    "serpapi.com": "serpapi",
+    "newsdata.io": "newsdata_io",
+    "api.worldnewsapi.com": "worldnews",
+}
+
+# Every host not listed above is served as an RSS feed
+RSS = "rss"
+
+BASE_TIME = datetime(2025, 10, 6, 12, 0, tzinfo=timezone.utc)
+
+# Words the synthetic headlines are drawn from; a shared pool makes providers overlap like real ones do
+_WORDS = (
+    "india parliament budget monsoon cricket election delhi mumbai economy rupee market reform court "
+    "startup satellite isro farmers trade summit border policy health vaccine railway metro climate "
+    "minister diaspora visa festival energy solar infrastructure bank inflation exports technology"
+).split()
+
+
+def provider_for_host(host: str) -> str:
+    return PROVIDER_HOSTS.get(host, RSS)
+
+
+def _headlines(provider: str, count: int, seed: int, shared_ratio: float) -> List[str]:
+    """Headlines for one provider; about shared_ratio of them also appear at other providers"""
+    shared = random.Random(seed)
+    own = random.Random(f"{seed}-{provider}")
+    titles = []
+    for index in range(count):
+        if own.random() < shared_ratio:
+            rng, label = shared, "Story"
+        else:
+            rng, label = own, provider.title()
+        words = rng.sample(_WORDS, 6)
+        titles.append(f"{label} {rng.randrange(500)}: {' '.join(words).capitalize()}")
+    return titles
+
+
+def _items(provider: str, count: int, seed: int, shared_ratio: float) -> List[dict]:
+    items = []
+    for index, title in enumerate(_headlines(provider, count, seed, shared_ratio)):
+        slug = "-".join(title.lower().replace(":", "").split()[:8])
+        items.append({
+            "title": title,
+            "description": f"{title}. " + " ".join(_WORDS[index % 7:index % 7 + 20]),
+            "url": f"https://example.com/{provider}/{slug}",
+            "published": BASE_TIME - timedelta(minutes=7 * index),
+            "source": f"{provider.title()} Wire",
+        })
+    return items
+
+
+# How each provider writes its timestamps
+_ISO_Z = "%Y-%m-%dT%H:%M:%SZ"
+_DATE_FORMATS: Dict[str, Callable[[datetime], str]] = {
+    "newsapi": lambda dt: dt.strftime(_ISO_Z),
+    "gnews": lambda dt: dt.strftime(_ISO_Z),
+    "mediastack": lambda dt: dt.isoformat(),
+    "currents": lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S %z"),
+    "guardian": lambda dt: dt.strftime(_ISO_Z),
+    "nytimes": lambda dt: dt.astimezone(timezone(timedelta(hours=-4))).isoformat(),
+    "serpapi": lambda dt: dt.strftime("%m/%d/%Y, %I:%M %p, +0000 UTC"),
+    "newsdata_io": lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"),
+    "worldnews": lambda dt: dt.strftime("%Y-%m-%d %H:%M:%S"),
+    RSS: format_datetime,
+}
+
+
+def _date(provider: str, item: dict) -> str:
+    return _DATE_FORMATS[provider](item["published"])
+
+
+# One renderer per provider, in that provider's response shape
+
+def _newsapi(items):
+    return {"status": "ok", "totalResults": len(items), "articles": [{
+        "title": i["title"], "description": i["description"], "url": i["url"],
+        "publishedAt": _date("newsapi", i),
+        "source": {"name": i["source"]}, "urlToImage": None,
+    } for i in items]}
+
+
+def _gnews(items):
+    return {"totalArticles": len(items), "articles": [{
+        "title": i["title"], "description": i["description"], "url": i["url"],
+        "publishedAt": _date("gnews", i),
+        "source": {"name": i["source"]}, "image": None,
+    } for i in items]}
+
+
+def _mediastack(items):
+    return {"data": [{
+        "title": i["title"], "description": i["description"], "url": i["url"],
+        "published_at": _date("mediastack", i), "source": i["source"], "country": "in",
+    } for i in items]}
+
+
+def _currents(items):
+    return {"status": "ok", "news": [{
+        "title": i["title"], "description": i["description"], "url": i["url"],
+        "published": _date("currents", i), "domain": "example.com",
+        "country": "IN",
+    } for i in items]}
+
+
+def _guardian(items):
+    return {"response": {"status": "ok", "results": [{
+        "webTitle": i["title"], "webUrl": i["url"],
+        "webPublicationDate": _date("guardian", i),
+        "fields": {"headline": i["description"]},
+    } for i in items]}}
+
+
+def _nytimes(items):
+    return {"status": "OK", "results": [{
+        "title": i["title"], "abstract": i["description"], "url": i["url"],
+        "published_date": _date("nytimes", i),
+    } for i in items]}
+
+
+def _serpapi(items):
+    return {"news_results": [{
+        "title": i["title"], "snippet": i["description"], "link": i["url"],
+        "date": _date("serpapi", i), "source": {"name": i["source"]},
+    } for i in items]}
+
+
+def _newsdata_io(items):
+    return {"status": "success", "results": [{
+        "title": i["title"], "description": i["description"], "link": i["url"],
+        "pubDate": _date("newsdata_io", i), "source_id": "examplewire",
+    } for i in items]}
+
+
+def _worldnews(items):
+    return {"news": [{
+        "title": i["title"], "summary": i["description"], "url": i["url"],
+        "publish_date": _date("worldnews", i), "source": i["source"],
+    } for i in items]}
+
+
+def _rss(items):
+    entries = "".join(
+        f"<item><title>{escape(i['title'])}</title><link>{escape(i['url'])}</link>"
+        f"<description>&lt;p&gt;{escape(i['description'])}&lt;/p&gt;</description>"
+        f"<pubDate>{_date(RSS, i)}</pubDate></item>"
+        for i in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench</title>{entries}</channel></rss>'
+
+
+_RENDERERS: Dict[str, Callable[[List[dict]], object]] = {
+    "newsapi": _newsapi,
+    "gnews": _gnews,
+    "mediastack": _mediastack,
+    "currents": _currents,
+    "guardian": _guardian,
+    "nytimes": _nytimes,
+    "serpapi": _serpapi,
+    "newsdata_io": _newsdata_io,
+    "worldnews": _worldnews,
+    RSS: _rss,
+}
+
+
+def recorded_body(provider: str) -> Optional[bytes]:
+    path = FIXTURES_DIR / (f"{RSS}.xml" if provider == RSS else f"{provider}.json")
+    return path.read_bytes() if path.exists() else None
+
+
+def response_body(provider: str, count: int = 50, seed: int = 7, shared_ratio: float = 0.3) -> bytes:
+    """Response body for a provider: the recorded fixture if there is one, synthetic otherwise"""
+    recorded = recorded_body(provider)
+    if recorded is not None:
+        return recorded
+    rendered = _RENDERERS[provider](_items(provider, count, seed, shared_ratio))
+    return rendered.encode() if isinstance(rendered, str) else json.dumps(rendered).encode()
+
+
+def raw_articles(count: int, seed: int = 7, shared_ratio: float = 0.3) -> List[dict]:
+    """Provider-shaped article dicts, as NewsService hands them on, for the in-process pipeline benchmarks"""
+    articles = []
+    providers = [name for name in _RENDERERS if name != RSS]
+    per_provider = max(1, count // len(providers))
+    for provider in providers:
+        for item in _items(provider, per_provider, seed, shared_ratio):
+            articles.append({
+                "title": item["title"],
+                "description": item["description"],
+                "url": item["url"],
+                "published_at": _date(provider, item),
+                "source": item["source"],
+                "api_source": provider,
+            })
+    return articles[:count]
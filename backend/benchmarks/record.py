@@ -0,0 +1,64 @@
+import argparse
+import sys
+from typing import List, Optional
+
+import httpx
+
+from benchmarks.fixtures import FIXTURES_DIR, RSS
+from config import Config
+
+# provider -> (url, params, key parameter, key)
+RECORDINGS = {
+    "newsapi": ("https://newsapi.org/v2/top-headlines", {"country": "in", "pageSize": 50}, "apiKey", Config.NEWS_API_KEY),
+    "gnews": ("https://gnews.io/api/v4/top-headlines", {"country": "in", "lang": "en", "max": 50}, "apikey", Config.GNEWS_API_KEY),
+    "mediastack": ("http://api.mediastack.com/v1/news", {"countries": "in", "languages": "en", "limit": 50}, "access_key", Config.MEDIASTACK_API_KEY),
+    "currents": ("https://api.currentsapi.services/v1/latest-news", {"language": "en"}, "apiKey", Config.CURRENTS_API_KEY),
+    "guardian": ("https://content.guardianapis.com/search", {"section": "world", "page-size": 10, "show-fields": "headline"}, "api-key", Config.GUARDIAN_API_KEY),
+    "nytimes": ("https://api.nytimes.com/svc/topstories/v2/world.json", {}, "api-key", Config.NYTIMES_API_KEY),
+    "serpapi": ("https://serpapi.com/search", {"engine": "google_news", "q": "India news", "gl": "in"}, "api_key", Config.SERPAPI_KEY),
+    "newsdata_io": ("https://newsdata.io/api/1/news", {"country": "in", "language": "en"}, "apikey", Config.NEWSDATA_IO_KEY),
+    "worldnews": ("https://api.worldnewsapi.com/search-news", {"source-countries": "in", "language": "en"}, "api-key", Config.WORLDNEWS_API_KEY),
+    RSS: ("https://www.thehindu.com/news/national/feeder/default.rss", {}, None, None),
+}
+
+
+def record(providers: List[str]) -> int:
+    """Save one live response per provider as its benchmark fixture; returns the number of failures"""
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    failures = 0
+    with httpx.Client(timeout=Config.PROVIDER_TIMEOUT_SECONDS, follow_redirects=True) as client:
+        for provider in providers:
+            url, params, key_param, key = RECORDINGS[provider]
+            if key_param and not key:
+                print(f"skipped {provider}: no API key configured", file=sys.stderr)
+                continue
+            try:
+                response = client.get(url, params={**params, **({key_param: key} if key_param else {})})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"failed {provider}: {e}", file=sys.stderr)
+                failures += 1
+                continue
+            body = response.content.replace(key.encode(), b"REDACTED") if key else response.content
+            path = FIXTURES_DIR / (f"{RSS}.xml" if provider == RSS else f"{provider}.json")
+            path.write_bytes(body)
+            print(f"recorded {provider} -> {path.name} ({len(body)} bytes)", file=sys.stderr)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.record",
+        description="Record live provider responses as benchmark fixtures (uses the configured API keys)",
+    )
+    parser.add_argument("providers", nargs="*", default=list(RECORDINGS), metavar="PROVIDER",
+                        help=f"Providers to record (default: all of {', '.join(RECORDINGS)})")
+    args = parser.parse_args(argv)
+    unknown = [provider for provider in args.providers if provider not in RECORDINGS]
+    if unknown:
+        parser.error(f"unknown providers: {', '.join(unknown)}")
+    return 1 if record(args.providers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
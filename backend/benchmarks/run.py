@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import orjson
+
+from benchmarks.fixtures import RSS, raw_articles, response_body
+from benchmarks.stub_server import ProviderStub, RedirectTransport, StubBehaviour, StubServer
+
+# Every key NewsService and the aggregator read; all of them point at the stub
+PROVIDER_KEY_VARIABLES = [
+    "NEWS_API_KEY", "NEWSAPI_ADDITIONAL_KEY", "GNEWS_API_KEY", "MEDIASTACK_API_KEY", "CURRENTS_API_KEY",
+    "GUARDIAN_API_KEY", "NYTIMES_API_KEY", "NYTIMES_API_KEY_2", "SERPAPI_KEY", "NEWSDATAIO_KEY", "WORLDNEWS_KEY",
+]
+PROVIDERS = ["newsapi", "gnews", "mediastack", "currents", "guardian", "nytimes", "serpapi", "newsdata_io",
+             "worldnews", "default"]
+
+
+def configure_environment(args):
+    """Point the backend at benchmark settings; must run before any backend module is imported"""
+    for variable in PROVIDER_KEY_VARIABLES:
+        os.environ[variable] = f"bench-{variable.lower()}"
+    # Quotas and rate limits are lifted: the stub is what injects slowness and failures
+    for provider in PROVIDERS:
+        os.environ[f"{provider.upper()}_DAILY_QUOTA"] = "1000000000"
+        os.environ[f"{provider.upper()}_RATE_PER_SECOND"] = "1000000"
+        os.environ[f"{provider.upper()}_BURST"] = "1000000"
+    os.environ["USE_REAL_REDIS"] = "false"
+    os.environ["NORMALIZATION_EXECUTOR"] = args.executor
+    # Background page fetches would run alongside (and skew) every scenario that builds a snapshot
+    os.environ["ENRICHMENT_ENABLED"] = "false"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='news-bench-')}/bench.db"
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class Bench:
+    """Backend objects the scenarios share, created after the environment is configured"""
+
+    def __init__(self, pipeline_size: int):
+        import main
+        from config import Config
+        from database.database import dispose_engines, get_async_db
+        from routers.enhanced_news import news_aggregator
+        from routers.news import ArticleResponse, CountryNewsResponse
+        from services.feed_snapshot_service import FeedSnapshotService
+        from services.news_service import NewsService
+        from services.normalization import normalization_pool, normalize_feed
+        from services.provider_gateway import provider_gateway
+        from services.provider_health import provider_health
+        from utils.cache import redis_client
+        from utils.dates import date_normalizer
+        from utils.loop_monitor import LoopMonitor
+
+        self.app = main.app
+        self.get_async_db = get_async_db
+        self.dispose_engines = dispose_engines
+        self.aggregator = news_aggregator
+        self.snapshots = FeedSnapshotService(response_model=CountryNewsResponse, article_model=ArticleResponse)
+        self.news_service_class = NewsService
+        self.normalization_pool = normalization_pool
+        self.normalize_feed = normalize_feed
+        self.provider_gateway = provider_gateway
+        self.provider_health = provider_health
+        self.redis_client = redis_client
+        self.date_normalizer = date_normalizer
+        self.articles = raw_articles(pipeline_size)
+        self.rss_body = response_body(RSS)
+        self.client: Optional[httpx.AsyncClient] = None
+        # Finer-grained than the production monitor, and keeps every sample of a scenario
+        self.loop_monitor = LoopMonitor(0.01, Config.LOOP_BLOCKED_THRESHOLD_MS / 1000, window=1_000_000)
+        self.loop_monitor_task: Optional[asyncio.Task] = None
+
+    async def start(self, stub_url: str):
+        self.provider_gateway._client = httpx.AsyncClient(
+            transport=RedirectTransport(stub_url, limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)),
+            follow_redirects=True,
+        )
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://bench")
+        self.normalization_pool.warm()
+        self.loop_monitor_task = self.loop_monitor.start()
+
+    async def stop(self):
+        self.loop_monitor_task.cancel()
+        await self.client.aclose()
+        await self.provider_gateway.aclose()
+        self.normalization_pool.shutdown()
+        await self.dispose_engines()
+
+    def reset(self):
+        """Cold start for the next iteration: no cached responses, quotas or breaker history"""
+        self.redis_client.flushall()
+        self.provider_health.reset()
+
+
+Scenario = Callable[[Bench], Awaitable[int]]
+
+
+async def _country_in(bench: Bench) -> int:
+    return len(await bench.news_service_class().fetch_news_by_country("in"))
+
+
+async def _country_us(bench: Bench) -> int:
+    return len(await bench.news_service_class().fetch_news_by_country("us"))
+
+
+async def _enhanced_feed(bench: Bench) -> int:
+    async with contextlib.aclosing(bench.get_async_db()) as sessions:
+        async for db in sessions:
+            return len(await bench.news_service_class().get_enhanced_aggregated_news(db, limit=50))
+
+
+async def _prioritized_feed(bench: Bench) -> int:
+    return len((await bench.aggregator.refresh_prioritized_feed())["articles"])
+
+
+async def _normalize_rss(bench: Bench) -> int:
+    return len(await bench.normalization_pool.run(bench.normalize_feed, bench.rss_body, "Bench", True))
+
+
+async def _dedup(bench: Bench) -> int:
+    return len(bench.aggregator.remove_duplicates(bench.articles))
+
+
+async def _date_sort(bench: Bench) -> int:
+    parse = bench.date_normalizer.parse
+    ordered = sorted(
+        bench.articles,
+        key=lambda article: parse(article["published_at"], article["api_source"]) or datetime.min.replace(tzinfo=timezone.utc),
+        reverse=True,
+    )
+    return len(ordered)
+
+
+async def _publish_snapshot(bench: Bench) -> int:
+    snapshot = await bench.snapshots.publish("bench", bench.articles)
+    return len(orjson.loads(snapshot.body(100))["articles"])
+
+
+async def _get(bench: Bench, path: str) -> bytes:
+    response = await bench.client.get(path)
+    response.raise_for_status()
+    return response.content
+
+
+async def _router_country(bench: Bench) -> int:
+    return len(orjson.loads(await _get(bench, "/api/news/country/in?limit=100"))["articles"])
+
+
+async def _router_country_stream(bench: Bench) -> int:
+    lines = (await _get(bench, "/api/news/country/in/stream")).splitlines()
+    return sum(1 for line in lines if b'"type":"article"' in line)
+
+
+async def _router_feed(bench: Bench) -> int:
+    return len(orjson.loads(await _get(bench, "/api/news/feed?limit=50"))["articles"])
+
+
+async def _router_prioritized_feed(bench: Bench) -> int:
+    return len(orjson.loads(await _get(bench, "/api/enhanced-news/prioritized-feed?use_cache=false"))["articles"])
+
+
+# name -> (scenario, whether each iteration starts cold, description)
+SCENARIOS: Dict[str, tuple] = {
+    "service.country_in": (_country_in, True, "NewsService.fetch_news_by_country('in'): APIs plus Indian RSS"),
+    "service.country_us": (_country_us, True, "NewsService.fetch_news_by_country('us'): APIs only"),
+    "service.enhanced_feed": (_enhanced_feed, True, "NewsService.get_enhanced_aggregated_news, 50 articles"),
+    "aggregator.prioritized_feed": (_prioritized_feed, True, "Prioritized feed rebuild across all countries"),
+    "pipeline.normalize_rss": (_normalize_rss, False, "One RSS document through the normalization pool"),
+    "pipeline.dedup": (_dedup, False, "Title dedup of the synthetic article set"),
+    "pipeline.date_sort": (_date_sort, False, "Date parsing and newest-first sort of the synthetic article set"),
+    "pipeline.publish_snapshot": (_publish_snapshot, False, "Country snapshot: format, validate, serialize, compress"),
+    "router.country": (_router_country, False, "GET /api/news/country/in, served from the snapshot"),
+    "router.country_stream": (_router_country_stream, True, "GET /api/news/country/in/stream, read to the end"),
+    "router.feed": (_router_feed, True, "GET /api/news/feed"),
+    "router.prioritized_feed": (_router_prioritized_feed, True, "GET /api/enhanced-news/prioritized-feed?use_cache=false"),
+}
+
+
+async def measure(bench: Bench, scenario: Scenario, cold: bool, iterations: int, warmup: int,
+                  concurrency: int) -> dict:
+    """Run warm-up iterations, then `iterations` measured ones in waves of `concurrency`"""
+    latencies: List[float] = []
+    articles = 0
+
+    async def once() -> int:
+        started = time.perf_counter()
+        count = await scenario(bench)
+        latencies.append(time.perf_counter() - started)
+        return count
+
+    for _ in range(warmup):
+        if cold:
+            bench.reset()
+        await once()
+    latencies.clear()
+    bench.loop_monitor.reset()
+
+    elapsed = 0.0
+    remaining = iterations
+    while remaining > 0:
+        wave = min(concurrency, remaining)
+        if cold:
+            bench.reset()
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(once() for _ in range(wave)))
+        elapsed += time.perf_counter() - started
+        articles = counts[-1]
+        remaining -= wave
+    loop_lag = bench.loop_monitor.stats()
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "articles": articles,
+        "throughput_per_second": round(iterations / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.9) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "loop_lag_p99_ms": loop_lag.get("p99_ms"),
+        "loop_lag_max_ms": loop_lag.get("max_ms"),
+        "loop_stalls": loop_lag["stalls"],
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_overrides(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        provider, _, latency = value.partition("=")
+        overrides[provider] = float(latency)
+    return overrides
+
+
+async def run_benchmarks(args, names: List[str]) -> dict:
+    default = StubBehaviour(args.latency_ms, args.jitter_ms, args.failure_rate, args.failure_status)
+    overrides = {
+        provider: StubBehaviour(latency, args.jitter_ms, args.failure_rate, args.failure_status)
+        for provider, latency in _parse_overrides(args.provider_latency).items()
+    }
+    stub = ProviderStub(default, overrides, args.articles_per_response, args.seed)
+
+    with StubServer(stub) as server:
+        with _quiet(args.verbose):
+            bench = Bench(args.pipeline_size)
+            await bench.start(server.base_url)
+        results = {}
+        try:
+            for name in names:
+                scenario, cold, description = SCENARIOS[name]
+                with _quiet(args.verbose):
+                    result = await measure(bench, scenario, cold and not args.warm_cache, args.iterations,
+                                           args.warmup, args.concurrency)
+                results[name] = {"description": description, "cold": cold and not args.warm_cache, **result}
+                print(f"{name:28} p50 {result['p50_ms']:>10.2f} ms  p95 {result['p95_ms']:>10.2f} ms  "
+                      f"{result['throughput_per_second'] or 0:>9.2f}/s  loop lag p99 {result['loop_lag_p99_ms'] or 0:>7.2f} ms  "
+                      f"({result['articles']} articles)", file=sys.stderr)
+        finally:
+            await bench.stop()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "compare", "threshold", "fail_on_regression", "list", "verbose")
+            },
+            "stub_requests": dict(sorted(stub.requests.items())),
+        },
+        "results": results,
+    }
+
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    """The services print progress for every call; keep it out of the timings' output"""
+    if verbose:
+        yield
+        return
+    previous = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(previous)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Print current vs baseline and return the scenarios that regressed by more than threshold percent
+
+    A scenario that now blocks the event loop past LOOP_BLOCKED_THRESHOLD_MS also counts as a regression.
+    """
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:", file=sys.stderr)
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        p95_change = _change(before["p95_ms"], result["p95_ms"])
+        throughput_change = _change(before["throughput_per_second"], result["throughput_per_second"])
+        # Older baselines have no loop lag figures
+        started_blocking = before.get("loop_stalls") == 0 and result["loop_stalls"] > 0
+        regressed = p95_change > threshold or throughput_change < -threshold or started_blocking
+        if regressed:
+            regressions.append(name)
+        print(f"{name:28} p95 {p95_change:>+8.1f}%  throughput {throughput_change:>+8.1f}%"
+              f"{'  loop stalls ' + str(result['loop_stalls']) if started_blocking else ''}"
+              f"{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+    return regressions
+
+
+def _change(before: Optional[float], after: Optional[float]) -> float:
+    if not before or after is None:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the aggregation pipeline against a local stand-in for every news provider",
+    )
+    parser.add_argument("scenarios", nargs="*", default=["*"], help="Scenario names or globs (default: all)")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1, help="Iterations run at once")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub response delay for every provider")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Extra random delay, up to this much")
+    parser.add_argument("--provider-latency", action="append", default=[], metavar="PROVIDER=MS",
+                        help="Per-provider delay, e.g. gnews=800 or rss=300 (repeatable)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of stub responses that fail")
+    parser.add_argument("--failure-status", type=int, default=503, help="Status of injected failures (429 adds Retry-After)")
+    parser.add_argument("--articles-per-response", type=int, default=50)
+    parser.add_argument("--pipeline-size", type=int, default=2000, help="Articles in the in-process pipeline set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--executor", choices=["process", "thread", "inline"], default="process",
+                        help="Normalization executor")
+    parser.add_argument("--database-url", help="Database for the DB-backed scenarios (default: a temporary SQLite file)")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep Redis caches between iterations")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="Percent change in p95 or throughput that counts as a regression (default: 10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if --compare finds a regression")
+    parser.add_argument("--verbose", action="store_true", help="Keep the services' own output")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (_, cold, description) in SCENARIOS.items():
+            print(f"{name:28} {'cold' if cold else 'warm'}  {description}")
+        return 0
+
+    names = [name for name in SCENARIOS if any(fnmatch.fnmatch(name, pattern) for pattern in args.scenarios)]
+    if not names:
+        parser.error(f"no scenario matches {args.scenarios}")
+
+    configure_environment(args)
+    results = asyncio.run(run_benchmarks(args, names))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if args.fail_on_regression and regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
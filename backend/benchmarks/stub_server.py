@@ -0,0 +1,126 @@
+import asyncio
+import random
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from benchmarks.fixtures import RSS, provider_for_host, response_body
+
+
+class StubBehaviour:
+    """Latency and failure injection for one provider (or all of them, as the default)"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0,
+                 failure_status: int = 503):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+
+
+class ProviderStub:
+    """Local stand-in for every news provider and RSS feed the backend calls.
+
+    Requests arrive as ``/<original host>/<original path>`` (see RedirectTransport)
+    and are answered with that provider's fixture after the configured delay,
+    or with the configured failure status. Bodies are rendered once up front so
+    the stub's own cost stays out of the measurements.
+    """
+
+    def __init__(self, default: StubBehaviour, overrides: Optional[Dict[str, StubBehaviour]] = None,
+                 articles_per_response: int = 50, seed: int = 7):
+        self.default = default
+        self.overrides = overrides or {}
+        self._random = random.Random(seed)
+        self._bodies: Dict[str, bytes] = {}
+        self.articles_per_response = articles_per_response
+        self.seed = seed
+        self.requests: Dict[str, int] = {}
+        self.app = Starlette(routes=[Route("/{host}/{path:path}", self.handle)])
+
+    def _body(self, provider: str) -> bytes:
+        body = self._bodies.get(provider)
+        if body is None:
+            body = response_body(provider, self.articles_per_response, self.seed)
+            self._bodies[provider] = body
+        return body
+
+    async def handle(self, request: Request) -> Response:
+        provider = provider_for_host(request.path_params["host"])
+        self.requests[provider] = self.requests.get(provider, 0) + 1
+        behaviour = self.overrides.get(provider, self.default)
+
+        delay = behaviour.latency_ms + self._random.uniform(0, behaviour.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if behaviour.failure_rate and self._random.random() < behaviour.failure_rate:
+            headers = {"Retry-After": "1"} if behaviour.failure_status == 429 else None
+            return Response(b"injected failure", status_code=behaviour.failure_status, headers=headers)
+
+        media_type = "application/rss+xml" if provider == RSS else "application/json"
+        return Response(self._body(provider), media_type=media_type)
+
+
+class StubServer:
+    """Runs a ProviderStub with uvicorn on a background thread, so injected latency never blocks the benchmark loop"""
+
+    def __init__(self, stub: ProviderStub, host: str = "127.0.0.1", port: int = 0):
+        self.stub = stub
+        self.host = host
+        self.port = port or _free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(
+            stub.app, host=self.host, port=self.port, log_level="warning", access_log=False, lifespan="off",
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.run, name="provider-stub", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Provider stub server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """Sends every outbound request to the stub, keeping the original host as the first path segment"""
+
+    def __init__(self, base_url: str, **transport_kwargs):
+        self.base_url = httpx.URL(base_url)
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        original = request.url
+        request.url = self.base_url.copy_with(
+            path=f"/{original.host}{original.path}", query=original.query or None,
+        )
+        request.headers["Host"] = f"{self.base_url.host}:{self.base_url.port}"
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
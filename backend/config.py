@@ -4,9 +4,27 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def _provider_limits(defaults):
+    """Apply <PROVIDER>_DAILY_QUOTA, <PROVIDER>_RATE_PER_SECOND and <PROVIDER>_BURST overrides"""
+    return {
+        name: (
+            int(os.getenv(f"{name.upper()}_DAILY_QUOTA", daily)),
+            float(os.getenv(f"{name.upper()}_RATE_PER_SECOND", rate)),
+            int(os.getenv(f"{name.upper()}_BURST", burst)),
+        )
+        for name, (daily, rate, burst) in defaults.items()
+    }
+
 class Config:
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bias_news.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_ECHO = os.getenv("DB_ECHO", "False").lower() == "true"
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    REPLICA_HEALTH_CHECK_SECONDS = int(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", 15))
     
     # OpenAI
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "sk-demo-key-for-testing")
@@ -32,9 +50,134 @@ class Config:
     NYTIMES_API_KEY = os.getenv("NYTIMES_API_KEY", "")
     NYTIMES_API_KEY_2 = os.getenv("NYTIMES_API_KEY_2", "")
     
+    # Every key of a provider is rotated through; a key answering 401/403 is benched for a while
+    PROVIDER_API_KEYS = {
+        "newsapi": [NEWS_API_KEY, NEWSAPI_ADDITIONAL_KEY],
+        "nytimes": [NYTIMES_API_KEY, NYTIMES_API_KEY_2],
+    }
+    PROVIDER_KEY_DISABLE_SECONDS = int(os.getenv("PROVIDER_KEY_DISABLE_SECONDS", 3600))
+    
+    # Provider quotas per API key: (requests per day, requests per second, burst size).
+    # A daily quota of 0 disables quota tracking for that provider.
+    PROVIDER_LIMITS = _provider_limits({
+        "newsapi": (100, 1.0, 5),
+        "gnews": (100, 1.0, 5),
+        "mediastack": (16, 1.0, 3),
+        "currents": (600, 1.0, 5),
+        "guardian": (500, 1.0, 5),
+        "nytimes": (500, 5 / 60, 5),
+        "serpapi": (8, 1.0, 2),
+        "newsdata_io": (200, 0.5, 3),
+        "worldnews": (50, 1.0, 3),
+        "default": (0, 1.0, 5),
+    })
+    # Share of the daily quota usable immediately; the rest unlocks linearly over the (UTC) day
+    PROVIDER_PACING_RESERVE = float(os.getenv("PROVIDER_PACING_RESERVE", 0.1))
+    PROVIDER_MAX_RATE_WAIT_SECONDS = float(os.getenv("PROVIDER_MAX_RATE_WAIT_SECONDS", 3))
+    PROVIDER_COOLDOWN_SECONDS = int(os.getenv("PROVIDER_COOLDOWN_SECONDS", 60))
+    PROVIDER_STALE_TTL_SECONDS = int(os.getenv("PROVIDER_STALE_TTL_SECONDS", 86400))
+    PROVIDER_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", 10))
+    
+    # Provider circuit breakers and adaptive timeouts
+    PROVIDER_BREAKER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_BREAKER_FAILURE_THRESHOLD", 5))
+    PROVIDER_BREAKER_RESET_SECONDS = int(os.getenv("PROVIDER_BREAKER_RESET_SECONDS", 30))
+    PROVIDER_LATENCY_SLO_SECONDS = float(os.getenv("PROVIDER_LATENCY_SLO_SECONDS", 4))
+    # Timeout = observed p95 x multiplier, clamped to [min, PROVIDER_TIMEOUT_SECONDS]
+    PROVIDER_TIMEOUT_P95_MULTIPLIER = float(os.getenv("PROVIDER_TIMEOUT_P95_MULTIPLIER", 2))
+    PROVIDER_MIN_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_MIN_TIMEOUT_SECONDS", 1.5))
+    PROVIDER_LATENCY_WINDOW = int(os.getenv("PROVIDER_LATENCY_WINDOW", 100))
+    # Providers whose requests are duplicated once they run past their p90 latency
+    PROVIDER_HEDGE_PROVIDERS = [p.strip() for p in os.getenv("PROVIDER_HEDGE_PROVIDERS", "gnews,guardian").split(",") if p.strip()]
+    # Most hedges allowed per PROVIDER_LATENCY_WINDOW requests, as a share of them
+    PROVIDER_HEDGE_MAX_RATIO = float(os.getenv("PROVIDER_HEDGE_MAX_RATIO", 0.05))
+    
+    # Enhanced aggregator: concurrent country x source fetches
+    AGGREGATOR_MAX_CONCURRENCY = int(os.getenv("AGGREGATOR_MAX_CONCURRENCY", 16))
+    RSS_FETCH_TIMEOUT_SECONDS = float(os.getenv("RSS_FETCH_TIMEOUT_SECONDS", 8))
+    PRIORITIZED_FEED_REFRESH_MINUTES = int(os.getenv("PRIORITIZED_FEED_REFRESH_MINUTES", 10))
+    PRIORITIZED_FEED_MAX_ARTICLES = int(os.getenv("PRIORITIZED_FEED_MAX_ARTICLES", 500))
+    # Background rebuilds stop once the feed has not been requested for this long
+    PRIORITIZED_FEED_IDLE_MINUTES = int(os.getenv("PRIORITIZED_FEED_IDLE_MINUTES", 60))
+    # Upper bound on one rebuild; other workers wait this long at most for its result
+    PRIORITIZED_FEED_LOCK_SECONDS = int(os.getenv("PRIORITIZED_FEED_LOCK_SECONDS", 120))
+    
+    # Where CPU-bound normalization (feed parsing, HTML stripping, dedup) runs: process, thread or inline
+    NORMALIZATION_EXECUTOR = os.getenv("NORMALIZATION_EXECUTOR", "process")
+    NORMALIZATION_WORKERS = int(os.getenv("NORMALIZATION_WORKERS", 2))
+    
+    # Retention / archival
+    ARTICLE_RETENTION_DAYS = int(os.getenv("ARTICLE_RETENTION_DAYS", 90))
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+    ARCHIVE_INTERVAL_HOURS = int(os.getenv("ARCHIVE_INTERVAL_HOURS", 6))
+    
+    # Related-coverage embedding index
+    EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", "./embeddings")
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 256))
+    EMBEDDING_REBUILD_MINUTES = int(os.getenv("EMBEDDING_REBUILD_MINUTES", 30))
+    
+    # Country feed snapshots
+    SNAPSHOT_LIMIT_BUCKETS = [int(size) for size in os.getenv("SNAPSHOT_LIMIT_BUCKETS", "10,20,50,100").split(",") if size.strip()]
+    SNAPSHOT_REFRESH_MINUTES = int(os.getenv("SNAPSHOT_REFRESH_MINUTES", 10))
+    SNAPSHOT_IDLE_MINUTES = int(os.getenv("SNAPSHOT_IDLE_MINUTES", 120))
+    
+    # Live feed (Server-Sent Events)
+    LIVE_FEED_BUFFER_SIZE = int(os.getenv("LIVE_FEED_BUFFER_SIZE", 2000))
+    LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", 256))
+    LIVE_FEED_KEEPALIVE_SECONDS = int(os.getenv("LIVE_FEED_KEEPALIVE_SECONDS", 15))
+    LIVE_FEED_RETRY_MS = int(os.getenv("LIVE_FEED_RETRY_MS", 5000))
+    # Replay window for a Last-Event-ID from another worker or an earlier process
+    LIVE_FEED_UNKNOWN_ID_REPLAY_SECONDS = int(os.getenv("LIVE_FEED_UNKNOWN_ID_REPLAY_SECONDS", 60))
+    
+    # HTTP caching (Cache-Control max-age / stale-while-revalidate, seconds)
+    FEED_CACHE_MAX_AGE = int(os.getenv("FEED_CACHE_MAX_AGE", 30))
+    FEED_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("FEED_CACHE_STALE_WHILE_REVALIDATE", 120))
+    COUNTRY_CACHE_MAX_AGE = int(os.getenv("COUNTRY_CACHE_MAX_AGE", 60))
+    COUNTRY_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("COUNTRY_CACHE_STALE_WHILE_REVALIDATE", 600))
+    
+    # Responses smaller than this are sent uncompressed (bytes)
+    COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    
     # Cache
     CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 600))
     
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # OpenTelemetry tracing: none, console, file (JSON lines) or otlp (HTTP collector)
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+    TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    # Share of requests traced; the decision is made once per trace and inherited by its spans
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "news-platform-api")
+    TRACING_MAX_STATEMENT_LENGTH = int(os.getenv("TRACING_MAX_STATEMENT_LENGTH", "500"))
+    
+    # Article enrichment: full page text for items that only carry a summary
+    ENRICHMENT_ENABLED = os.getenv("ENRICHMENT_ENABLED", "True").lower() == "true"
+    ENRICHMENT_MIN_CONTENT_CHARS = int(os.getenv("ENRICHMENT_MIN_CONTENT_CHARS", 500))  # Shorter content is enriched
+    ENRICHMENT_MIN_TEXT_CHARS = int(os.getenv("ENRICHMENT_MIN_TEXT_CHARS", 300))  # Less extracted text counts as none
+    ENRICHMENT_MAX_CONCURRENCY = int(os.getenv("ENRICHMENT_MAX_CONCURRENCY", 16))
+    ENRICHMENT_PER_DOMAIN_CONCURRENCY = int(os.getenv("ENRICHMENT_PER_DOMAIN_CONCURRENCY", 2))
+    ENRICHMENT_FETCH_TIMEOUT_SECONDS = float(os.getenv("ENRICHMENT_FETCH_TIMEOUT_SECONDS", 10))
+    ENRICHMENT_MAX_PAGE_BYTES = int(os.getenv("ENRICHMENT_MAX_PAGE_BYTES", 2_000_000))
+    ENRICHMENT_USER_AGENT = os.getenv("ENRICHMENT_USER_AGENT", "Mozilla/5.0 (compatible; NewsPlatformBot/1.0)")
+    ENRICHMENT_MAX_REDIRECTS = int(os.getenv("ENRICHMENT_MAX_REDIRECTS", 5))  # Every hop is checked like the article URL
+    ENRICHMENT_ROBOTS_TTL_SECONDS = int(os.getenv("ENRICHMENT_ROBOTS_TTL_SECONDS", 86400))  # robots.txt cached per site
+    # Pages are not fetched again until their Cache-Control/Expires lifetime, clamped to these bounds, runs out
+    ENRICHMENT_DEFAULT_TTL_SECONDS = int(os.getenv("ENRICHMENT_DEFAULT_TTL_SECONDS", 86400))
+    ENRICHMENT_MIN_TTL_SECONDS = int(os.getenv("ENRICHMENT_MIN_TTL_SECONDS", 3600))
+    ENRICHMENT_MAX_TTL_SECONDS = int(os.getenv("ENRICHMENT_MAX_TTL_SECONDS", 604800))
+    
+    # Event-loop lag monitor; stalls past the threshold are logged with the blocking stack
+    LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "True").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+    LOOP_BLOCKED_THRESHOLD_MS = float(os.getenv("LOOP_BLOCKED_THRESHOLD_MS", "250"))
+    
+    # Admin diagnostics under /api/admin (profiling, tracemalloc); disabled unless a token is set
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+    
     # Server
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8000))
@@ -1,24 +1,282 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
+from config import Config
+from utils.metrics import instrument_engine
+from utils.tracing import trace_engine
+from typing import List, Optional
+import asyncio
+import itertools
+import logging
 import os
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Try PostgreSQL first, fallback to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     # Use SQLite as fallback
     DATABASE_URL = "sqlite:///./bias_news.db"
 
-engine = create_engine(DATABASE_URL)
+# Async drivers used for each sync backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convert a sync database URL to its async driver equivalent"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_kwargs(url: str, is_async: bool = False) -> dict:
+    """Pool and connection settings shared by the sync and async engines"""
+    kwargs = {"echo": Config.DB_ECHO, "pool_pre_ping": True}
+    parsed = make_url(url)
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases use a single shared connection, no pool tuning
+            return kwargs
+        if is_async:
+            # aiosqlite defaults to NullPool; keep connections (and their threads) warm
+            kwargs["poolclass"] = AsyncAdaptedQueuePool
+    kwargs.update(
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+    )
+    return kwargs
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Enable WAL so readers don't block the writer, and relax fsync to NORMAL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", _configure_sqlite)
+instrument_engine(engine, "primary")
+trace_engine(engine, "primary")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# The async engine is created lazily so the async driver is only required
+# once something actually asks for an async session.
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    """Return the shared async engine, creating it on first use"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        async_url = to_async_url(DATABASE_URL)
+        _async_engine = create_async_engine(async_url, **_engine_kwargs(DATABASE_URL, is_async=True))
+        if _is_sqlite(DATABASE_URL):
+            event.listen(_async_engine.sync_engine, "connect", _configure_sqlite)
+        instrument_engine(_async_engine.sync_engine, "primary")
+        trace_engine(_async_engine.sync_engine, "primary")
+        _AsyncSessionLocal = async_sessionmaker(
+            _async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession that never blocks the event loop"""
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+class ReplicaSession(AsyncSession):
+    """Read-only session on a replica that moves to the primary when the replica fails.
+
+    Services turn errors into empty results, so a failing replica has to be
+    handled here: an error that the replica itself is unreachable marks it
+    unhealthy, and the failed statement and every later one in the session run
+    on the primary.
+    """
+
+    def __init__(self, *args, router: "ReplicaRouter", replica_index: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self.replica_index = replica_index
+        self._primary: Optional[AsyncSession] = None
+
+    async def execute(self, statement, *args, **kwargs):
+        if self._primary is None:
+            try:
+                return await super().execute(statement, *args, **kwargs)
+            except DBAPIError as e:
+                if not await self._replica_down(e):
+                    raise
+                logger.warning(f"Read replica #{self.replica_index} failed, retrying on the primary: {e}")
+                self.router.mark_unhealthy(self.replica_index)
+                await super().rollback()
+                get_async_engine()
+                self._primary = _AsyncSessionLocal()
+        return await self._primary.execute(statement, *args, **kwargs)
+
+    async def _replica_down(self, error: DBAPIError) -> bool:
+        """Whether the error is the replica's rather than the statement's"""
+        if error.connection_invalidated:
+            return True
+        if not isinstance(error, (OperationalError, InterfaceError)):
+            return False
+        # Drivers also raise OperationalError for bad statements (SQLite: "no such table"), so ask the replica
+        try:
+            async with self.bind.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception:
+            return True
+        return False
+
+    async def close(self):
+        if self._primary is not None:
+            await self._primary.close()
+        await super().close()
+
+
+class ReplicaRouter:
+    """Round-robins read-only sessions across healthy replicas.
+
+    Replicas are marked unhealthy when a health check or a query against them
+    fails, and reads fall back to the primary while none are available.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self.engines = []
+        self.session_makers = []
+        self.healthy: List[bool] = []
+        self._cycle = None
+
+    def _ensure_engines(self):
+        if self._cycle is not None or not self.urls:
+            return
+        for url in self.urls:
+            try:
+                replica_engine = create_async_engine(to_async_url(url), **_engine_kwargs(url, is_async=True))
+            except Exception as e:
+                logger.error(f"Could not create engine for read replica {make_url(url).host}: {e}")
+                continue
+            if _is_sqlite(url):
+                event.listen(replica_engine.sync_engine, "connect", _configure_sqlite)
+            instrument_engine(replica_engine.sync_engine, "replica")
+            trace_engine(replica_engine.sync_engine, "replica")
+            self.engines.append(replica_engine)
+            self.session_makers.append(async_sessionmaker(
+                replica_engine, class_=ReplicaSession, router=self, replica_index=len(self.engines) - 1,
+                autoflush=False, expire_on_commit=False
+            ))
+            self.healthy.append(True)
+        self._cycle = itertools.cycle(range(len(self.engines)))
+
+    def pick(self) -> Optional[int]:
+        """Return the index of the next healthy replica, or None to use the primary"""
+        self._ensure_engines()
+        for _ in range(len(self.engines)):
+            index = next(self._cycle)
+            if self.healthy[index]:
+                return index
+        return None
+
+    def mark_unhealthy(self, index: int):
+        if self.healthy[index]:
+            logger.warning(f"Read replica #{index} marked unhealthy, reads fall back to other replicas/primary")
+        self.healthy[index] = False
+
+    async def check_health(self, timeout: float = 5.0):
+        """Run SELECT 1 against every replica and update its health flag"""
+        self._ensure_engines()
+        for index, replica_engine in enumerate(self.engines):
+            try:
+                async with replica_engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout)
+                if not self.healthy[index]:
+                    logger.info(f"Read replica #{index} is healthy again")
+                self.healthy[index] = True
+            except Exception as e:
+                logger.warning(f"Read replica #{index} health check failed: {e}")
+                self.mark_unhealthy(index)
+
+    async def run_health_checks(self, interval: int):
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self):
+        for replica_engine in self.engines:
+            await replica_engine.dispose()
+
+
+replica_router = ReplicaRouter(Config.DATABASE_REPLICA_URLS)
+
+
+async def get_async_read_db():
+    """FastAPI dependency for read-only endpoints.
+
+    Uses a healthy replica when DATABASE_REPLICA_URLS is configured and the
+    primary otherwise; a replica that fails mid-request is retried on the
+    primary (see ReplicaSession). Writes (ingestion, fact-check persistence)
+    must keep using get_db/get_async_db so they always reach the primary.
+    """
+    index = replica_router.pick()
+    if index is None:
+        get_async_engine()
+        async with _AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with replica_router.session_makers[index]() as db:
+        yield db
+
+
+def start_replica_health_checks() -> Optional[asyncio.Task]:
+    """Start the periodic replica health check loop if replicas are configured"""
+    if not replica_router.urls:
+        return None
+    return asyncio.create_task(replica_router.run_health_checks(Config.REPLICA_HEALTH_CHECK_SECONDS))
+
+
+async def dispose_engines():
+    """Close pooled connections on application shutdown"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    await replica_router.dispose()
+    engine.dispose()
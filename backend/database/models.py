@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -23,7 +23,7 @@ class Article(Base):
     title = Column(String, index=True)
     content = Column(Text)
     url = Column(String)
-    published_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True), index=True)
     source_id = Column(Integer, ForeignKey("news_sources.id"))
     topic = Column(String, index=True)
     summary = Column(Text)
@@ -107,3 +107,23 @@ class FakeNewsDetection(Base):
     verdict = Column(String)  # likely_real, suspicious, likely_fake
     red_flags = Column(Text)  # JSON array
     detection_date = Column(DateTime(timezone=True), server_default=func.now())
+
+class ArticleBody(Base):
+    __tablename__ = "article_bodies"
+    
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the extracted text
+    body = Column(LargeBinary)  # Compressed UTF-8 text
+    encoding = Column(String)  # br or gzip
+    length = Column(Integer)  # Characters before compression
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ArticlePage(Base):
+    __tablename__ = "article_pages"
+    
+    url = Column(String, primary_key=True)
+    content_hash = Column(String(64), ForeignKey("article_bodies.content_hash"), index=True)  # None if no text was found
+    status = Column(Integer)  # HTTP status of the last fetch, 0 for network errors
+    etag = Column(String)
+    last_modified = Column(String)
+    fetched_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True))
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
@@ -6,10 +6,24 @@ from dotenv import load_dotenv
 import os
 from typing import Optional
 
-from routers import news, fact_check
-from database.database import engine
+from routers import news, fact_check, enhanced_news, admin
+from database.database import engine, dispose_engines, start_replica_health_checks
 from database import models
 from utils.cache import clear_cache
+from utils.http_cache import CacheRule, HTTPCacheMiddleware
+from utils.compression import CompressionMiddleware
+from utils.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_metrics
+from utils.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from utils.loop_monitor import loop_monitor, start_loop_monitor
+from config import Config
+from services.archive_service import start_retention_job
+from services.search_service import ensure_search_index
+from services.embedding_index import start_embedding_index
+from services.provider_gateway import provider_gateway
+from services.enrichment_service import article_enricher
+from services.provider_health import provider_health
+from utils.dates import date_normalizer
+from services.normalization import normalization_pool
 
 # Load environment variables
 load_dotenv()
@@ -17,13 +31,40 @@ load_dotenv()
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+# create_all() skips indexes added to tables that already exist
+for table in models.Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+ensure_search_index(engine)
+
 app = FastAPI(
     title="News Platform API",
     description="API for news feed, fact-checking, consensus scoring, and translation",
     version="1.0.0"
 )
 
-# Configure CORS
+# Validators and Cache-Control for polled feeds; fact checks and cache admin are never cached
+app.add_middleware(
+    HTTPCacheMiddleware,
+    rules=[
+        CacheRule(r"/api/news/(feed|indian|international)/?", Config.FEED_CACHE_MAX_AGE,
+                  Config.FEED_CACHE_STALE_WHILE_REVALIDATE),
+        CacheRule(r"/api/news/country/[^/]+/?", Config.COUNTRY_CACHE_MAX_AGE,
+                  Config.COUNTRY_CACHE_STALE_WHILE_REVALIDATE, resolve_etag=news.resolve_country_etag),
+        CacheRule(r"/api/fact-check(/.*)?"),
+        CacheRule(r"/api/cache/clear"),
+        CacheRule(r"/api/admin(/.*)?"),
+    ],
+)
+
+# brotli/gzip for everything else; snapshot responses arrive already compressed
+app.add_middleware(CompressionMiddleware, minimum_size=Config.COMPRESSION_MINIMUM_SIZE)
+
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Configure CORS (added last so it also wraps 304s from the cache layer)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -32,12 +73,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the request span covers every other middleware
+app.add_middleware(TracingMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include only required routers
 app.include_router(news.router, prefix="/api/news", tags=["news"])
 app.include_router(fact_check.router, prefix="/api/fact-check", tags=["fact-check"])
+app.include_router(enhanced_news.router, prefix="/api/enhanced-news", tags=["enhanced-news"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"], include_in_schema=False)
+
+@app.on_event("startup")
+async def startup_event():
+    configure_tracing()
+    normalization_pool.warm()
+    app.state.loop_monitor_task = start_loop_monitor()
+    app.state.replica_health_task = start_replica_health_checks()
+    app.state.retention_task = start_retention_job()
+    app.state.embedding_index_task = start_embedding_index()
+    app.state.snapshot_refresh_task = news.country_snapshots.start()
+    app.state.prioritized_feed_task = enhanced_news.news_aggregator.start_prioritized_feed_refresh()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (
+        app.state.loop_monitor_task,
+        app.state.replica_health_task,
+        app.state.retention_task,
+        app.state.embedding_index_task,
+        app.state.snapshot_refresh_task,
+        app.state.prioritized_feed_task,
+    ):
+        if task:
+            task.cancel()
+    await provider_gateway.aclose()
+    await article_enricher.aclose()
+    normalization_pool.shutdown()
+    await dispose_engines()
+    shutdown_tracing()
 
 @app.get("/")
 async def root():
@@ -45,7 +120,18 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "providers": provider_health.snapshot(),
+        "date_parsing": date_normalizer.stats(),
+        "event_loop": loop_monitor.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not Config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 @app.post("/api/cache/clear")
 async def clear_cache_endpoint(prefix: Optional[str] = Query(None, description="Cache prefix to clear. If not provided, all cache will be cleared.")):
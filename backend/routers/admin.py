@@ -0,0 +1,92 @@
+import hmac
+import time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import BaseModel
+
+from config import Config
+from services.profiler import ProfilerBusy, memory_profiler, sampling_profiler
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, description="Must match ADMIN_TOKEN")):
+    """Admin endpoints are hidden unless ADMIN_TOKEN is set, and need it in X-Admin-Token"""
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), Config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+class Allocator(BaseModel):
+    location: str
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = None
+    count_diff: Optional[int] = None
+    traceback: Optional[List[str]] = None
+
+class MemorySnapshot(BaseModel):
+    pid: int
+    group_by: str
+    compared: bool
+    traced_bytes: int
+    peak_bytes: int
+    total_bytes: int
+    top: List[Allocator]
+
+@router.post("/profile", dependencies=[Depends(require_admin)])
+async def profile_worker(
+    seconds: float = Query(10, gt=0, description="How long to sample"),
+    interval_ms: float = Query(None, ge=1, description="Sampling interval (default PROFILE_INTERVAL_MS)"),
+    format: str = Query("collapsed", pattern="^(collapsed|svg)$", description="collapsed stacks or an SVG flamegraph"),
+    all_threads: bool = Query(False, description="Sample every thread, not just the event loop"),
+):
+    """Sample this worker's stacks for a while and download the result; each request profiles one worker"""
+    if seconds > Config.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {Config.PROFILE_MAX_SECONDS}")
+    interval = (interval_ms or Config.PROFILE_INTERVAL_MS) / 1000
+    try:
+        profile = await sampling_profiler.profile(seconds, interval, all_threads)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{profile.pid}-{time.strftime('%Y%m%d-%H%M%S')}"
+    headers = {"X-Profile-Samples": str(profile.sample_count)}
+    if format == "svg":
+        title = f"pid {profile.pid}, {profile.seconds:.1f}s every {interval * 1000:g}ms"
+        headers["Content-Disposition"] = f'inline; filename="{filename}.svg"'
+        return Response(profile.flamegraph(title), media_type="image/svg+xml", headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.txt"'
+    return Response(profile.collapsed(), media_type="text/plain", headers=headers)
+
+@router.post("/memory/start", dependencies=[Depends(require_admin)])
+def start_memory_tracing(frames: int = Query(1, ge=1, le=50, description="Frames kept per allocation (needed for group_by=traceback)")):
+    """Start tracemalloc on this worker; allocations are slower until it is stopped"""
+    try:
+        memory_profiler.start(frames)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"tracing": True, "frames": frames}
+
+@router.post("/memory/stop", dependencies=[Depends(require_admin)])
+def stop_memory_tracing():
+    """Stop tracemalloc and drop its traces"""
+    memory_profiler.stop()
+    return {"tracing": False}
+
+@router.get(
+    "/memory/snapshot", response_model=MemorySnapshot, response_model_exclude_none=True,
+    dependencies=[Depends(require_admin)],
+)
+def memory_snapshot(
+    limit: int = Query(25, ge=1, le=500, description="Number of allocators to return"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    compare: bool = Query(False, description="Report growth since this worker's previous snapshot"),
+):
+    """Top allocators by size since tracing started"""
+    try:
+        return memory_profiler.snapshot(limit, group_by, compare)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -18,11 +18,14 @@ async def get_prioritized_news_feed(
         if use_cache:
             articles = await news_aggregator.get_cached_prioritized_feed(limit)
         else:
-            articles = await news_aggregator.get_merged_prioritized_feed(limit)
+            # Concurrent uncached requests share one rebuild
+            snapshot = await news_aggregator.refresh_prioritized_feed()
+            articles = snapshot["articles"][:limit]
         
         return {
             "status": "success",
             "total_articles": len(articles),
+            **news_aggregator.prioritized_feed_info,
             "articles": articles,
             "sections": {
                 "india_headlines": len([a for a in articles if a.get("section") == "India Headlines"]),
@@ -73,22 +76,27 @@ async def get_countries_with_indian_presence(
         all_articles = []
         country_results = {}
         
-        for country_code in country_codes:
-            if country_code in news_aggregator.priority_countries:
-                country_news = await news_aggregator.fetch_country_news(country_code, limit_per_country)
-                country_info = news_aggregator.priority_countries[country_code]
-                
-                # Add metadata to articles
-                for article in country_news:
-                    article["country"] = country_code
-                    article["country_name"] = country_info["name"]
-                    article["priority"] = country_info["priority"]
-                
-                all_articles.extend(country_news)
-                country_results[country_code] = {
-                    "name": country_info["name"],
-                    "articles_count": len(country_news)
-                }
+        # All requested countries are fetched together
+        news_by_country = await news_aggregator.fetch_countries_news({
+            country_code: limit_per_country
+            for country_code in country_codes
+            if country_code in news_aggregator.priority_countries
+        })
+        
+        for country_code, country_news in news_by_country.items():
+            country_info = news_aggregator.priority_countries[country_code]
+            
+            # Add metadata to articles
+            for article in country_news:
+                article["country"] = country_code
+                article["country_name"] = country_info["name"]
+                article["priority"] = country_info["priority"]
+            
+            all_articles.extend(country_news)
+            country_results[country_code] = {
+                "name": country_info["name"],
+                "articles_count": len(country_news)
+            }
         
         # Sort by priority and date
         all_articles.sort(key=lambda x: (x.get("priority", 999), x.get("published_at", "")), reverse=True)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database.database import get_db
+from database.database import get_db, get_async_read_db
 from database.models import Article, FactCheck
 from services.fact_check_service import FactCheckService
 from pydantic import BaseModel
@@ -114,10 +116,11 @@ async def fact_check_url(
 @router.get("/{fact_check_id}", response_model=FactCheckResponse)
 async def get_fact_check(
     fact_check_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific fact-check by ID"""
-    fact_check = db.query(FactCheck).filter(FactCheck.id == fact_check_id).first()
+    result = await db.execute(select(FactCheck).where(FactCheck.id == fact_check_id))
+    fact_check = result.scalars().first()
     if not fact_check:
         raise HTTPException(status_code=404, detail="Fact check not found")
     
@@ -133,10 +136,11 @@ async def get_fact_check(
 @router.get("/article/{article_id}", response_model=List[FactCheckResponse])
 async def get_article_fact_checks(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get all fact-checks for a specific article"""
-    fact_checks = db.query(FactCheck).filter(FactCheck.article_id == article_id).all()
+    result = await db.execute(select(FactCheck).where(FactCheck.article_id == article_id))
+    fact_checks = result.scalars().all()
     
     return [
         FactCheckResponse(
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from database.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional
+from database.database import get_async_read_db
 from database.models import Article, NewsSource
 from services.news_service import NewsService
+from services.archive_service import ArchiveService
+from services.search_service import SearchService
+from services.embedding_index import embedding_index, article_text
+from services.feed_snapshot_service import FeedSnapshotService, format_country_article
+from services.live_feed import live_feed
+from utils.serialization import RawJSONResponse, article_record, article_records
+from utils.tracing import span
 from pydantic import BaseModel
 from datetime import datetime
+from urllib.parse import parse_qs
+import orjson
+from starlette.datastructures import Headers
+import asyncio
 
 router = APIRouter()
 
@@ -43,13 +57,56 @@ class CountryNewsResponse(BaseModel):
     total_count: int
     api_sources: List[str]
 
+country_snapshots = FeedSnapshotService(response_model=CountryNewsResponse, article_model=ArticleResponse)
+
+def resolve_country_etag(scope) -> Optional[str]:
+    """ETag of the current snapshot for a country request, without running the endpoint"""
+    snapshot = country_snapshots.get(scope["path"].rstrip("/").rsplit("/", 1)[-1])
+    if snapshot is None:
+        return None
+    limit = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("limit", ["100"])[0]
+    try:
+        limit = int(limit)
+    except ValueError:
+        return None
+    encoding = snapshot.encoding_for(limit, Headers(scope=scope).get("accept-encoding"))
+    return snapshot.etag(limit, encoding)
+
+class SearchResult(ArticleResponse):
+    rank: float
+    title_highlight: Optional[str]
+    summary_highlight: Optional[str]
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    total_count: int
+
+class RelatedArticle(ArticleResponse):
+    similarity: float
+    political_lean: Optional[str]
+
+class RelatedCoverageResponse(BaseModel):
+    article_id: int
+    related: List[RelatedArticle]
+    coverage: Dict[str, List[RelatedArticle]]
+    total_count: int
+
+class ArchivedArticleResponse(ArticleResponse):
+    partition: str
+
+class ArchiveResponse(BaseModel):
+    articles: List[ArchivedArticleResponse]
+    total_count: int
+    partitions: List[str]
+
 @router.get("/", response_model=NewsResponse)
 async def get_news(
     topic: Optional[str] = Query(None, description="Filter by topic"),
     source: Optional[str] = Query(None, description="Filter by source"),
     limit: int = Query(20, description="Number of articles to return"),
     offset: int = Query(0, description="Number of articles to skip"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get aggregated news articles with optional filtering"""
     try:
@@ -57,14 +114,14 @@ async def get_news(
         articles = await news_service.get_aggregated_news(db, topic, source, limit, offset)
         
         # Get unique topics for filtering
-        topics = db.query(Article.topic).distinct().all()
-        topics = [topic[0] for topic in topics if topic[0]]
+        result = await db.execute(select(Article.topic).distinct())
+        topics = [topic for topic in result.scalars().all() if topic]
         
-        return NewsResponse(
-            articles=articles,
-            total_count=len(articles),
-            topics=topics
-        )
+        return ORJSONResponse({
+            "articles": article_records(articles),
+            "total_count": len(articles),
+            "topics": topics
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching news: {str(e)}")
 
@@ -75,7 +132,7 @@ async def get_enhanced_news_feed(
     limit: int = Query(50, description="Number of articles to return"),
     offset: int = Query(0, description="Number of articles to skip"),
     focus_indian: bool = Query(True, description="Focus on Indian news"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get enhanced news feed with focus on Indian news from multiple APIs"""
     try:
@@ -89,78 +146,53 @@ async def get_enhanced_news_feed(
         international_count = len(articles) - indian_count
         api_sources = list(set(article.get('api_source', 'unknown') for article in articles if article.get('api_source')))
         
-        return EnhancedNewsResponse(
-            articles=articles,
-            total_count=len(articles),
-            indian_count=indian_count,
-            international_count=international_count,
-            api_sources=api_sources
-        )
+        with span("serialize", articles=len(articles)):
+            return ORJSONResponse({
+                "articles": article_records(articles),
+                "total_count": len(articles),
+                "indian_count": indian_count,
+                "international_count": international_count,
+                "api_sources": api_sources
+            })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching enhanced news: {str(e)}")
 
 @router.get("/country/{country_code}", response_model=CountryNewsResponse)
 async def get_country_news(
     country_code: str,
-    limit: int = Query(100, description="Number of articles to return"),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, description="Number of articles to return, rounded up to the nearest page size (SNAPSHOT_LIMIT_BUCKETS)"),
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False)
 ):
     """Get news for specific country from all APIs and RSS feeds"""
     try:
-        news_service = NewsService()
-        raw_articles = await news_service.fetch_news_by_country(country_code)
-        
-        # Convert raw articles to ArticleResponse format
-        formatted_articles = []
-        for article in raw_articles[:limit]:
-            # Ensure all string fields have valid values
-            title = article.get('title', '') or 'No Title'
-            description = article.get('description', '') or ''
-            content = article.get('content', description) or description or 'No content available'
-            url = article.get('url', '') or ''
-            source = article.get('source', '') or 'Unknown Source'
-            
-            # Handle datetime parsing
-            published_at = article.get('published_at')
-            if published_at and isinstance(published_at, str):
-                # Remove timezone info if present to avoid parsing errors
-                if '+' in published_at:
-                    published_at = published_at.split('+')[0].strip()
-                elif 'Z' in published_at:
-                    published_at = published_at.replace('Z', '').strip()
-            
-            formatted_article = {
-                'id': None,  # API articles don't have database IDs
-                'title': title,
-                'content': content,
-                'url': url,
-                'published_at': published_at,
-                'topic': 'general',  # Default topic for API articles
-                'summary': description[:200] if description else 'No summary available',
-                'source_name': source,
-                'source_bias_score': 0.0,  # Default bias score
-                'is_indian': country_code.lower() == 'in',
-                'api_source': article.get('api_source', 'unknown')
-            }
-            formatted_articles.append(formatted_article)
-        
-        # Get unique API sources
-        api_sources = list(set(article.get('api_source', 'unknown') for article in raw_articles if article.get('api_source')))
-        
-        return CountryNewsResponse(
-            country=country_code,
-            articles=formatted_articles,
-            total_count=len(formatted_articles),
-            api_sources=api_sources
-        )
+        snapshot = await country_snapshots.get_or_build(country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching news for {country_code}: {str(e)}")
+    
+    encoding = snapshot.encoding_for(limit, accept_encoding)
+    headers = {"ETag": snapshot.etag(limit, encoding), "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return RawJSONResponse(snapshot.body(limit, encoding), headers=headers)
+
+@router.get("/country/{country_code}/stream")
+async def stream_country_news(country_code: str):
+    """Country news as NDJSON: one record per article as each provider returns, then a summary record"""
+    async def records():
+        async for record in NewsService().stream_news_by_country(country_code):
+            if record["type"] == "article":
+                record["article"] = article_record(format_country_article(record["article"], country_code))
+            yield orjson.dumps(record) + b"\n"
+    
+    return StreamingResponse(records(), media_type="application/x-ndjson", headers={"Cache-Control": "no-store"})
 
 @router.get("/indian", response_model=EnhancedNewsResponse)
 async def get_indian_news(
     limit: int = Query(50, description="Number of articles to return"),
     offset: int = Query(0, description="Number of articles to skip"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get Indian news specifically from all APIs"""
     try:
@@ -175,13 +207,13 @@ async def get_indian_news(
         # Calculate statistics
         api_sources = list(set(article.get('api_source', 'unknown') for article in indian_articles if article.get('api_source')))
         
-        return EnhancedNewsResponse(
-            articles=indian_articles,
-            total_count=len(indian_articles),
-            indian_count=len(indian_articles),
-            international_count=0,
-            api_sources=api_sources
-        )
+        return ORJSONResponse({
+            "articles": article_records(indian_articles),
+            "total_count": len(indian_articles),
+            "indian_count": len(indian_articles),
+            "international_count": 0,
+            "api_sources": api_sources
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching Indian news: {str(e)}")
 
@@ -189,7 +221,7 @@ async def get_indian_news(
 async def get_international_news(
     limit: int = Query(50, description="Number of articles to return"),
     offset: int = Query(0, description="Number of articles to skip"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get international news from multiple APIs"""
     try:
@@ -206,26 +238,27 @@ async def get_international_news(
         # Calculate statistics
         api_sources = list(set(article.get('api_source', 'unknown') for article in international_articles if article.get('api_source')))
         
-        return EnhancedNewsResponse(
-            articles=international_articles,
-            total_count=len(international_articles),
-            indian_count=0,
-            international_count=len(international_articles),
-            api_sources=api_sources
-        )
+        return ORJSONResponse({
+            "articles": article_records(international_articles),
+            "total_count": len(international_articles),
+            "indian_count": 0,
+            "international_count": len(international_articles),
+            "api_sources": api_sources
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching international news: {str(e)}")
 
 @router.get("/topics")
-async def get_topics(db: Session = Depends(get_db)):
+async def get_topics(db: AsyncSession = Depends(get_async_read_db)):
     """Get all available topics"""
-    topics = db.query(Article.topic).distinct().all()
-    return {"topics": [topic[0] for topic in topics if topic[0]]}
+    result = await db.execute(select(Article.topic).distinct())
+    return {"topics": [topic for topic in result.scalars().all() if topic]}
 
 @router.get("/sources")
-async def get_sources(db: Session = Depends(get_db)):
+async def get_sources(db: AsyncSession = Depends(get_async_read_db)):
     """Get all news sources with their bias scores"""
-    sources = db.query(NewsSource).all()
+    result = await db.execute(select(NewsSource))
+    sources = result.scalars().all()
     return {
         "sources": [
             {
@@ -239,10 +272,96 @@ async def get_sources(db: Session = Depends(get_db)):
         ]
     }
 
+@router.get("/search", response_model=SearchResponse)
+async def search_news(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    country: Optional[str] = Query(None, description="Filter by source country code"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    start: Optional[datetime] = Query(None, description="Earliest publication date"),
+    end: Optional[datetime] = Query(None, description="Latest publication date"),
+    limit: int = Query(20, le=100, description="Number of results to return"),
+    offset: int = Query(0, description="Number of results to skip"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Full-text search over headlines and summaries, ranked by relevance with highlighted matches"""
+    try:
+        rows = await SearchService(db).search(q, country, source, start, end, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    results = [
+        article_record(
+            row,
+            source_name=row["source_name"] or "Unknown Source",
+            is_indian=row["source_country"] == "in",
+            api_source="database",
+            rank=row["rank"],
+            title_highlight=row["title_highlight"],
+            summary_highlight=row["summary_highlight"]
+        )
+        for row in rows
+    ]
+    
+    return ORJSONResponse({"query": q, "results": results, "total_count": len(results)})
+
+@router.get("/archive", response_model=ArchiveResponse)
+async def get_archived_news(
+    start: Optional[datetime] = Query(None, description="Earliest publication date"),
+    end: Optional[datetime] = Query(None, description="Latest publication date"),
+    topic: Optional[str] = Query(None, description="Filter by topic"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    country: Optional[str] = Query(None, description="Filter by source country code"),
+    limit: int = Query(50, description="Number of articles to return")
+):
+    """Query articles that the retention job moved to compressed archive partitions"""
+    archive_service = ArchiveService()
+    records = await asyncio.to_thread(archive_service.query, start, end, topic, source, country, limit)
+    
+    articles = [
+        article_record(
+            record,
+            source_name=(record.get("source") or {}).get("name") or "Unknown Source",
+            source_bias_score=(record.get("source") or {}).get("bias_score"),
+            is_indian=(record.get("source") or {}).get("country") == "in",
+            api_source="archive",
+            partition=record["partition"]
+        )
+        for record in records
+    ]
+    
+    return ORJSONResponse({
+        "articles": articles,
+        "total_count": len(articles),
+        "partitions": [partition["partition"] for partition in archive_service.list_partitions()]
+    })
+
+@router.get("/stream")
+async def stream_news(
+    country: Optional[str] = Query(None, description="Only articles ingested for this country code"),
+    topic: Optional[str] = Query(None, description="Filter by topic"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event id (sent by EventSource on reconnect)")
+):
+    """Server-Sent Events stream of newly ingested articles"""
+    if country:
+        # The snapshot refresh loop is what ingests new articles for a country
+        country = country_snapshots.warm(country)
+        if country is None:
+            raise HTTPException(status_code=404, detail="Unsupported country")
+    subscription = live_feed.subscribe(country, topic, source, last_event_id)
+    return StreamingResponse(
+        live_feed.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{article_id}", response_model=ArticleResponse)
-async def get_article(article_id: int, db: Session = Depends(get_db)):
+async def get_article(article_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific article by ID"""
-    article = db.query(Article).filter(Article.id == article_id).first()
+    result = await db.execute(
+        select(Article).options(selectinload(Article.source)).where(Article.id == article_id)
+    )
+    article = result.scalars().first()
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
@@ -257,3 +376,47 @@ async def get_article(article_id: int, db: Session = Depends(get_db)):
         source_name=article.source.name,
         source_bias_score=article.source.bias_score
     )
+
+@router.get("/{article_id}/related", response_model=RelatedCoverageResponse)
+async def get_related_coverage(
+    article_id: int,
+    k: int = Query(10, le=50, description="Number of related articles to return"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Articles covering the same story, grouped by the outlet's political lean"""
+    result = await db.execute(select(Article.title, Article.summary).where(Article.id == article_id))
+    article = result.first()
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    neighbours = embedding_index.related(article_id, k, text=article_text(article.title, article.summary))
+    similarity_by_id = dict(neighbours)
+    
+    related = []
+    if neighbours:
+        result = await db.execute(
+            select(Article).options(selectinload(Article.source)).where(Article.id.in_(similarity_by_id.keys()))
+        )
+        for related_article in result.scalars().all():
+            source = related_article.source
+            related.append(article_record(
+                {column.name: getattr(related_article, column.name) for column in Article.__table__.columns},
+                source_name=source.name if source else "Unknown Source",
+                source_bias_score=source.bias_score if source else None,
+                is_indian=bool(source and source.country == "in"),
+                api_source="database",
+                similarity=similarity_by_id[related_article.id],
+                political_lean=source.political_lean if source else None
+            ))
+    related.sort(key=lambda item: item["similarity"], reverse=True)
+    
+    coverage = {"left": [], "center": [], "right": []}
+    for item in related:
+        coverage.setdefault(item["political_lean"] or "unknown", []).append(item)
+    
+    return ORJSONResponse({
+        "article_id": article_id,
+        "related": related,
+        "coverage": coverage,
+        "total_count": len(related)
+    })
@@ -0,0 +1,270 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from config import Config
+from database.database import SessionLocal
+from database.models import (
+    Article,
+    BiasAnalysis,
+    FactCheck,
+    FakeNewsDetection,
+    SentimentAnalysis,
+    UserFeedback,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """Moves cold articles out of the hot tables into monthly compressed partitions.
+
+    Every partition is a gzip-compressed NDJSON file (``articles-YYYY-MM.jsonl.gz``)
+    holding one record per article together with its analyses, fact checks and
+    feedback. Partitions are only ever appended to, and can be queried on demand
+    without restoring them into the database. Every worker runs the retention
+    loop, so a run only proceeds while it holds the archive directory's lock.
+    """
+
+    FILE_PREFIX = "articles-"
+    FILE_SUFFIX = ".jsonl.gz"
+    LOCK_FILE = ".retention.lock"
+
+    def __init__(self, archive_dir: Optional[str] = None, retention_days: Optional[int] = None):
+        self.archive_dir = archive_dir or Config.ARCHIVE_DIR
+        self.retention_days = retention_days if retention_days is not None else Config.ARTICLE_RETENTION_DAYS
+
+    @staticmethod
+    def partition_key(published_at: datetime) -> str:
+        """Monthly partition key for a publication date, e.g. '2024-05'"""
+        return published_at.strftime("%Y-%m")
+
+    def partition_path(self, key: str) -> str:
+        return os.path.join(self.archive_dir, f"{self.FILE_PREFIX}{key}{self.FILE_SUFFIX}")
+
+    def list_partitions(self) -> List[Dict]:
+        """List archived partitions, newest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+
+        partitions = []
+        for filename in os.listdir(self.archive_dir):
+            if filename.startswith(self.FILE_PREFIX) and filename.endswith(self.FILE_SUFFIX):
+                key = filename[len(self.FILE_PREFIX):-len(self.FILE_SUFFIX)]
+                path = os.path.join(self.archive_dir, filename)
+                partitions.append({"partition": key, "size_bytes": os.path.getsize(path)})
+        partitions.sort(key=lambda p: p["partition"], reverse=True)
+        return partitions
+
+    @contextmanager
+    def exclusive(self) -> Iterator[bool]:
+        """Non-blocking lock on the archive shared by every process; yields whether it was acquired"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with open(os.path.join(self.archive_dir, self.LOCK_FILE), "a+b") as lock_file:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def run_retention(self, db: Session, now: Optional[datetime] = None, batch_size: int = 500) -> Dict[str, int]:
+        """Archive and delete articles published before the retention window.
+
+        Records are written to their partition before the rows are deleted, so an
+        interrupted run can at worst archive an article twice, never lose it.
+        Nothing happens while another worker's run holds the lock.
+
+        Returns:
+            Number of archived articles per partition key
+        """
+        if self.retention_days <= 0:
+            return {}
+
+        with self.exclusive() as acquired:
+            if not acquired:
+                logger.info("Article retention is already running in another worker, skipping")
+                return {}
+            cutoff = self._naive((now or datetime.now(timezone.utc)) - timedelta(days=self.retention_days))
+            return self._archive_before(db, cutoff, batch_size)
+
+    def _archive_before(self, db: Session, cutoff: datetime, batch_size: int) -> Dict[str, int]:
+        archived = defaultdict(int)
+
+        while True:
+            articles = (
+                db.query(Article)
+                .options(
+                    selectinload(Article.source),
+                    selectinload(Article.bias_analyses),
+                    selectinload(Article.fact_checks),
+                    selectinload(Article.user_feedbacks),
+                )
+                .filter(Article.published_at < cutoff)
+                .order_by(Article.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not articles:
+                break
+
+            article_ids = [article.id for article in articles]
+            sentiments = self._rows_by_article(db, SentimentAnalysis, article_ids)
+            detections = self._rows_by_article(db, FakeNewsDetection, article_ids)
+
+            partitions = defaultdict(list)
+            for article in articles:
+                record = self._row_to_dict(article)
+                record["source"] = self._row_to_dict(article.source) if article.source else None
+                record["bias_analyses"] = [self._row_to_dict(row) for row in article.bias_analyses]
+                record["fact_checks"] = [self._row_to_dict(row) for row in article.fact_checks]
+                record["user_feedbacks"] = [self._row_to_dict(row) for row in article.user_feedbacks]
+                record["sentiment_analyses"] = [self._row_to_dict(row) for row in sentiments.get(article.id, [])]
+                record["fake_news_detections"] = [self._row_to_dict(row) for row in detections.get(article.id, [])]
+                partitions[self.partition_key(article.published_at)].append(record)
+
+            for key, records in partitions.items():
+                # Appending a new gzip member keeps earlier members readable
+                with gzip.open(self.partition_path(key), "at", encoding="utf-8") as archive_file:
+                    for record in records:
+                        archive_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                archived[key] += len(records)
+
+            for model in (BiasAnalysis, FactCheck, UserFeedback, SentimentAnalysis, FakeNewsDetection):
+                db.query(model).filter(model.article_id.in_(article_ids)).delete(synchronize_session=False)
+            db.query(Article).filter(Article.id.in_(article_ids)).delete(synchronize_session=False)
+            db.commit()
+
+        if archived:
+            logger.info(f"Archived {sum(archived.values())} articles older than {cutoff:%Y-%m-%d} into {dict(archived)}")
+        return dict(archived)
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        topic: Optional[str] = None,
+        source: Optional[str] = None,
+        country: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """Search archived articles, newest first, reading only the partitions in range"""
+        start = self._naive(start)
+        end = self._naive(end)
+        start_key = self.partition_key(start) if start else None
+        end_key = self.partition_key(end) if end else None
+        topic = topic.lower() if topic else None
+        source = source.lower() if source else None
+        country = country.lower() if country else None
+
+        results = []
+        for partition in self.list_partitions():
+            key = partition["partition"]
+            if (end_key and key > end_key) or (start_key and key < start_key):
+                continue
+            # Partitions are scanned newest first, so once a full partition has
+            # filled the page no older partition can contain newer articles.
+            if len(results) >= limit:
+                break
+
+            for record in self._read_partition(key):
+                published_at = self._naive(datetime.fromisoformat(record["published_at"]))
+                if start and published_at < start:
+                    continue
+                if end and published_at > end:
+                    continue
+                if topic and topic not in (record.get("topic") or "").lower():
+                    continue
+                record_source = record.get("source") or {}
+                if source and source not in (record_source.get("name") or "").lower():
+                    continue
+                if country and country != (record_source.get("country") or "").lower():
+                    continue
+                record["partition"] = key
+                results.append(record)
+
+        results.sort(key=lambda record: record["published_at"], reverse=True)
+        return results[:limit]
+
+    def _read_partition(self, key: str) -> Iterator[Dict]:
+        try:
+            with gzip.open(self.partition_path(key), "rt", encoding="utf-8") as archive_file:
+                for line in archive_file:
+                    if line.strip():
+                        yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile) as e:
+            # A retention run may still be appending the last member
+            logger.warning(f"Stopped reading partition {key} early: {e}")
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        # Stored timestamps are naive UTC, so convert before dropping the offset
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+
+    @staticmethod
+    def _rows_by_article(db: Session, model, article_ids: List[int]) -> Dict[int, list]:
+        rows = defaultdict(list)
+        for row in db.query(model).filter(model.article_id.in_(article_ids)).all():
+            rows[row.article_id].append(row)
+        return rows
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict:
+        data = {}
+        for column in row.__table__.columns:
+            value = getattr(row, column.name)
+            data[column.name] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+
+def _run_retention_once(service: ArchiveService) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return service.run_retention(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_retention_loop(interval_hours: int):
+    """Periodically archive cold articles; the work runs in a thread to keep the loop free"""
+    service = ArchiveService()
+    while True:
+        try:
+            await asyncio.to_thread(_run_retention_once, service)
+        except Exception as e:
+            logger.error(f"Article retention run failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
+
+
+def start_retention_job() -> Optional[asyncio.Task]:
+    """Start the retention loop unless retention is disabled"""
+    if Config.ARTICLE_RETENTION_DAYS <= 0:
+        return None
+    return asyncio.create_task(run_retention_loop(Config.ARCHIVE_INTERVAL_HOURS))
@@ -0,0 +1,345 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import Config
+from database.database import SessionLocal
+from database.models import Article
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "over", "said", "says", "that", "the", "to", "was", "were",
+    "will", "with", "after", "amid", "into", "new", "news",
+}
+
+
+class HashingEmbedder:
+    """Hashed TF-IDF embeddings: no vocabulary to store, fixed dimension, CPU only.
+
+    Unigrams and bigrams are hashed into ``dim`` signed buckets; IDF weights are
+    learned per bucket when the index is built.
+    """
+
+    def __init__(self, dim: int, idf: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.idf = idf if idf is not None else np.ones(dim, dtype=np.float32)
+
+    def features(self, text: str) -> Dict[int, float]:
+        tokens = [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+        grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+        counts: Dict[int, float] = {}
+        for gram in grams:
+            hashed = zlib.crc32(gram.encode("utf-8"))
+            index = hashed % self.dim
+            sign = 1.0 if hashed & 0x80000000 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+        return counts
+
+    def fit_idf(self, feature_sets: Sequence[Dict[int, float]]):
+        document_frequency = np.zeros(self.dim, dtype=np.float32)
+        for features in feature_sets:
+            document_frequency[list(features.keys())] += 1
+        total = len(feature_sets)
+        self.idf = (np.log((1 + total) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    def vectorize(self, features: Dict[int, float]) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for index, value in features.items():
+            # Sublinear tf keeps a repeated word from dominating a headline
+            vector[index] = np.sign(value) * (1 + np.log(abs(value))) if value else 0.0
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.vectorize(self.features(text))
+
+
+class _IndexState:
+    """An immutable, loaded index generation; rebuilds swap in a new one"""
+
+    def __init__(self, ids: np.ndarray, vectors: np.ndarray, signatures: np.ndarray, embedder: HashingEmbedder):
+        self.ids = ids
+        self.vectors = vectors
+        self.signatures = signatures
+        self.embedder = embedder
+        self.row_by_id = {int(article_id): row for row, article_id in enumerate(ids)}
+        self.buckets: List[Dict[int, np.ndarray]] = []
+        for table in range(signatures.shape[1]):
+            column = signatures[:, table]
+            order = np.argsort(column, kind="stable")
+            values, starts = np.unique(column[order], return_index=True)
+            ends = list(starts[1:]) + [len(order)]
+            self.buckets.append({int(value): order[start:end] for value, start, end in zip(values, starts, ends)})
+
+
+class EmbeddingIndex:
+    """Memory-mapped article embeddings with a random-hyperplane LSH for ANN lookups.
+
+    Each build is written to its own ``gen-*`` directory under ``index_dir``
+    (``ids.npy``, ``vectors.npy`` and ``signatures.npy``, all opened with mmap,
+    plus ``idf.npy``) and published by atomically replacing ``manifest.json``,
+    so readers in any worker always map one complete generation. A file lock
+    lets a single worker build at a time.
+    """
+
+    BRUTE_FORCE_LIMIT = 4096
+    MANIFEST = "manifest.json"
+    LOCK_FILE = ".build.lock"
+    ARRAYS = ("ids", "vectors", "signatures", "idf")
+
+    def __init__(self, index_dir: Optional[str] = None, dim: Optional[int] = None, tables: int = 8, bits: int = 12):
+        self.index_dir = index_dir or Config.EMBEDDING_INDEX_DIR
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.tables = tables
+        self.bits = bits
+        # Hyperplanes are derived from a fixed seed so they never need to be stored
+        self.planes = np.random.default_rng(1729).standard_normal((tables, bits, self.dim)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(bits)).astype(np.int64)
+        self._state: Optional[_IndexState] = None
+        self._generation: Optional[str] = None
+        self._build_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._state.ids) if self._state else 0
+
+    def signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """LSH signature per table: one bit per hyperplane the vector lies above"""
+        projections = np.einsum("tbd,nd->ntb", self.planes, vectors) > 0
+        return (projections * self._bit_weights).sum(axis=2).astype(np.int64)
+
+    @contextmanager
+    def exclusive(self) -> Iterator[bool]:
+        """Non-blocking build lock shared by every process; yields whether it was acquired"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._build_lock, open(os.path.join(self.index_dir, self.LOCK_FILE), "a+b") as lock_file:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def build(self, documents: Sequence[Tuple[int, str]]) -> int:
+        """Embed (article_id, text) pairs, publish them as a new generation and load it.
+
+        Callers running in several processes should hold ``exclusive()``.
+        """
+        embedder = HashingEmbedder(self.dim)
+        feature_sets = [embedder.features(text) for _, text in documents]
+        embedder.fit_idf(feature_sets)
+
+        ids = np.array([article_id for article_id, _ in documents], dtype=np.int64)
+        vectors = np.zeros((len(documents), self.dim), dtype=np.float32)
+        for row, features in enumerate(feature_sets):
+            vectors[row] = embedder.vectorize(features)
+        signatures = self.signatures(vectors) if len(documents) else np.zeros((0, self.tables), dtype=np.int64)
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        previous = self.read_manifest()
+        build_dir = tempfile.mkdtemp(prefix=".build-", dir=self.index_dir)
+        arrays = {"ids": ids, "vectors": vectors, "signatures": signatures, "idf": embedder.idf}
+        for name in self.ARRAYS:
+            np.save(os.path.join(build_dir, f"{name}.npy"), arrays[name])
+        generation = f"gen-{time.time_ns()}-{os.getpid()}"
+        os.rename(build_dir, os.path.join(self.index_dir, generation))
+
+        manifest = {
+            "generation": generation, "built_at": time.time(), "count": len(ids),
+            "dim": self.dim, "tables": self.tables, "bits": self.bits,
+        }
+        # Readers see the old manifest or the new one, never a mix of generations
+        fd, temp_path = tempfile.mkstemp(prefix=".manifest-", dir=self.index_dir)
+        with os.fdopen(fd, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(temp_path, os.path.join(self.index_dir, self.MANIFEST))
+
+        self._remove_old_generations(keep={generation, previous and previous.get("generation")})
+        self.load()
+        return len(ids)
+
+    def _remove_old_generations(self, keep: set):
+        # The previous generation stays for workers that still have it mapped
+        for entry in os.listdir(self.index_dir):
+            if entry in keep or entry in (self.MANIFEST, self.LOCK_FILE):
+                continue
+            path = os.path.join(self.index_dir, entry)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                # Files of the old single-directory layout and leftovers of interrupted builds
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def read_manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.index_dir, self.MANIFEST)) as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the published generation was built, or None if there is none"""
+        manifest = self.read_manifest()
+        return time.time() - manifest["built_at"] if manifest else None
+
+    def load(self) -> bool:
+        """Map the published generation into memory; returns False if there is none"""
+        manifest = self.read_manifest()
+        if manifest is None:
+            return False
+        if (manifest["dim"], manifest["tables"], manifest["bits"]) != (self.dim, self.tables, self.bits):
+            logger.info("Embedding index layout changed, it will be rebuilt")
+            return False
+        generation = manifest["generation"]
+        if generation == self._generation:
+            return True
+        generation_dir = os.path.join(self.index_dir, generation)
+
+        def mapped(name):
+            return np.load(os.path.join(generation_dir, f"{name}.npy"), mmap_mode="r")
+
+        embedder = HashingEmbedder(self.dim, np.load(os.path.join(generation_dir, "idf.npy")))
+        self._state = _IndexState(mapped("ids"), mapped("vectors"), mapped("signatures"), embedder)
+        self._generation = generation
+        return True
+
+    def embed(self, text: str) -> np.ndarray:
+        embedder = self._state.embedder if self._state else HashingEmbedder(self.dim)
+        return embedder.embed(text)
+
+    def related(
+        self, article_id: int, k: int = 10, text: Optional[str] = None, min_similarity: float = 0.1
+    ) -> List[Tuple[int, float]]:
+        """Nearest stored articles as (article_id, cosine similarity), best first.
+
+        ``text`` is embedded on the fly when the article is newer than the index.
+        """
+        state = self._state
+        if state is None or not len(state.ids):
+            return []
+
+        row = state.row_by_id.get(article_id)
+        if row is not None:
+            query = np.asarray(state.vectors[row])
+        elif text:
+            query = state.embedder.embed(text)
+        else:
+            return []
+
+        candidates = self._candidates(state, query, k)
+        scores = np.asarray(state.vectors[candidates]) @ query
+        order = np.argsort(-scores)
+
+        results = []
+        for position in order:
+            candidate_id = int(state.ids[candidates[position]])
+            score = float(scores[position])
+            if candidate_id == article_id:
+                continue
+            if score < min_similarity or len(results) >= k:
+                break
+            results.append((candidate_id, round(score, 4)))
+        return results
+
+    def _candidates(self, state: _IndexState, query: np.ndarray, k: int) -> np.ndarray:
+        if len(state.ids) <= self.BRUTE_FORCE_LIMIT:
+            return np.arange(len(state.ids))
+
+        signature = self.signatures(query[np.newaxis, :])[0]
+        found = [state.buckets[table].get(int(signature[table])) for table in range(self.tables)]
+        candidates = np.unique(np.concatenate([bucket for bucket in found if bucket is not None] or [np.array([], dtype=np.int64)]))
+        if len(candidates) < k * 4:
+            # Multi-probe: also look in the neighbouring buckets one bit away
+            probes = [
+                state.buckets[table].get(int(signature[table] ^ (1 << bit)))
+                for table in range(self.tables)
+                for bit in range(self.bits)
+            ]
+            candidates = np.unique(np.concatenate([candidates] + [probe for probe in probes if probe is not None]))
+        return candidates
+
+
+embedding_index = EmbeddingIndex()
+
+
+def article_text(title: Optional[str], summary: Optional[str]) -> str:
+    # Headlines carry most of the signal, so they are counted twice
+    return f"{title or ''} {title or ''} {summary or ''}"
+
+
+def build_index_from_database() -> int:
+    """(Re)build the shared index from every stored article's title and summary"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Article.id, Article.title, Article.summary).all()
+    finally:
+        db.close()
+    count = embedding_index.build([(row.id, article_text(row.title, row.summary)) for row in rows])
+    logger.info(f"Embedding index built with {count} articles")
+    return count
+
+
+def refresh_index(max_age: float) -> bool:
+    """Rebuild the index if it is older than max_age, unless another worker is already at it,
+    then load the published generation. Returns False when the rebuild was left to another worker.
+    """
+    with embedding_index.exclusive() as acquired:
+        if acquired:
+            age = embedding_index.age()
+            if age is None or age >= max_age or not embedding_index.load():
+                build_index_from_database()
+                return True
+    embedding_index.load()
+    return acquired
+
+
+async def run_index_refresh_loop(interval_minutes: int):
+    """Keep the index fresh off the event loop; one worker rebuilds and the others pick up its generation"""
+    interval = interval_minutes * 60
+    while True:
+        try:
+            current = await asyncio.to_thread(refresh_index, interval)
+        except Exception as e:
+            logger.error(f"Embedding index refresh failed: {e}")
+            current = True
+        # Another worker is building: load its generation as soon as it is published
+        await asyncio.sleep(interval if current else min(interval, 30))
+
+
+def start_embedding_index() -> asyncio.Task:
+    return asyncio.create_task(run_index_refresh_loop(Config.EMBEDDING_REBUILD_MINUTES))
@@ -1,13 +1,17 @@
-import httpx
 import os
 import traceback
 import asyncio
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import time
+from datetime import datetime, timedelta, timezone
 import json
-import feedparser
-from dateutil import parser
-from utils.cache import cache
+import orjson
+from config import Config
+from utils.cache import cache, async_redis_client
+from utils.metrics import record_dedup, record_provider_fetch
+from utils.tracing import span
+from services.normalization import normalization_pool, normalize_feed, unique_title_indices, unique_title_indices_batch
+from services.provider_gateway import provider_gateway
 import logging
 from dotenv import load_dotenv
 
@@ -15,6 +19,13 @@ from dotenv import load_dotenv
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PRIORITIZED_FEED_KEY = "prioritized_feed:snapshot"
+PRIORITIZED_FEED_VERSION_KEY = "prioritized_feed:version"
+PRIORITIZED_FEED_LOCK_KEY = "prioritized_feed:refresh_lock"
+PRIORITIZED_FEED_REQUESTED_KEY = "prioritized_feed:last_requested"
+# Workers note demand in Redis at most this often
+REQUEST_MARK_INTERVAL_SECONDS = 30
+
 class EnhancedNewsAggregator:
     def __init__(self):
         # Load environment variables first
@@ -29,6 +40,11 @@ class EnhancedNewsAggregator:
         # Validate API keys
         self._validate_api_keys()
         
+        # Latest prioritized feed snapshot (mirrors the copy in Redis) and the rebuild in flight, if any
+        self._feed_snapshot: Optional[dict] = None
+        self._feed_refresh: Optional[asyncio.Task] = None
+        self._request_marked_at = float("-inf")
+        
         # Country code mapping for validation and normalization
         self.country_code_mapping = {
             # Standard ISO codes
@@ -194,20 +210,23 @@ class EnhancedNewsAggregator:
         
         print("🚀 Starting Enhanced News Aggregation...")
         
-        # Fetch India news first (highest priority)
-        print("\n📍 Fetching India Headlines...")
-        india_news = await self.fetch_country_news("in", limit_per_country)
+        # India is listed first, so its fetches are scheduled ahead of the other countries'
+        limits = {
+            country_code: limit_per_country if country_code == "in" else limit_per_country // 2
+            for country_code in self.priority_countries
+        }
+        news_by_country = await self.fetch_countries_news(limits)
+        
+        india_news = news_by_country["in"]
         results["india_headlines"] = india_news
         print(f"✅ India: {len(india_news)} articles collected")
         
-        # Fetch news from other priority countries
-        print("\n🌍 Fetching News from Countries with Indian Populations...")
+        # News from other priority countries
         other_countries_news = []
         
         for country_code, country_info in self.priority_countries.items():
-            if country_code != "in":  # Skip India as it's already processed
-                print(f"\n📍 Fetching {country_info['name']} news...")
-                country_news = await self.fetch_country_news(country_code, limit_per_country // 2)
+            if country_code != "in":  # India is already processed
+                country_news = news_by_country[country_code]
                 
                 # Add country metadata to each article
                 for article in country_news:
@@ -231,65 +250,111 @@ class EnhancedNewsAggregator:
 
     async def fetch_country_news(self, country_code: str, limit: int = 50) -> List[dict]:
         """Fetch news for a specific country using multiple APIs and RSS feeds"""
-        all_articles = []
-        
-        # Fetch from RSS feeds first (most reliable)
-        rss_articles = await self.fetch_rss_feeds(country_code)
-        all_articles.extend(rss_articles)
-        
-        # Fetch from APIs if available
-        if self.news_api_key:
-            newsapi_articles = await self.fetch_newsapi(country_code)
-            all_articles.extend(newsapi_articles)
+        news_by_country = await self.fetch_countries_news({country_code: limit})
+        return news_by_country[country_code]
+
+    async def fetch_countries_news(self, limits: Dict[str, int]) -> Dict[str, List[dict]]:
+        """
+        Fetch several countries at once, as {country_code: limit} -> {country_code: articles}
+        Every country x source fetch is scheduled together, at most AGGREGATOR_MAX_CONCURRENCY at a time,
+        so the whole batch takes about as long as its slowest source
+        """
+        jobs = [
+            (country_code, name, fetch)
+            for country_code in limits
+            for name, fetch in self.get_country_sources(country_code)
+        ]
+        semaphore = asyncio.Semaphore(Config.AGGREGATOR_MAX_CONCURRENCY)
+        
+        async def run(country_code: str, name: str, fetch: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+            # Feeds share one metrics label so the series count doesn't grow with the feed list
+            provider = "rss" if name.startswith("RSS ") else name.lower()
+            async with semaphore:
+                started = time.perf_counter()
+                with span("provider.fetch", provider=provider, source=name, country=country_code) as current:
+                    try:
+                        articles = await fetch()
+                    except Exception as e:
+                        current.record_exception(e)
+                        record_provider_fetch(provider, country_code, time.perf_counter() - started, 0, failed=True)
+                        raise
+                    current.set_attribute("articles", len(articles))
+                record_provider_fetch(provider, country_code, time.perf_counter() - started, len(articles))
+                return articles
+        
+        results = await asyncio.gather(*(run(*job) for job in jobs), return_exceptions=True)
+        
+        # Articles are merged in job order (RSS first, then the APIs), so deduplication keeps the same winners
+        all_articles: Dict[str, List[dict]] = {country_code: [] for country_code in limits}
+        for (country_code, name, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.warning(f"{name} failed for {country_code}: {result}")
+                continue
+            all_articles[country_code].extend(result)
+        
+        # Remove duplicates, one batch for all countries
+        with span("merge", articles=sum(len(articles) for articles in all_articles.values())):
+            keep_by_country = await normalization_pool.run(unique_title_indices_batch, [
+                [article.get('title', '') for article in all_articles[country_code]] for country_code in limits
+            ])
+        
+        news_by_country = {}
+        for (country_code, limit), keep in zip(limits.items(), keep_by_country):
+            unique_articles = [all_articles[country_code][index] for index in keep]
+            record_dedup("prioritized", len(all_articles[country_code]), len(unique_articles))
+            
+            # Sort by published date (newest first)
+            with span("sort", country=country_code, articles=len(unique_articles)):
+                unique_articles.sort(key=lambda x: x.get('published_at', ''), reverse=True)
+            
+            news_by_country[country_code] = unique_articles[:limit]
+        return news_by_country
+
+    def get_country_sources(self, country_code: str) -> List[Tuple[str, Callable[[], Awaitable[List[dict]]]]]:
+        """Sources to query for a country, as (name, fetch) pairs; each RSS feed is a source of its own"""
+        sources = [
+            (f"RSS {feed['name']}", lambda feed=feed: self.fetch_rss_feed(feed, country_code))
+            for feed in self.rss_feeds.get(country_code, [])
+        ]
         
+        # APIs, if configured
+        if provider_gateway.key_pool('newsapi'):
+            sources.append(("NewsAPI", lambda: self.fetch_newsapi(country_code)))
         if self.gnews_api_key:
-            gnews_articles = await self.fetch_gnews(country_code)
-            all_articles.extend(gnews_articles)
-        
+            sources.append(("GNews", lambda: self.fetch_gnews(country_code)))
         if self.mediastack_key:
-            mediastack_articles = await self.fetch_mediastack(country_code)
-            all_articles.extend(mediastack_articles)
-        
+            sources.append(("Mediastack", lambda: self.fetch_mediastack(country_code)))
         if self.currents_api_key:
-            currents_articles = await self.fetch_currents(country_code)
-            all_articles.extend(currents_articles)
-        
-        # Remove duplicates and filter
-        unique_articles = self.remove_duplicates(all_articles)
-        
-        # Sort by published date (newest first)
-        unique_articles.sort(key=lambda x: x.get('published_at', ''), reverse=True)
-        
-        return unique_articles[:limit]
+            sources.append(("Currents", lambda: self.fetch_currents(country_code)))
+        return sources
 
     async def fetch_newsapi(self, country_code: str) -> List[dict]:
         """Fetch news from NewsAPI"""
         articles = []
         
         try:
-            url = f"https://newsapi.org/v2/top-headlines?country={country_code}&apiKey={self.news_api_key}"
+            params = {'country': country_code}
+            data = await provider_gateway.get_json_pooled(
+                provider_gateway.key_pool('newsapi'), 'https://newsapi.org/v2/top-headlines', params=params
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                data = response.json()
+            if data.get('status') == 'ok':
+                for article in data.get('articles', []):
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('publishedAt', ''),
+                        'source': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
+                        'api_source': 'newsapi',
+                        'image_url': article.get('urlToImage', ''),
+                        'content': article.get('content', '')
+                    })
+                
+                print(f"✅ NewsAPI {country_code}: {len(articles)} articles")
+            else:
+                print(f"❌ NewsAPI failed for {country_code}: {data.get('message', 'Unknown error')}")
                 
-                if data.get('status') == 'ok':
-                    for article in data.get('articles', []):
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('publishedAt', ''),
-                            'source': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
-                            'api_source': 'newsapi',
-                            'image_url': article.get('urlToImage', ''),
-                            'content': article.get('content', '')
-                        })
-                    
-                    print(f"✅ NewsAPI {country_code}: {len(articles)} articles")
-                else:
-                    print(f"❌ NewsAPI failed for {country_code}: {data.get('message', 'Unknown error')}")
-                    
         except Exception as e:
             print(f"❌ NewsAPI failed for {country_code}: {e}")
         
@@ -300,29 +365,28 @@ class EnhancedNewsAggregator:
         articles = []
         
         try:
-            url = f"https://gnews.io/api/v4/top-headlines?country={country_code}&apikey={self.gnews_api_key}"
+            params = {'country': country_code, 'apikey': self.gnews_api_key}
+            data = await provider_gateway.get_json(
+                'gnews', 'https://gnews.io/api/v4/top-headlines', params=params, api_key=self.gnews_api_key
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                data = response.json()
+            if 'articles' in data:
+                for article in data['articles']:
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('publishedAt', ''),
+                        'source': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
+                        'api_source': 'gnews',
+                        'image_url': article.get('image', ''),
+                        'content': article.get('content', '')
+                    })
+                
+                print(f"✅ GNews {country_code}: {len(articles)} articles")
+            else:
+                print(f"❌ GNews failed for {country_code}: {data.get('message', 'Unknown error')}")
                 
-                if 'articles' in data:
-                    for article in data['articles']:
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('publishedAt', ''),
-                            'source': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
-                            'api_source': 'gnews',
-                            'image_url': article.get('image', ''),
-                            'content': article.get('content', '')
-                        })
-                    
-                    print(f"✅ GNews {country_code}: {len(articles)} articles")
-                else:
-                    print(f"❌ GNews failed for {country_code}: {data.get('message', 'Unknown error')}")
-                    
         except Exception as e:
             print(f"❌ GNews failed for {country_code}: {e}")
         
@@ -333,29 +397,28 @@ class EnhancedNewsAggregator:
         articles = []
         
         try:
-            url = f"http://api.mediastack.com/v1/news?access_key={self.mediastack_key}&countries={country_code}"
+            params = {'access_key': self.mediastack_key, 'countries': country_code}
+            data = await provider_gateway.get_json(
+                'mediastack', 'http://api.mediastack.com/v1/news', params=params, api_key=self.mediastack_key
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                data = response.json()
+            if 'data' in data:
+                for article in data['data']:
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('published_at', ''),
+                        'source': f"Mediastack - {article.get('source', 'Unknown')}",
+                        'api_source': 'mediastack',
+                        'image_url': article.get('image', ''),
+                        'content': article.get('description', '')
+                    })
+                
+                print(f"✅ Mediastack {country_code}: {len(articles)} articles")
+            else:
+                print(f"❌ Mediastack failed for {country_code}: {data.get('error', {}).get('message', 'Unknown error')}")
                 
-                if 'data' in data:
-                    for article in data['data']:
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published_at', ''),
-                            'source': f"Mediastack - {article.get('source', 'Unknown')}",
-                            'api_source': 'mediastack',
-                            'image_url': article.get('image', ''),
-                            'content': article.get('description', '')
-                        })
-                    
-                    print(f"✅ Mediastack {country_code}: {len(articles)} articles")
-                else:
-                    print(f"❌ Mediastack failed for {country_code}: {data.get('error', {}).get('message', 'Unknown error')}")
-                    
         except Exception as e:
             print(f"❌ Mediastack failed for {country_code}: {e}")
         
@@ -366,29 +429,28 @@ class EnhancedNewsAggregator:
         articles = []
         
         try:
-            url = f"https://api.currentsapi.services/v1/latest-news?country={country_code}&apiKey={self.currents_api_key}"
+            params = {'country': country_code, 'apiKey': self.currents_api_key}
+            data = await provider_gateway.get_json(
+                'currents', 'https://api.currentsapi.services/v1/latest-news', params=params, api_key=self.currents_api_key
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                data = response.json()
+            if data.get('status') == 'ok':
+                for article in data.get('news', []):
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('published', ''),
+                        'source': f"Currents - {article.get('author', 'Unknown')}",
+                        'api_source': 'currents',
+                        'image_url': article.get('image', ''),
+                        'content': article.get('description', '')
+                    })
+                
+                print(f"✅ Currents {country_code}: {len(articles)} articles")
+            else:
+                print(f"❌ Currents failed for {country_code}: {data.get('message', 'Unknown error')}")
                 
-                if data.get('status') == 'ok':
-                    for article in data.get('news', []):
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published', ''),
-                            'source': f"Currents - {article.get('author', 'Unknown')}",
-                            'api_source': 'currents',
-                            'image_url': article.get('image', ''),
-                            'content': article.get('description', '')
-                        })
-                    
-                    print(f"✅ Currents {country_code}: {len(articles)} articles")
-                else:
-                    print(f"❌ Currents failed for {country_code}: {data.get('message', 'Unknown error')}")
-                    
         except Exception as e:
             print(f"❌ Currents failed for {country_code}: {e}")
         
@@ -396,66 +458,43 @@ class EnhancedNewsAggregator:
 
     async def fetch_rss_feeds(self, country_code: str) -> List[dict]:
         """Fetch news from RSS feeds"""
-        articles = []
         feeds = self.rss_feeds.get(country_code, [])
+        semaphore = asyncio.Semaphore(Config.AGGREGATOR_MAX_CONCURRENCY)
         
-        try:
-            for feed in feeds:
-                try:
-                    # Parse RSS feed
-                    feed_data = feedparser.parse(feed['url'])
-                    
-                    for entry in feed_data.entries[:10]:  # Get top 10 from each feed
-                        # Parse date
-                        published_at = ""
-                        try:
-                            if hasattr(entry, 'published'):
-                                published_at = parser.parse(entry.published).isoformat()
-                            elif hasattr(entry, 'updated'):
-                                published_at = parser.parse(entry.updated).isoformat()
-                            else:
-                                published_at = datetime.now().isoformat()
-                        except:
-                            published_at = datetime.now().isoformat()
-                        
-                        articles.append({
-                            'title': entry.title,
-                            'description': getattr(entry, 'summary', ''),
-                            'url': entry.link,
-                            'published_at': published_at,
-                            'source': f"RSS - {feed['source']}",
-                            'is_indian': country_code == 'in',
-                            'api_source': 'rss',
-                            'image_url': '',
-                            'content': getattr(entry, 'summary', '')
-                        })
-                        
-                except Exception as e:
-                    print(f"❌ RSS feed {feed['name']} failed: {e}")
-                    continue
-                    
-            print(f"✅ RSS {country_code}: {len(articles)} articles")
+        async def run(feed: dict) -> List[dict]:
+            async with semaphore:
+                return await self.fetch_rss_feed(feed, country_code)
+        
+        articles = []
+        for feed_articles in await asyncio.gather(*(run(feed) for feed in feeds)):
+            articles.extend(feed_articles)
+        print(f"✅ RSS {country_code}: {len(articles)} articles")
+        return articles
+
+    async def fetch_rss_feed(self, feed: dict, country_code: str) -> List[dict]:
+        """Fetch one RSS feed; the download is async and parsing runs off the event loop"""
+        articles = []
+        
+        with span("rss.fetch", feed=feed['name'], country=country_code) as current:
+            try:
+                response = await provider_gateway.client.get(feed['url'], timeout=Config.RSS_FETCH_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                # Parsing, date handling and HTML stripping happen in the normalization pool
+                articles = await normalization_pool.run(
+                    normalize_feed, response.content, feed['source'], country_code == 'in'
+                )
                     
-        except Exception as e:
-            print(f"❌ RSS feeds failed for {country_code}: {e}")
+            except Exception as e:
+                current.record_exception(e)
+                print(f"❌ RSS feed {feed['name']} failed: {e}")
+            current.set_attribute("articles", len(articles))
         
         return articles
 
     def remove_duplicates(self, articles: List[dict]) -> List[dict]:
         """Remove duplicate articles based on title similarity"""
-        unique_articles = []
-        seen_titles = set()
-        
-        for article in articles:
-            title = article.get('title', '').strip().lower()
-            # Create a simplified title for comparison
-            simplified_title = ''.join(c for c in title if c.isalnum() or c.isspace()).strip()
-            
-            if simplified_title and simplified_title not in seen_titles:
-                seen_titles.add(simplified_title)
-                unique_articles.append(article)
-        
-        return unique_articles
+        keep = unique_title_indices([article.get('title', '') for article in articles])
+        return [articles[index] for index in keep]
 
     def filter_indian_relevant_news(self, articles: List[dict]) -> List[dict]:
         """Filter articles that are relevant to Indian interests"""
@@ -501,6 +540,146 @@ class EnhancedNewsAggregator:
         
         return merged_feed[:limit]
 
+    async def get_cached_prioritized_feed(self, limit: int = 100) -> List[dict]:
+        """Current prioritized feed snapshot; only the very first call (empty cache) waits for a build.
+
+        A snapshot older than PRIORITIZED_FEED_REFRESH_MINUTES is still served while
+        a rebuild runs in the background.
+        """
+        await self._mark_requested()
+        snapshot = self._feed_snapshot or await self._adopt_stored_feed()
+        if snapshot is None:
+            snapshot = await self.refresh_prioritized_feed()
+        elif self._feed_age(snapshot) >= timedelta(minutes=Config.PRIORITIZED_FEED_REFRESH_MINUTES):
+            self._start_feed_refresh()
+        return snapshot["articles"][:limit]
+
+    @property
+    def prioritized_feed_info(self) -> Dict[str, Optional[str]]:
+        snapshot = self._feed_snapshot or {}
+        return {"version": snapshot.get("version"), "generated_at": snapshot.get("generated_at")}
+
+    async def refresh_prioritized_feed(self, force: bool = True) -> dict:
+        """Rebuild the prioritized feed snapshot, joining a rebuild that is already running.
+
+        Without force, a fresh snapshot another worker published meanwhile is adopted instead.
+        """
+        return await asyncio.shield(self._start_feed_refresh(force))
+
+    def _start_feed_refresh(self, force: bool = False) -> asyncio.Task:
+        if self._feed_refresh is None:
+            self._feed_refresh = asyncio.create_task(self._build_prioritized_feed(force))
+            self._feed_refresh.add_done_callback(self._clear_feed_refresh)
+        return self._feed_refresh
+
+    def _clear_feed_refresh(self, task: asyncio.Task):
+        self._feed_refresh = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Prioritized feed refresh failed: {task.exception()}")
+
+    async def _mark_requested(self):
+        """Record demand for the feed where every worker's refresh loop can see it"""
+        now = time.monotonic()
+        if now - self._request_marked_at < REQUEST_MARK_INTERVAL_SECONDS:
+            return
+        self._request_marked_at = now
+        await async_redis_client.set(PRIORITIZED_FEED_REQUESTED_KEY, time.time())
+
+    @staticmethod
+    def _feed_age(snapshot: dict) -> timedelta:
+        return datetime.now(timezone.utc) - datetime.fromisoformat(snapshot["generated_at"])
+
+    async def _build_prioritized_feed(self, force: bool) -> dict:
+        with span("prioritized_feed.build"):
+            # Only one worker aggregates at a time; the others wait for its snapshot
+            token = f"{os.getpid()}-{time.time()}"
+            current = (self._feed_snapshot or {}).get("version")
+            while not await async_redis_client.set(
+                PRIORITIZED_FEED_LOCK_KEY, token, nx=True, ex=Config.PRIORITIZED_FEED_LOCK_SECONDS
+            ):
+                snapshot = await self._wait_for_stored_feed(current)
+                if snapshot is not None:
+                    return snapshot
+                # The builder died without publishing; its lock has expired, so compete for it again
+            try:
+                stored = None if force else await self._adopt_stored_feed()
+                if stored is not None and stored["version"] != current and (
+                    self._feed_age(stored) < timedelta(minutes=Config.PRIORITIZED_FEED_REFRESH_MINUTES)
+                ):
+                    # Another worker published a fresh snapshot since this one last looked
+                    return stored
+                articles = await self.get_merged_prioritized_feed(limit=Config.PRIORITIZED_FEED_MAX_ARTICLES)
+                previous = self._feed_snapshot or await self._load_stored_feed()
+                if not articles and previous is not None:
+                    # Keep serving the last good feed when every source came back empty
+                    logger.warning(f"Prioritized feed came back empty, keeping v{previous['version']}")
+                    return previous
+                snapshot = {
+                    "version": int(await async_redis_client.incr(PRIORITIZED_FEED_VERSION_KEY)),
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "articles": articles,
+                }
+                await async_redis_client.set(PRIORITIZED_FEED_KEY, orjson.dumps(snapshot, default=str))
+                self._feed_snapshot = snapshot
+                logger.info(f"Published prioritized feed v{snapshot['version']} ({len(articles)} articles)")
+                return snapshot
+            finally:
+                if await async_redis_client.get(PRIORITIZED_FEED_LOCK_KEY) == token:
+                    await async_redis_client.delete(PRIORITIZED_FEED_LOCK_KEY)
+
+    async def _wait_for_stored_feed(self, current: Optional[int]) -> Optional[dict]:
+        """Wait for the snapshot another worker is building; None if its lock expires first"""
+        delay = 0.25
+        while await async_redis_client.exists(PRIORITIZED_FEED_LOCK_KEY):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+        snapshot = await self._adopt_stored_feed()
+        if snapshot is not None and snapshot["version"] != current:
+            return snapshot
+        return None
+
+    async def _load_stored_feed(self) -> Optional[dict]:
+        stored = await async_redis_client.get(PRIORITIZED_FEED_KEY)
+        # A feed of a few hundred articles takes long enough to parse to be worth a thread
+        return await asyncio.to_thread(orjson.loads, stored) if stored else None
+
+    async def _adopt_stored_feed(self) -> Optional[dict]:
+        """Take over the snapshot in Redis if it is newer than the one in memory"""
+        snapshot = await self._load_stored_feed()
+        if snapshot is not None and snapshot["version"] > (self._feed_snapshot or {}).get("version", 0):
+            self._feed_snapshot = snapshot
+        return self._feed_snapshot
+
+    async def run_prioritized_feed_refresh_loop(self, interval_minutes: int, idle_minutes: int):
+        """Keep the snapshot at most interval_minutes old while the feed is in demand.
+
+        Nothing is rebuilt once no worker has served the feed for idle_minutes, so an
+        unused feed does not spend the providers' daily quotas; the next request
+        serves the old snapshot and starts a rebuild.
+        """
+        while True:
+            try:
+                requested = await async_redis_client.get(PRIORITIZED_FEED_REQUESTED_KEY)
+                if requested is None or time.time() - float(requested) > idle_minutes * 60:
+                    await asyncio.sleep(interval_minutes * 60)
+                    continue
+                snapshot = await self._adopt_stored_feed()
+                age = self._feed_age(snapshot) if snapshot is not None else None
+                if age is None or age >= timedelta(minutes=interval_minutes):
+                    await self.refresh_prioritized_feed(force=False)
+                    age = timedelta(0)
+                await asyncio.sleep(max(1.0, interval_minutes * 60 - age.total_seconds()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Prioritized feed refresh failed: {e}")
+                await asyncio.sleep(interval_minutes * 60)
+
+    def start_prioritized_feed_refresh(self) -> asyncio.Task:
+        return asyncio.create_task(self.run_prioritized_feed_refresh_loop(
+            Config.PRIORITIZED_FEED_REFRESH_MINUTES, Config.PRIORITIZED_FEED_IDLE_MINUTES
+        ))
+
     def validate_and_normalize_country_code(self, country_input: str) -> Optional[str]:
         """Validate and normalize country code input. Returns standardized country code or None if invalid"""
         if not country_input:
@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import ipaddress
+import logging
+import re
+import socket
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+from database.database import SessionLocal
+from database.models import ArticleBody, ArticlePage
+from services.normalization import extract_article_text, normalization_pool, strip_html
+from utils.compression import SUPPORTED_ENCODINGS, compress, decompress
+from utils.metrics import ENRICHMENT_PAGES
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+# robots.txt files are small; anything past this is ignored
+_MAX_ROBOTS_BYTES = 512_000
+_MAX_ROBOTS_ENTRIES = 1024
+
+
+class BlockedURL(Exception):
+    """A URL the enricher must not request: wrong scheme, non-public address or too many redirects"""
+
+
+@dataclass
+class Page:
+    """Result of the last fetch of an article page"""
+    text: Optional[str]
+    status: int
+    expires_at: datetime
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ArticleEnricher:
+    """Replaces summary-only article content with the main text of the article page.
+
+    Article URLs come from the providers, so every request, redirects included,
+    is checked first: only http(s) to hosts that resolve to public addresses, and
+    only paths the site's robots.txt allows. Pages are fetched concurrently, at most
+    ENRICHMENT_MAX_CONCURRENCY at a time and ENRICHMENT_PER_DOMAIN_CONCURRENCY per
+    site. Extracted text is stored compressed and keyed by its hash, so syndicated
+    copies of a story are stored once; a page is not requested again until its
+    cache lifetime runs out, and then only conditionally.
+    """
+
+    def __init__(self):
+        self._semaphore = asyncio.Semaphore(Config.ENRICHMENT_MAX_CONCURRENCY)
+        # Only domains with a fetch in progress have an entry, so the map stays small
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._domain_users: Dict[str, int] = {}
+        self._robots: "OrderedDict[str, Tuple[RobotFileParser, float]]" = OrderedDict()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            # Redirects are followed by hand so that every hop is checked
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(Config.ENRICHMENT_FETCH_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=Config.ENRICHMENT_MAX_CONCURRENCY * 2),
+                follow_redirects=False,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+    def needs_enrichment(self, article: dict) -> bool:
+        url = article.get('url') or ''
+        content = strip_html(article.get('content') or article.get('description') or '')
+        return url.startswith(('http://', 'https://')) and len(content) < Config.ENRICHMENT_MIN_CONTENT_CHARS
+
+    async def enrich(self, articles: List[dict], fetch: bool = True) -> int:
+        """Fill in article['content'] from article pages; with fetch=False only stored pages are used.
+
+        Returns the number of articles enriched.
+        """
+        if not Config.ENRICHMENT_ENABLED:
+            return 0
+        targets = [article for article in articles if self.needs_enrichment(article)]
+        if not targets:
+            return 0
+
+        with span("enrich", articles=len(targets), fetch=fetch) as current:
+            texts = await self.page_texts(dict.fromkeys(article['url'] for article in targets), fetch)
+            enriched = 0
+            for article in targets:
+                text = texts.get(article['url'])
+                if text and len(text) > len(article.get('content') or ''):
+                    article['content'] = text
+                    enriched += 1
+            current.set_attribute("enriched", enriched)
+        return enriched
+
+    async def page_texts(self, urls: Iterable[str], fetch: bool = True) -> Dict[str, Optional[str]]:
+        """Main text per page URL (None when the page had none), fetching pages whose lifetime ran out"""
+        urls = list(urls)
+        stored = await asyncio.to_thread(self._load_pages, urls)
+        now = datetime.now(timezone.utc)
+        texts = {url: page.text for url, page in stored.items() if page.expires_at > now}
+        ENRICHMENT_PAGES.labels("cached").inc(len(texts))
+        if not fetch:
+            return texts
+
+        expired = [url for url in urls if url not in texts]
+        if expired:
+            fetched = await asyncio.gather(*(self._fetch_page(url, stored.get(url)) for url in expired))
+            pages = dict(zip(expired, fetched))
+            await asyncio.to_thread(self._store_pages, pages)
+            texts.update((url, page.text) for url, page in pages.items())
+        return texts
+
+    @asynccontextmanager
+    async def _domain_slot(self, url: str) -> AsyncIterator[None]:
+        """Per-site concurrency limit; the semaphore is dropped once no fetch for the site is left"""
+        domain = urlsplit(url).hostname or ''
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = self._domain_semaphores[domain] = asyncio.Semaphore(Config.ENRICHMENT_PER_DOMAIN_CONCURRENCY)
+        self._domain_users[domain] = self._domain_users.get(domain, 0) + 1
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self._domain_users[domain] -= 1
+            if not self._domain_users[domain]:
+                del self._domain_users[domain]
+                del self._domain_semaphores[domain]
+
+    @asynccontextmanager
+    async def _open(self, url: str, headers: Dict[str, str]) -> AsyncIterator[httpx.Response]:
+        """Stream a GET, following redirects only to URLs that pass check_url"""
+        for _ in range(Config.ENRICHMENT_MAX_REDIRECTS + 1):
+            await check_url(url)
+            response = await self.client.send(self.client.build_request("GET", url, headers=headers), stream=True)
+            # A 304 is a 3xx too, but only responses with a Location are redirects
+            if not response.has_redirect_location:
+                break
+            await response.aclose()
+            url = urljoin(url, response.headers["location"])
+        else:
+            raise BlockedURL(f"more than {Config.ENRICHMENT_MAX_REDIRECTS} redirects")
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def _robots_allowed(self, url: str) -> bool:
+        """Whether the site's robots.txt lets ENRICHMENT_USER_AGENT fetch the URL"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        cached = self._robots.get(origin)
+        if cached is None or cached[1] < time.monotonic():
+            cached = (await self._fetch_robots(origin), time.monotonic() + Config.ENRICHMENT_ROBOTS_TTL_SECONDS)
+            self._robots[origin] = cached
+            if len(self._robots) > _MAX_ROBOTS_ENTRIES:
+                self._robots.popitem(last=False)
+        self._robots.move_to_end(origin)
+        return cached[0].can_fetch(Config.ENRICHMENT_USER_AGENT, url)
+
+    async def _fetch_robots(self, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            async with self._open(parser.url, {"User-Agent": Config.ENRICHMENT_USER_AGENT}) as response:
+                if response.status_code >= 500:
+                    # An unreachable robots.txt means the whole site is off limits for now
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= _MAX_ROBOTS_BYTES:
+                            break
+                    parser.parse(bytes(body[:_MAX_ROBOTS_BYTES]).decode("utf-8", "replace").splitlines())
+        except (httpx.HTTPError, BlockedURL) as e:
+            logger.debug(f"robots.txt fetch failed for {origin}: {e}")
+            parser.disallow_all = True
+        return parser
+
+    async def _fetch_page(self, url: str, previous: Optional[Page]) -> Page:
+        headers = {"User-Agent": Config.ENRICHMENT_USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+        if previous is not None:
+            # Revalidate instead of downloading again when the site supports it
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        async with self._semaphore, self._domain_slot(url):
+            with span("enrich.fetch", url=url) as current:
+                try:
+                    if not await self._robots_allowed(url):
+                        ENRICHMENT_PAGES.labels("blocked").inc()
+                        return Page(None, 0, _failure_expires_at())
+                    async with self._open(url, headers) as response:
+                        current.set_attribute("http.status_code", response.status_code)
+                        expires_at = _expires_at(response.headers)
+                        if response.status_code == 304 and previous is not None:
+                            ENRICHMENT_PAGES.labels("not_modified").inc()
+                            return replace(previous, status=304, expires_at=expires_at)
+                        content_type = response.headers.get("content-type", "")
+                        if response.status_code != 200 or "html" not in content_type:
+                            ENRICHMENT_PAGES.labels("failed").inc()
+                            return Page(None, response.status_code, _failure_expires_at())
+
+                        # Article text comes early in the page; anything past the cap is dropped
+                        page = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            page += chunk
+                            if len(page) >= Config.ENRICHMENT_MAX_PAGE_BYTES:
+                                break
+                        charset = response.charset_encoding
+                except BlockedURL as e:
+                    logger.info(f"Enrichment skipped {url}: {e}")
+                    ENRICHMENT_PAGES.labels("blocked").inc()
+                    return Page(None, 0, _failure_expires_at())
+                except httpx.HTTPError as e:
+                    logger.debug(f"Enrichment fetch failed for {url}: {e}")
+                    current.record_exception(e)
+                    ENRICHMENT_PAGES.labels("failed").inc()
+                    return Page(None, 0, _failure_expires_at())
+
+        text = await normalization_pool.run(extract_article_text, bytes(page), charset)
+        if len(text) < Config.ENRICHMENT_MIN_TEXT_CHARS:
+            ENRICHMENT_PAGES.labels("no_text").inc()
+            text = None
+        else:
+            ENRICHMENT_PAGES.labels("fetched").inc()
+        return Page(text, 200, expires_at, response.headers.get("etag"), response.headers.get("last-modified"))
+
+    @staticmethod
+    def _load_pages(urls: List[str]) -> Dict[str, Page]:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(ArticlePage, ArticleBody)
+                .outerjoin(ArticleBody, ArticlePage.content_hash == ArticleBody.content_hash)
+                .filter(ArticlePage.url.in_(urls))
+                .all()
+            )
+            pages = {}
+            for page, body in rows:
+                text = decompress(body.body, body.encoding).decode("utf-8") if body is not None else None
+                pages[page.url] = Page(text, page.status, _aware(page.expires_at), page.etag, page.last_modified)
+            return pages
+        finally:
+            db.close()
+
+    def _store_pages(self, pages: Dict[str, Page]):
+        try:
+            self._write_pages(pages)
+        except IntegrityError:
+            # Another worker stored the same text first; its row is as good as ours
+            self._write_pages(pages)
+
+    @staticmethod
+    def _write_pages(pages: Dict[str, Page]):
+        hashes = {
+            url: hashlib.sha256(page.text.encode("utf-8")).hexdigest()
+            for url, page in pages.items() if page.text
+        }
+        db = SessionLocal()
+        try:
+            existing = {
+                content_hash for (content_hash,) in
+                db.query(ArticleBody.content_hash).filter(ArticleBody.content_hash.in_(list(set(hashes.values()))))
+            }
+            encoding = SUPPORTED_ENCODINGS[0]
+            for url, content_hash in hashes.items():
+                if content_hash not in existing:
+                    text = pages[url].text
+                    db.add(ArticleBody(
+                        content_hash=content_hash,
+                        body=compress(text.encode("utf-8"), encoding),
+                        encoding=encoding,
+                        length=len(text),
+                    ))
+                    existing.add(content_hash)
+
+            fetched_at = datetime.now(timezone.utc)
+            for url, page in pages.items():
+                db.merge(ArticlePage(
+                    url=url,
+                    content_hash=hashes.get(url),
+                    status=page.status,
+                    etag=page.etag,
+                    last_modified=page.last_modified,
+                    fetched_at=fetched_at,
+                    expires_at=page.expires_at,
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+async def check_url(url: str):
+    """Raise BlockedURL unless the URL is http(s) and its host resolves only to public addresses"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise BlockedURL(f"unsupported URL {url!r}")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError) as e:
+        raise BlockedURL(f"cannot resolve {parts.hostname}: {e}") from e
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise BlockedURL(f"{parts.hostname} resolves to non-public address {address}")
+
+
+def _expires_at(headers: httpx.Headers) -> datetime:
+    """When a page may be fetched again, from Cache-Control or Expires, clamped to the configured bounds"""
+    now = datetime.now(timezone.utc)
+    ttl = Config.ENRICHMENT_DEFAULT_TTL_SECONDS
+    cache_control = headers.get("cache-control", "").lower()
+    max_age = _MAX_AGE_RE.search(cache_control)
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        ttl = 0
+    elif max_age:
+        ttl = int(max_age.group(1))
+    elif headers.get("expires"):
+        try:
+            ttl = (parsedate_to_datetime(headers["expires"]) - now).total_seconds()
+        except (TypeError, ValueError):
+            pass
+    ttl = min(max(ttl, Config.ENRICHMENT_MIN_TTL_SECONDS), Config.ENRICHMENT_MAX_TTL_SECONDS)
+    return now + timedelta(seconds=ttl)
+
+
+def _failure_expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=Config.ENRICHMENT_MIN_TTL_SECONDS)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+article_enricher = ArticleEnricher()
@@ -0,0 +1,253 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+
+from config import Config
+from services.enrichment_service import article_enricher
+from services.live_feed import live_feed
+from services.news_service import NewsService
+from utils.dates import date_normalizer
+from utils.compression import encoded_etag, negotiate_encoding, precompress_variants
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Snapshots are compressed once per build, so they can afford higher levels than on-the-fly compression
+SNAPSHOT_COMPRESSION_LEVELS = {"br": 9, "gzip": 9}
+
+
+def parse_published_at(value, source: Optional[str] = None) -> Optional[datetime]:
+    """Parse a provider timestamp into an aware UTC datetime, or None if unparseable"""
+    return date_normalizer.parse(value, source)
+
+
+def format_country_article(article: dict, country_code: str) -> dict:
+    """Map a raw provider article onto the ArticleResponse fields"""
+    description = article.get('description', '') or ''
+    return {
+        'id': None,  # API articles don't have database IDs
+        'title': article.get('title', '') or 'No Title',
+        'content': article.get('content', description) or description or 'No content available',
+        'url': article.get('url', '') or '',
+        'published_at': parse_published_at(article.get('published_at'), article.get('api_source')),
+        'topic': 'general',  # Default topic for API articles
+        'summary': description[:200] if description else 'No summary available',
+        'source_name': article.get('source', '') or 'Unknown Source',
+        'source_bias_score': 0.0,  # Default bias score
+        'is_indian': country_code.lower() == 'in',
+        'api_source': article.get('api_source', 'unknown'),
+    }
+
+
+class FeedSnapshot:
+    """One immutable generation of a country's feed with its pre-serialized bodies.
+
+    Pages are only served at the configured limit buckets: a requested limit is
+    rounded up to the nearest bucket and capped at the largest. Every page is
+    rendered, and compressed with every supported encoding, when the snapshot
+    is built, so requests never serialize or compress. Building is CPU-bound;
+    publish() runs it in a worker thread.
+    """
+
+    def __init__(self, country: str, version: int, articles: List[BaseModel], api_sources: List[str],
+                 response_model: Type[BaseModel], buckets: Iterable[int]):
+        self.country = country
+        self.version = version
+        self.built_at = datetime.now(timezone.utc)
+        self.articles = articles
+        self.api_sources = api_sources
+        self._response_model = response_model
+        self._variants: Dict[int, Dict[Optional[str], bytes]] = {}
+        self._etags: Dict[int, str] = {}
+        self._page_sizes = sorted({min(bucket, len(articles)) for bucket in buckets if bucket > 0} or {len(articles)})
+        for page_size in self._page_sizes:
+            self._render(page_size)
+
+    def page_size(self, limit: int) -> int:
+        """Smallest pre-rendered page holding `limit` articles, or the largest page"""
+        limit = max(0, limit)
+        return next((size for size in self._page_sizes if size >= limit), self._page_sizes[-1])
+
+    def _render(self, page_size: int):
+        page = self.articles[:page_size]
+        body = self._response_model.model_construct(
+            country=self.country,
+            articles=page,
+            total_count=len(page),
+            api_sources=self.api_sources,
+        ).model_dump_json().encode("utf-8")
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self._etags[page_size] = f'"{self.country}-v{self.version}-{page_size}-{digest}"'
+        self._variants[page_size] = precompress_variants(body, SNAPSHOT_COMPRESSION_LEVELS)
+
+    def encoding_for(self, limit: int, accept_encoding: Optional[str]) -> Optional[str]:
+        """Negotiated encoding that this page has a variant for (None = identity)"""
+        encoding = negotiate_encoding(accept_encoding)
+        return encoding if encoding in self._variants[self.page_size(limit)] else None
+
+    def etag(self, limit: int, encoding: Optional[str] = None) -> str:
+        """Strong validator per page and encoding; the digest keeps it unique across restarts"""
+        return encoded_etag(self._etags[self.page_size(limit)], encoding)
+
+    def body(self, limit: int, encoding: Optional[str] = None) -> bytes:
+        return self._variants[self.page_size(limit)][encoding]
+
+
+class FeedSnapshotService:
+    """Keeps the latest country feed snapshots in memory and swaps them atomically.
+
+    A country's first request builds its snapshot (concurrent callers share the
+    same build); afterwards a background loop re-ingests every country requested
+    recently and publishes the new snapshot with a single reference swap, so
+    readers always see either the old or the new generation in full.
+    """
+
+    def __init__(self, response_model: Type[BaseModel], article_model: Type[BaseModel],
+                 buckets: Optional[List[int]] = None):
+        self.response_model = response_model
+        self.article_model = article_model
+        self.buckets = buckets or Config.SNAPSHOT_LIMIT_BUCKETS
+        self._snapshots: Dict[str, FeedSnapshot] = {}
+        self._last_requested: Dict[str, float] = {}
+        self._builds: Dict[str, asyncio.Task] = {}
+        self._enrichments: Dict[str, asyncio.Task] = {}
+        self._version = 0
+
+    @staticmethod
+    def normalize(country_code: str) -> Optional[str]:
+        """ISO code a country name or code maps to, or None if no provider supports it.
+
+        Snapshots are keyed by this code, so arbitrary input never adds entries.
+        """
+        return NewsService().validate_and_normalize_country_code(country_code)
+
+    def get(self, country_code: str) -> Optional[FeedSnapshot]:
+        """Current snapshot, if built; counts as a request so revalidated countries stay active"""
+        country = self.normalize(country_code)
+        snapshot = self._snapshots.get(country) if country else None
+        if snapshot is not None:
+            self._last_requested[country] = time.monotonic()
+        return snapshot
+
+    async def get_or_build(self, country_code: str) -> FeedSnapshot:
+        """Current snapshot, building it on first request; raises ValueError for unsupported countries"""
+        country = self.normalize(country_code)
+        if not country:
+            raise ValueError(f"Unsupported country: '{country_code}'")
+        self._last_requested[country] = time.monotonic()
+        snapshot = self._snapshots.get(country)
+        if snapshot is not None:
+            return snapshot
+        return await self.refresh(country)
+
+    def _start_build(self, country: str) -> asyncio.Task:
+        task = self._builds.get(country)
+        if task is None:
+            task = asyncio.create_task(self._ingest(country))
+            self._builds[country] = task
+            task.add_done_callback(lambda _: self._builds.pop(country, None))
+        return task
+
+    async def refresh(self, country_code: str) -> FeedSnapshot:
+        """Re-ingest a country and publish the result, joining any build already running"""
+        return await asyncio.shield(self._start_build(country_code.lower()))
+
+    def warm(self, country_code: str) -> Optional[str]:
+        """Start building a country's snapshot in the background if there is none yet.
+
+        Returns the normalized country code, or None (and builds nothing) if it is unsupported.
+        """
+        country = self.normalize(country_code)
+        if not country:
+            return None
+        self._last_requested[country] = time.monotonic()
+        if country not in self._snapshots:
+            self._start_build(country)
+        return country
+
+    async def _ingest(self, country: str) -> FeedSnapshot:
+        with span("snapshot.ingest", country=country):
+            raw_articles = await NewsService().fetch_news_by_country(country)
+            previous = self._snapshots.get(country)
+            if not raw_articles and previous is not None:
+                # Keep serving the last good feed when every provider came back empty
+                logger.warning(f"Country feed for '{country}' came back empty, keeping snapshot v{previous.version}")
+                return previous
+            # Page text fetched earlier goes in now; pages not fetched yet are added after publishing
+            await article_enricher.enrich(raw_articles, fetch=False)
+            snapshot = await self.publish(country, raw_articles)
+            self._start_enrichment(country, raw_articles, snapshot.version)
+            return snapshot
+
+    def _start_enrichment(self, country: str, raw_articles: List[dict], version: int):
+        if not Config.ENRICHMENT_ENABLED or country in self._enrichments:
+            return
+        task = asyncio.create_task(self._enrich(country, raw_articles, version))
+        self._enrichments[country] = task
+        task.add_done_callback(lambda _: self._enrichments.pop(country, None))
+
+    async def _enrich(self, country: str, raw_articles: List[dict], version: int):
+        """Fetch the missing article pages, then republish unless a newer snapshot replaced this one"""
+        try:
+            enriched = await article_enricher.enrich(raw_articles)
+        except Exception as e:
+            logger.error(f"Enriching country feed '{country}' failed: {e}")
+            return
+        snapshot = self._snapshots.get(country)
+        if enriched and snapshot is not None and snapshot.version == version:
+            await self.publish(country, raw_articles)
+
+    async def publish(self, country_code: str, raw_articles: List[dict]) -> FeedSnapshot:
+        """Validate and serialize a freshly ingested feed, then swap it in unless a newer one won the race"""
+        country = country_code.lower()
+        with span("snapshot.publish", country=country, articles=len(raw_articles)):
+            self._version += 1
+            # Validating, serializing and compressing every page would stall the event loop for the whole build
+            snapshot = await asyncio.to_thread(self._build, country, self._version, raw_articles)
+        previous = self._snapshots.get(country)
+        if previous is not None and previous.version > snapshot.version:
+            return previous
+        self._snapshots[country] = snapshot
+        logger.info(f"Published country feed snapshot '{country}' v{snapshot.version} ({len(snapshot.articles)} articles)")
+
+        if previous is not None:
+            # Push only what this ingestion added; the first snapshot is the baseline clients load over REST
+            seen = {article.url or article.title for article in previous.articles}
+            live_feed.publish(country, [
+                article.model_dump(mode="json") for article in snapshot.articles if (article.url or article.title) not in seen
+            ])
+        return snapshot
+
+    def _build(self, country: str, version: int, raw_articles: List[dict]) -> FeedSnapshot:
+        articles = [
+            self.article_model.model_validate(format_country_article(article, country))
+            for article in raw_articles
+        ]
+        api_sources = list(set(article.get('api_source') for article in raw_articles if article.get('api_source')))
+        return FeedSnapshot(country, version, articles, api_sources, self.response_model, self.buckets)
+
+    async def run_refresh_loop(self, interval_minutes: int, idle_minutes: int):
+        """Periodically re-ingest active countries; countries idle longer than idle_minutes are dropped"""
+        while True:
+            await asyncio.sleep(interval_minutes * 60)
+            cutoff = time.monotonic() - idle_minutes * 60
+            live_countries = live_feed.subscribed_countries()
+            for country in list(self._snapshots):
+                if country not in live_countries and self._last_requested.get(country, 0) < cutoff:
+                    self._snapshots.pop(country, None)
+                    self._last_requested.pop(country, None)
+                    continue
+                try:
+                    await self.refresh(country)
+                except Exception as e:
+                    logger.error(f"Country feed refresh failed for '{country}': {e}")
+
+    def start(self) -> asyncio.Task:
+        return asyncio.create_task(
+            self.run_refresh_loop(Config.SNAPSHOT_REFRESH_MINUTES, Config.SNAPSHOT_IDLE_MINUTES)
+        )
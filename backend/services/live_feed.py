@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Set
+
+import orjson
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LiveEvent:
+    __slots__ = ("sequence", "id", "country", "article", "payload", "published_at")
+
+    def __init__(self, boot_id: str, sequence: int, country: str, article: dict):
+        self.sequence = sequence
+        self.id = f"{boot_id}-{sequence}"
+        self.published_at = time.monotonic()
+        self.country = country
+        self.article = article
+        # Serialized once, shared by every subscriber
+        self.payload = orjson.dumps(article)
+
+
+class Subscription:
+    """One connected client: its filters and a bounded queue of pending events"""
+
+    def __init__(self, country: Optional[str], topic: Optional[str], source: Optional[str], queue_size: int):
+        self.country = country.lower() if country else None
+        self.topic = topic.lower() if topic else None
+        self.source = source.lower() if source else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def matches(self, event: LiveEvent) -> bool:
+        if self.country and self.country != event.country:
+            return False
+        if self.topic and self.topic not in (event.article.get("topic") or "").lower():
+            return False
+        if self.source and self.source not in (event.article.get("source_name") or "").lower():
+            return False
+        return True
+
+
+class LiveFeedBroker:
+    """Fans newly ingested articles out to live subscribers.
+
+    Events get monotonically increasing ids of the form ``<boot>-<seq>``, where
+    the boot id is a random UUID per process, and the most recent ones are kept
+    in a ring buffer, so a reconnecting client that sends Last-Event-ID is
+    replayed whatever it missed. An id from another worker or an earlier process
+    can't be placed in this sequence; such a client is replayed only the last
+    LIVE_FEED_UNKNOWN_ID_REPLAY_SECONDS of events. Each subscriber has a
+    bounded queue; a subscriber that falls that far behind is disconnected
+    instead of slowing ingestion down, and resumes from its last event id.
+    """
+
+    def __init__(self, buffer_size: Optional[int] = None, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or Config.LIVE_FEED_QUEUE_SIZE
+        # Unique per process: workers started in the same second must not share an id space
+        self.boot_id = uuid.uuid4().hex
+        self._sequence = itertools.count(1)
+        self._buffer: Deque[LiveEvent] = deque(maxlen=buffer_size or Config.LIVE_FEED_BUFFER_SIZE)
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribed_countries(self) -> Set[str]:
+        return {subscription.country for subscription in self._subscribers if subscription.country}
+
+    def publish(self, country: str, articles: Iterable[dict]) -> int:
+        """Record and fan out newly ingested articles; returns the number of events created"""
+        count = 0
+        for article in articles:
+            event = LiveEvent(self.boot_id, next(self._sequence), country.lower(), article)
+            self._buffer.append(event)
+            count += 1
+            for subscription in list(self._subscribers):
+                if subscription.overflowed or not subscription.matches(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # The client drains what is queued, is disconnected, and replays the rest on reconnect
+                    subscription.overflowed = True
+        if count:
+            logger.debug(f"Published {count} live events for '{country}' to {len(self._subscribers)} subscribers")
+        return count
+
+    def subscribe(self, country: Optional[str] = None, topic: Optional[str] = None, source: Optional[str] = None,
+                  last_event_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(country, topic, source, self.queue_size)
+        for event in self._missed_events(last_event_id):
+            if not subscription.matches(event):
+                continue
+            if subscription.queue.full():
+                # The backlog alone exceeds the queue; the rest is replayed on the next reconnect
+                subscription.overflowed = True
+                break
+            subscription.queue.put_nowait(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def _missed_events(self, last_event_id: Optional[str]) -> List[LiveEvent]:
+        if not last_event_id:
+            return []
+        boot_id, _, sequence = last_event_id.partition("-")
+        if boot_id != self.boot_id or not sequence.isdigit():
+            # Id from another worker or a previous process: replay only what is recent
+            cutoff = time.monotonic() - Config.LIVE_FEED_UNKNOWN_ID_REPLAY_SECONDS
+            return [event for event in self._buffer if event.published_at >= cutoff]
+        last_sequence = int(sequence)
+        return [event for event in self._buffer if event.sequence > last_sequence]
+
+    async def stream(self, subscription: Subscription, keepalive_seconds: Optional[int] = None):
+        """Yield the subscription's events in text/event-stream framing until it overflows"""
+        keepalive_seconds = keepalive_seconds or Config.LIVE_FEED_KEEPALIVE_SECONDS
+        try:
+            yield f"retry: {Config.LIVE_FEED_RETRY_MS}\n\n".encode()
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    yield b"event: overflow\ndata: {}\n\n"
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"id: " + event.id.encode() + b"\nevent: article\ndata: " + event.payload + b"\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+live_feed = LiveFeedBroker()
@@ -1,23 +1,45 @@
-import httpx
+import asyncio
 import os
+import time
 import traceback
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
 from database.models import Article, NewsSource
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
-import feedparser
-from dateutil import parser
+import httpx
+from config import Config
 from utils.cache import cache
+from utils.dates import date_normalizer
+from utils.metrics import record_dedup, record_provider_fetch
+from utils.tracing import span
+from services.normalization import normalization_pool, normalize_feed
+from services.provider_gateway import ProviderUnavailable, provider_gateway
+from services.enrichment_service import article_enricher
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sort position for articles whose date cannot be parsed
+UNKNOWN_PUBLISHED_AT = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Set while fetching a country feed provider by provider, so a failed provider is
+# reported as failed instead of being logged and turned into an empty result
+_propagate_provider_errors: ContextVar[bool] = ContextVar("propagate_provider_errors", default=False)
+
+
+def raise_if_propagating(error: Exception):
+    """Re-raise provider and HTTP failures when the caller reports per-provider status"""
+    if _propagate_provider_errors.get() and isinstance(error, (ProviderUnavailable, httpx.HTTPError)):
+        raise error
+
 class NewsService:
     def __init__(self):
-        self.news_api_key = os.getenv("NEWS_API_KEY")
         self.gnews_api_key = os.getenv("GNEWS_API_KEY")
         self.mediastack_key = os.getenv("MEDIASTACK_API_KEY")
         self.currents_api_key = os.getenv("CURRENTS_API_KEY")
@@ -27,8 +49,10 @@ class NewsService:
         self.worldnews_key = os.getenv("WORLDNEWS_KEY")
         self.serpapi_key = os.getenv("SERPAPI_KEY")
         self.guardian_api_key = os.getenv("GUARDIAN_API_KEY")
-        self.nytimes_api_key = os.getenv("NYTIMES_API_KEY")
-        self.nytimes_api_key_2 = os.getenv("NYTIMES_API_KEY_2")
+        
+        # Providers with several keys (NewsAPI, NYTimes) are called through rotating key pools
+        self.newsapi_keys = provider_gateway.key_pool("newsapi")
+        self.nytimes_keys = provider_gateway.key_pool("nytimes")
         
         self.base_url = "https://newsapi.org/v2"
         
@@ -156,122 +180,104 @@ class NewsService:
     async def fetch_news_from_api(self, source_id: str, category: str = "general") -> List[dict]:
         """Fetch news from NewsAPI for a specific source"""
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.base_url}/everything"
-                params = {
-                    "sources": source_id,
-                    "apiKey": self.news_api_key,
-                    "pageSize": 20,
-                    "sortBy": "publishedAt"
-                }
-                
-                response = await client.get(url, params=params)
-                response.raise_for_status()
+            url = f"{self.base_url}/everything"
+            params = {
+                "sources": source_id,
+                "pageSize": 20,
+                "sortBy": "publishedAt"
+            }
                 
-                data = response.json()
-                return data.get("articles", [])
+            data = await provider_gateway.get_json_pooled(self.newsapi_keys, url, params=params)
+            return data.get("articles", [])
                 
         except Exception as e:
-            print(f"Error fetching news from {source_id}: {str(e)}")
+            logger.warning(f"Error fetching news from {source_id}: {str(e)}")
             return []
 
     @cache(prefix="gnews_api")
     async def fetch_indian_news_from_gnews(self) -> List[dict]:
         """Fetch Indian news from GNews API"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Country-specific Indian news
-                params = {
-                    'apikey': self.gnews_api_key,
-                    'country': 'in',
-                    'lang': 'en',
-                    'max': 50
-                }
-                response = await client.get('https://gnews.io/api/v4/top-headlines', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                articles = []
-                for article in data.get('articles', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'content': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publishedAt', ''),
-                        'source_name': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
-                        'is_indian': True,
-                        'api_source': 'gnews'
-                    })
-                return articles
+            # Country-specific Indian news
+            params = {
+                'apikey': self.gnews_api_key,
+                'country': 'in',
+                'lang': 'en',
+                'max': 50
+            }
+            data = await provider_gateway.get_json('gnews', 'https://gnews.io/api/v4/top-headlines', params=params, api_key=self.gnews_api_key)
+            articles = []
+            for article in data.get('articles', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'content': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publishedAt', ''),
+                    'source_name': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
+                    'is_indian': True,
+                    'api_source': 'gnews'
+                })
+            return articles
                 
         except Exception as e:
-            print(f"Error fetching from GNews: {str(e)}")
+            logger.warning(f"Error fetching from GNews: {str(e)}")
             return []
 
     @cache(prefix="newsapi_indian")
     async def fetch_indian_news_from_newsapi(self) -> List[dict]:
         """Fetch Indian news from NewsAPI"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Country-specific Indian news
-                params = {
-                    'apiKey': self.news_api_key,
-                    'country': 'in',
-                    'language': 'en',
-                    'pageSize': 50
-                }
-                response = await client.get('https://newsapi.org/v2/top-headlines', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                articles = []
-                for article in data.get('articles', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'content': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publishedAt', ''),
-                        'source_name': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
-                        'is_indian': True,
-                        'api_source': 'newsapi'
-                    })
-                return articles
+            # Country-specific Indian news
+            params = {
+                'country': 'in',
+                'language': 'en',
+                'pageSize': 50
+            }
+            data = await provider_gateway.get_json_pooled(self.newsapi_keys, 'https://newsapi.org/v2/top-headlines', params=params)
+            articles = []
+            for article in data.get('articles', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'content': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publishedAt', ''),
+                    'source_name': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
+                    'is_indian': True,
+                    'api_source': 'newsapi'
+                })
+            return articles
                 
         except Exception as e:
-            print(f"Error fetching from NewsAPI: {str(e)}")
+            logger.warning(f"Error fetching from NewsAPI: {str(e)}")
             return []
 
     @cache(prefix="mediastack_api")
     async def fetch_indian_news_from_mediastack(self) -> List[dict]:
         """Fetch Indian news from Mediastack API"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Indian country + keywords
-                params = {
-                    'access_key': self.mediastack_key,
-                    'countries': 'in',
-                    'languages': 'en',
-                    'limit': 50
-                }
-                response = await client.get('http://api.mediastack.com/v1/news', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                articles = []
-                for article in data.get('data', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'content': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('published_at', ''),
-                        'source_name': f"Mediastack - {article.get('source', 'Unknown')}",
-                        'is_indian': True,
-                        'api_source': 'mediastack'
-                    })
-                return articles
+            # Indian country + keywords
+            params = {
+                'access_key': self.mediastack_key,
+                'countries': 'in',
+                'languages': 'en',
+                'limit': 50
+            }
+            data = await provider_gateway.get_json('mediastack', 'http://api.mediastack.com/v1/news', params=params, api_key=self.mediastack_key)
+            articles = []
+            for article in data.get('data', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'content': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('published_at', ''),
+                    'source_name': f"Mediastack - {article.get('source', 'Unknown')}",
+                    'is_indian': True,
+                    'api_source': 'mediastack'
+                })
+            return articles
                 
         except Exception as e:
-            print(f"Error fetching from Mediastack: {str(e)}")
+            logger.warning(f"Error fetching from Mediastack: {str(e)}")
             return []
 
     @cache(prefix="currents_api")
@@ -279,46 +285,74 @@ class NewsService:
         """Fetch Indian news from Currents API"""
         articles = []  # Initialize articles outside try block
         try:
-            async with httpx.AsyncClient() as client:
-                # Global news filtered for Indian content
-                params = {
-                    'apiKey': self.currents_api_key,
-                    'language': 'en',
-                    'limit': 100
-                }
-                response = await client.get('https://api.currentsapi.services/v1/latest-news', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                for article in data.get('news', []):
-                    # Check if it's Indian news
-                    is_indian = (
-                        article.get('country') == 'IN' or 
-                        'india' in article.get('title', '').lower() or
-                        'indian' in article.get('title', '').lower() or
-                        any(keyword.lower() in article.get('title', '').lower() for keyword in self.indian_keywords)
-                    )
+            # Global news filtered for Indian content
+            params = {
+                'apiKey': self.currents_api_key,
+                'language': 'en',
+                'limit': 100
+            }
+            data = await provider_gateway.get_json('currents', 'https://api.currentsapi.services/v1/latest-news', params=params, api_key=self.currents_api_key)
+            for article in data.get('news', []):
+                # Check if it's Indian news
+                is_indian = (
+                    article.get('country') == 'IN' or 
+                    'india' in article.get('title', '').lower() or
+                    'indian' in article.get('title', '').lower() or
+                    any(keyword.lower() in article.get('title', '').lower() for keyword in self.indian_keywords)
+                )
                     
-                    if is_indian:
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'content': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published', ''),
-                            'source_name': f"Currents - {article.get('domain', 'Unknown')}",
-                            'is_indian': True,
-                            'api_source': 'currents'
-                        })
+                if is_indian:
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'content': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('published', ''),
+                        'source_name': f"Currents - {article.get('domain', 'Unknown')}",
+                        'is_indian': True,
+                        'api_source': 'currents'
+                    })
                 
         except Exception as e:
-            print(f"Error fetching from Currents API: {str(e)}")
-            traceback.print_exc()
+            logger.warning(f"Error fetching from Currents API: {str(e)}")
         
         return articles
 
+    async def get_aggregated_news(
+        self,
+        db: AsyncSession,
+        topic: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[dict]:
+        """Stored articles, newest first, optionally filtered by topic and source name"""
+        query = select(Article).join(NewsSource).options(contains_eager(Article.source))
+        if topic:
+            query = query.where(Article.topic.ilike(f"%{topic}%"))
+        if source:
+            query = query.where(NewsSource.name.ilike(f"%{source}%"))
+
+        result = await db.execute(query.order_by(Article.published_at.desc()).offset(offset).limit(limit))
+        return [
+            {
+                "id": article.id,
+                "title": article.title,
+                "content": article.content,
+                "url": article.url,
+                "published_at": article.published_at,
+                "topic": article.topic,
+                "summary": article.summary,
+                "source_name": article.source.name,
+                "source_bias_score": article.source.bias_score,
+                "is_indian": article.source.country == "in",
+                "api_source": "database"
+            }
+            for article in result.scalars().all()
+        ]
+
     async def get_enhanced_aggregated_news(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         topic: Optional[str] = None,
         source: Optional[str] = None,
         limit: int = 50,
@@ -365,13 +399,14 @@ class NewsService:
                     print(f"❌ International RSS failed: {e}")
             
             # Get database articles
-            query = db.query(Article).join(NewsSource)
+            query = select(Article).join(NewsSource).options(contains_eager(Article.source))
             if topic:
-                query = query.filter(Article.topic.ilike(f"%{topic}%"))
+                query = query.where(Article.topic.ilike(f"%{topic}%"))
             if source:
-                query = query.filter(NewsSource.name.ilike(f"%{source}%"))
+                query = query.where(NewsSource.name.ilike(f"%{source}%"))
             
-            db_articles = query.order_by(Article.published_at.desc()).limit(limit).all()
+            result = await db.execute(query.order_by(Article.published_at.desc()).limit(limit))
+            db_articles = result.scalars().all()
             
             # Convert database articles to dict format
             for article in db_articles:
@@ -393,22 +428,32 @@ class NewsService:
             print(f"🌍 Total international articles: {len(international_articles)}")
             
             # Remove duplicates based on title and URL
-            seen_identifiers = set()
-            unique_articles = []
-            for article in all_articles:
-                title = article.get('title', '').strip().lower()
-                url = article.get('url', '').strip()
-                identifier = f"{title}_{url}"
-                
-                if identifier and identifier not in seen_identifiers:
-                    seen_identifiers.add(identifier)
-                    unique_articles.append(article)
+            with span("merge", articles=len(all_articles)) as current:
+                seen_identifiers = set()
+                unique_articles = []
+                for article in all_articles:
+                    title = article.get('title', '').strip().lower()
+                    url = article.get('url', '').strip()
+                    identifier = f"{title}_{url}"
+                    
+                    if identifier and identifier not in seen_identifiers:
+                        seen_identifiers.add(identifier)
+                        unique_articles.append(article)
+                current.set_attribute("unique_articles", len(unique_articles))
+            record_dedup("enhanced_feed", len(all_articles), len(unique_articles))
             
-            # Prioritize Indian news - sort by is_indian first, then by date
-            unique_articles.sort(key=lambda x: (
-                not x.get('is_indian', False),  # Indian articles first
-                -(int(datetime.fromisoformat(x.get('published_at', '2000-01-01').replace('Z', '+00:00')).timestamp()) if isinstance(x.get('published_at'), str) else int(x.get('published_at', datetime.now()).timestamp()))
-            ))
+            with span("sort", articles=len(unique_articles)):
+                # Parse every date once; the sort and the response below both use it
+                published = {
+                    id(article): date_normalizer.parse(article.get('published_at'), article.get('api_source'))
+                    for article in unique_articles
+                }
+
+                # Prioritize Indian news - sort by is_indian first, then by date
+                unique_articles.sort(key=lambda x: (
+                    not x.get('is_indian', False),  # Indian articles first
+                    -(published[id(x)] or UNKNOWN_PUBLISHED_AT).timestamp()
+                ))
             
             print(f"📊 Final unique articles: {len(unique_articles)}")
             
@@ -416,38 +461,24 @@ class NewsService:
             paginated_articles = unique_articles[offset:offset + limit]
             
             # Ensure proper format for response
-            formatted_articles = []
-            for article in paginated_articles:
-                # Parse published_at to proper datetime format
-                published_at = article.get('published_at')
-                if isinstance(published_at, str):
-                    try:
-                        # Handle different datetime formats
-                        if '+0000' in published_at:
-                            published_at = published_at.replace(' +0000', '+00:00')
-                        elif 'Z' in published_at:
-                            published_at = published_at.replace('Z', '+00:00')
-                        # Parse to datetime object
-                        published_at = datetime.fromisoformat(published_at)
-                    except Exception as e:
-                        print(f"Warning: Could not parse date '{published_at}': {e}")
-                        published_at = datetime.now()
-                elif not isinstance(published_at, datetime):
-                    published_at = datetime.now()
+            with span("format", articles=len(paginated_articles)):
+                formatted_articles = []
+                for article in paginated_articles:
+                    published_at = published[id(article)] or datetime.now(timezone.utc)
                 
-                formatted_articles.append({
-                    "id": article.get('id'),
-                    "title": article.get('title', ''),
-                    "content": article.get('content', article.get('description', '')),
-                    "url": article.get('url', ''),
-                    "published_at": published_at,
-                    "topic": article.get('topic', 'general'),
-                    "summary": article.get('summary', article.get('description', '')),
-                    "source_name": article.get('source_name', article.get('source', 'Unknown')),
-                    "source_bias_score": article.get('source_bias_score'),
-                    "is_indian": article.get('is_indian', False),
-                    "api_source": article.get('api_source', 'unknown')
-                })
+                    formatted_articles.append({
+                        "id": article.get('id'),
+                        "title": article.get('title', ''),
+                        "content": article.get('content', article.get('description', '')),
+                        "url": article.get('url', ''),
+                        "published_at": published_at,
+                        "topic": article.get('topic', 'general'),
+                        "summary": article.get('summary', article.get('description', '')),
+                        "source_name": article.get('source_name', article.get('source', 'Unknown')),
+                        "source_bias_score": article.get('source_bias_score'),
+                        "is_indian": article.get('is_indian', False),
+                        "api_source": article.get('api_source', 'unknown')
+                    })
             
             return formatted_articles
             
@@ -498,6 +529,8 @@ class NewsService:
             
             # Fetch articles from API
             articles_data = await self.fetch_news_from_api(source_id)
+            # NewsAPI truncates content; store the page text instead (pages are cached, so repeats are cheap)
+            await article_enricher.enrich(articles_data)
             
             for article_data in articles_data:
                 # Check if article already exists
@@ -511,7 +544,7 @@ class NewsService:
                         title=article_data.get("title", ""),
                         content=article_data.get("content", ""),
                         url=article_data.get("url", ""),
-                        published_at=datetime.fromisoformat(article_data.get("publishedAt", "").replace("Z", "+00:00")),
+                        published_at=date_normalizer.parse(article_data.get("publishedAt"), "newsapi") or datetime.now(timezone.utc),
                         source_id=source.id,
                         topic=self._extract_topic(article_data.get("title", "")),
                         summary=article_data.get("description", "")
@@ -599,6 +632,33 @@ class NewsService:
         logger.info(f"Compatible APIs for {country_code}: {compatible_apis}")
         return compatible_apis
 
+    def get_country_providers(self, country_code: str) -> List[Tuple[str, Callable[[], Awaitable[List[dict]]]]]:
+        """
+        Providers to query for a country, as (name, fetch) pairs
+        Only providers that support the country and have an API key configured are included
+        """
+        compatible_apis = self.get_compatible_apis_for_country(country_code)
+        # "currents" is always listed, so check for a provider that actually covers the country;
+        # the keyword-based providers are not queried for countries nothing else supports
+        if not any(country_code in countries for countries in self.api_compatibility.values()):
+            logger.error(f"No APIs support country code: {country_code}")
+            return []
+        candidates = [
+            ("newsapi", "newsapi" in compatible_apis and self.newsapi_keys, lambda: self.fetch_newsapi_by_country(country_code)),
+            ("gnews", "gnews" in compatible_apis and self.gnews_api_key, lambda: self.fetch_gnews_by_country(country_code)),
+            ("mediastack", "mediastack" in compatible_apis and self.mediastack_key, lambda: self.fetch_mediastack_by_country(country_code)),
+            # Currents uses keywords, so it is always available
+            ("currents", self.currents_api_key, lambda: self.fetch_currents_by_country(country_code)),
+            ("guardian", self.guardian_api_key, lambda: self.fetch_guardian_news(country_code)),
+            ("nytimes", self.nytimes_keys, lambda: self.fetch_nytimes_news(country_code)),
+            ("serpapi", self.serpapi_key, lambda: self.fetch_serpapi_news(country_code)),
+            ("newsdata_io", self.newsdata_io_key, lambda: self.fetch_newsdata_io_news(country_code)),
+            ("worldnews", self.worldnews_key, lambda: self.fetch_worldnews_api(country_code)),
+            # RSS feeds (only for India)
+            ("rss", country_code.lower() == "in", self.fetch_india_rss_feeds),
+        ]
+        return [(name, fetch) for name, enabled, fetch in candidates if enabled]
+
     async def fetch_news_by_country(self, country_input: str) -> List[dict]:
         """Fetch news for specific country with enhanced validation and error handling"""
         try:
@@ -609,118 +669,43 @@ class NewsService:
                 logger.error(f"Invalid country code: {country_input}")
                 return []
             
-            # Get compatible APIs
-            compatible_apis = self.get_compatible_apis_for_country(country_code)
-            
-            if not compatible_apis:
-                logger.error(f"No APIs support country code: {country_code}")
+            providers = self.get_country_providers(country_code)
+            if not providers:
                 return []
-            
-            logger.info(f"Fetching news for {country_code} using APIs: {compatible_apis}")
+            logger.info(f"Fetching news for {country_code} using: {[name for name, _ in providers]}")
             
             results = []
-
-            # NEWS API
-            if "newsapi" in compatible_apis and self.news_api_key:
-                try:
-                    newsapi_articles = await self.fetch_newsapi_by_country(country_code)
-                    logger.info(f"✅ NewsAPI {country_code}: {len(newsapi_articles)} articles")
-                    results.extend(newsapi_articles)
-                except Exception as e:
-                    logger.error(f"❌ NewsAPI failed for {country_code}: {e}")
-
-            # GNEWS API
-            if "gnews" in compatible_apis and self.gnews_api_key:
-                try:
-                    gnews_articles = await self.fetch_gnews_by_country(country_code)
-                    logger.info(f"✅ GNews {country_code}: {len(gnews_articles)} articles")
-                    results.extend(gnews_articles)
-                except Exception as e:
-                    logger.error(f"❌ GNews failed for {country_code}: {e}")
-
-            # MEDIASTACK API
-            if "mediastack" in compatible_apis and self.mediastack_key:
-                try:
-                    mediastack_articles = await self.fetch_mediastack_by_country(country_code)
-                    logger.info(f"✅ Mediastack {country_code}: {len(mediastack_articles)} articles")
-                    results.extend(mediastack_articles)
-                except Exception as e:
-                    logger.error(f"❌ Mediastack failed for {country_code}: {e}")
-
-            # CURRENTS API (always available with keywords)
-            if self.currents_api_key:
-                try:
-                    currents_articles = await self.fetch_currents_by_country(country_code)
-                    logger.info(f"✅ Currents {country_code}: {len(currents_articles)} articles")
-                    results.extend(currents_articles)
-                except Exception as e:
-                    logger.error(f"❌ Currents failed for {country_code}: {e}")
-
-            # GUARDIAN API
-            if self.guardian_api_key:
-                try:
-                    guardian_articles = await self.fetch_guardian_news(country_code)
-                    logger.info(f"✅ Guardian {country_code}: {len(guardian_articles)} articles")
-                    results.extend(guardian_articles)
-                except Exception as e:
-                    logger.error(f"❌ Guardian failed for {country_code}: {e}")
-
-            # NY TIMES API
-            if self.nytimes_api_key:
-                try:
-                    nytimes_articles = await self.fetch_nytimes_news(country_code)
-                    logger.info(f"✅ NY Times {country_code}: {len(nytimes_articles)} articles")
-                    results.extend(nytimes_articles)
-                except Exception as e:
-                    logger.error(f"❌ NY Times failed for {country_code}: {e}")
-
-            # SERPAPI (Google News)
-            if self.serpapi_key:
-                try:
-                    serpapi_articles = await self.fetch_serpapi_news(country_code)
-                    logger.info(f"✅ SerpAPI {country_code}: {len(serpapi_articles)} articles")
-                    results.extend(serpapi_articles)
-                except Exception as e:
-                    logger.error(f"❌ SerpAPI failed for {country_code}: {e}")
-
-            # NEWSDATA.IO API
-            if self.newsdata_io_key:
-                try:
-                    newsdata_articles = await self.fetch_newsdata_io_news(country_code)
-                    logger.info(f"✅ NewsData.io {country_code}: {len(newsdata_articles)} articles")
-                    results.extend(newsdata_articles)
-                except Exception as e:
-                    logger.error(f"❌ NewsData.io failed for {country_code}: {e}")
-
-            # WORLDNEWS API
-            if self.worldnews_key:
+            for name, fetch in providers:
+                started = time.perf_counter()
+                token = _propagate_provider_errors.set(True)
                 try:
-                    worldnews_articles = await self.fetch_worldnews_news(country_code)
-                    logger.info(f"✅ WorldNews {country_code}: {len(worldnews_articles)} articles")
-                    results.extend(worldnews_articles)
+                    with span("provider.fetch", provider=name, country=country_code) as current:
+                        provider_articles = await fetch()
+                        current.set_attribute("articles", len(provider_articles))
+                    record_provider_fetch(name, country_code, time.perf_counter() - started, len(provider_articles))
+                    logger.info(f"✅ {name} {country_code}: {len(provider_articles)} articles")
+                    results.extend(provider_articles)
                 except Exception as e:
-                    logger.error(f"❌ WorldNews failed for {country_code}: {e}")
-
-            # RSS feeds (only for India)
-            if country_code.lower() == "in":
-                try:
-                    rss_articles = await self.fetch_india_rss_feeds()
-                    logger.info(f"✅ RSS Feeds: {len(rss_articles)} articles")
-                    results.extend(rss_articles)
-                except Exception as e:
-                    logger.error(f"❌ RSS failed: {e}")
+                    record_provider_fetch(name, country_code, time.perf_counter() - started, 0, failed=True)
+                    logger.error(f"❌ {name} failed for {country_code}: {e}")
+                finally:
+                    _propagate_provider_errors.reset(token)
 
             # Remove duplicates by title
-            seen_titles = set()
-            unique_results = []
-            for article in results:
-                title = article.get("title", "").strip().lower()
-                if title and title not in seen_titles:
-                    unique_results.append(article)
-                    seen_titles.add(title)
+            with span("merge", articles=len(results)) as current:
+                seen_titles = set()
+                unique_results = []
+                for article in results:
+                    title = article.get("title", "").strip().lower()
+                    if title and title not in seen_titles:
+                        unique_results.append(article)
+                        seen_titles.add(title)
+                current.set_attribute("unique_articles", len(unique_results))
+            record_dedup("country", len(results), len(unique_results))
 
             # Sort by published date (descending)
-            unique_results.sort(key=lambda x: x.get("published_at", ""), reverse=True)
+            with span("sort", articles=len(unique_results)):
+                unique_results.sort(key=lambda x: x.get("published_at", ""), reverse=True)
 
             logger.info(f"🔄 Final results for {country_code}: {len(unique_results)} unique articles")
             return unique_results[:100]  # Limit to 100 articles
@@ -730,35 +715,95 @@ class NewsService:
             logger.error(traceback.format_exc())
             return []
 
+    async def stream_news_by_country(self, country_input: str) -> AsyncIterator[dict]:
+        """
+        Yield country articles as each provider returns, deduplicated by title against
+        everything already yielded, followed by one summary record with per-provider status
+        """
+        started = time.monotonic()
+        country_code = self.validate_and_normalize_country_code(country_input)
+        if not country_code:
+            yield {"type": "summary", "country": country_input, "error": "unsupported country",
+                   "providers": {}, "total_count": 0}
+            return
+
+        async def run(name: str, fetch: Callable[[], Awaitable[List[dict]]]):
+            # Each task runs in a copy of the context, so this only affects this provider's fetch
+            _propagate_provider_errors.set(True)
+            provider_started = time.monotonic()
+            with span("provider.fetch", provider=name, country=country_code) as current:
+                try:
+                    provider_articles = await fetch()
+                except Exception as e:
+                    current.record_exception(e)
+                    return name, [], str(e), time.monotonic() - provider_started
+                current.set_attribute("articles", len(provider_articles))
+                return name, provider_articles, None, time.monotonic() - provider_started
+
+        providers = self.get_country_providers(country_code)
+        tasks = [asyncio.create_task(run(name, fetch)) for name, fetch in providers]
+        seen_titles = set()
+        provider_status = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                name, provider_articles, error, elapsed = await next_done
+                record_provider_fetch(name, country_code, elapsed, len(provider_articles), failed=error is not None)
+                sent = 0
+                for article in provider_articles:
+                    title = (article.get("title") or "").strip().lower()
+                    if not title or title in seen_titles:
+                        continue
+                    seen_titles.add(title)
+                    sent += 1
+                    yield {"type": "article", "provider": name, "article": article}
+                record_dedup("country_stream", len(provider_articles), sent)
+                provider_status[name] = {
+                    "status": "error" if error else "ok",
+                    "count": len(provider_articles),
+                    "sent": sent,
+                    "duplicates": len(provider_articles) - sent,
+                    "elapsed_ms": round(elapsed * 1000),
+                    **({"error": error} if error else {}),
+                }
+        finally:
+            # The client may disconnect mid-stream; don't leave provider calls running
+            for task in tasks:
+                task.cancel()
+
+        yield {
+            "type": "summary",
+            "country": country_code,
+            "providers": provider_status,
+            "total_count": len(seen_titles),
+            "elapsed_ms": round((time.monotonic() - started) * 1000),
+        }
+
     async def fetch_gnews_by_country(self, country_code: str) -> List[dict]:
         """Fetch news from GNews API for specific country"""
         articles = []
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Country-specific news
-                params = {
-                    'apikey': self.gnews_api_key,
-                    'country': country_code,
-                    'lang': 'en',
-                    'max': 50
-                }
-                response = await client.get('https://gnews.io/api/v4/top-headlines', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                for article in data.get('articles', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publishedAt', ''),
-                        'source': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
-                        'api_source': 'gnews'
-                    })
+            # Country-specific news
+            params = {
+                'apikey': self.gnews_api_key,
+                'country': country_code,
+                'lang': 'en',
+                'max': 50
+            }
+            data = await provider_gateway.get_json('gnews', 'https://gnews.io/api/v4/top-headlines', params=params, api_key=self.gnews_api_key)
+            for article in data.get('articles', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publishedAt', ''),
+                    'source': f"GNews - {article.get('source', {}).get('name', 'Unknown')}",
+                    'api_source': 'gnews'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from GNews for {country_code}: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from GNews for {country_code}: {str(e)}")
         
         return articles
 
@@ -767,30 +812,26 @@ class NewsService:
         articles = []
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Country-specific news
-                params = {
-                    'apiKey': self.news_api_key,
-                    'country': country_code,
-                    'language': 'en',
-                    'pageSize': 50
-                }
-                response = await client.get('https://newsapi.org/v2/top-headlines', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                for article in data.get('articles', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publishedAt', ''),
-                        'source': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
-                        'api_source': 'newsapi'
-                    })
+            # Country-specific news
+            params = {
+                'country': country_code,
+                'language': 'en',
+                'pageSize': 50
+            }
+            data = await provider_gateway.get_json_pooled(self.newsapi_keys, 'https://newsapi.org/v2/top-headlines', params=params)
+            for article in data.get('articles', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publishedAt', ''),
+                    'source': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
+                    'api_source': 'newsapi'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from NewsAPI for {country_code}: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from NewsAPI for {country_code}: {str(e)}")
         
         return articles
 
@@ -799,30 +840,27 @@ class NewsService:
         articles = []
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Country-specific news
-                params = {
-                    'access_key': self.mediastack_key,
-                    'countries': country_code,
-                    'languages': 'en',
-                    'limit': 50
-                }
-                response = await client.get('http://api.mediastack.com/v1/news', params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                for article in data.get('data', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('published_at', ''),
-                        'source': f"Mediastack - {article.get('source', 'Unknown')}",
-                        'api_source': 'mediastack'
-                    })
+            # Country-specific news
+            params = {
+                'access_key': self.mediastack_key,
+                'countries': country_code,
+                'languages': 'en',
+                'limit': 50
+            }
+            data = await provider_gateway.get_json('mediastack', 'http://api.mediastack.com/v1/news', params=params, api_key=self.mediastack_key)
+            for article in data.get('data', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('description', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('published_at', ''),
+                    'source': f"Mediastack - {article.get('source', 'Unknown')}",
+                    'api_source': 'mediastack'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from Mediastack for {country_code}: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from Mediastack for {country_code}: {str(e)}")
         
         return articles
 
@@ -838,32 +876,31 @@ class NewsService:
                 # Get keywords for other countries
                 keywords = self.country_keywords.get(country_code, [country_code.upper()])
             
-            async with httpx.AsyncClient() as client:
-                for keyword in keywords[:3]:  # Use top 3 keywords
-                    params = {
-                        'apiKey': self.currents_api_key,
-                        'language': 'en',
-                        'keywords': keyword,
-                        'page_size': 20
-                    }
-                    # Use the search endpoint instead of latest-news
-                    response = await client.get('https://api.currentsapi.services/v1/search', params=params)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    for article in data.get('news', []):
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'content': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published', ''),
-                            'source': f"Currents - {article.get('domain', 'Unknown')}",
-                            'api_source': 'currents'
-                        })
+            for keyword in keywords[:3]:  # Use top 3 keywords
+                if len(articles) >= 20:
+                    # One search already filled the page; save the remaining quota
+                    break
+                params = {
+                    'apiKey': self.currents_api_key,
+                    'language': 'en',
+                    'keywords': keyword,
+                    'page_size': 20
+                }
+                # Use the search endpoint instead of latest-news
+                data = await provider_gateway.get_json('currents', 'https://api.currentsapi.services/v1/search', params=params, api_key=self.currents_api_key)
+                for article in data.get('news', []):
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'content': article.get('description', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('published', ''),
+                        'source': f"Currents - {article.get('domain', 'Unknown')}",
+                        'api_source': 'currents'
+                    })
                         
         except Exception as e:
-            print(f"Error fetching from Currents API for {country_code}: {str(e)}")
-            traceback.print_exc()
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from Currents API for {country_code}: {str(e)}")
         
         return articles
 
@@ -871,41 +908,33 @@ class NewsService:
         """Fetch news from Indian RSS feeds"""
         articles = []
         
-        try:
-            for feed in self.india_rss_feeds:
+        async def fetch_feed(feed: dict) -> List[dict]:
+            with span("rss.fetch", feed=feed['name'], country="in") as current:
                 try:
-                    # Parse RSS feed
-                    feed_data = feedparser.parse(feed['url'])
-                    
-                    for entry in feed_data.entries[:10]:  # Get top 10 from each feed
-                        # Parse date
-                        published_at = ""
-                        try:
-                            if hasattr(entry, 'published'):
-                                published_at = parser.parse(entry.published).isoformat()
-                            elif hasattr(entry, 'updated'):
-                                published_at = parser.parse(entry.updated).isoformat()
-                            else:
-                                published_at = datetime.now().isoformat()
-                        except:
-                            published_at = datetime.now().isoformat()
-                        
-                        articles.append({
-                            'title': entry.title,
-                            'description': getattr(entry, 'summary', ''),
-                            'url': entry.link,
-                            'published_at': published_at,
-                            'source': f"RSS - {feed['source']}",
-                            'is_indian': True,
-                            'api_source': 'rss'
-                        })
-                        
+                    response = await provider_gateway.client.get(feed['url'], timeout=Config.RSS_FETCH_TIMEOUT_SECONDS)
+                    response.raise_for_status()
+                    # Parsing, date handling and HTML stripping happen in the normalization pool
+                    feed_articles = await normalization_pool.run(normalize_feed, response.content, feed['source'], True)
                 except Exception as e:
-                    print(f"❌ Error fetching RSS feed {feed['name']}: {str(e)}")
-                    continue
+                    current.record_exception(e)
+                    logger.warning(f"Error fetching RSS feed {feed['name']}: {str(e)}")
+                    return e
+                current.set_attribute("articles", len(feed_articles))
+                return feed_articles
+        
+        try:
+            results = await asyncio.gather(*(fetch_feed(feed) for feed in self.india_rss_feeds))
+            failures = [result for result in results if isinstance(result, Exception)]
+            if failures and len(failures) == len(results):
+                # Only a provider failure when no feed at all could be read
+                raise failures[0]
+            for feed_articles in results:
+                if not isinstance(feed_articles, Exception):
+                    articles.extend(feed_articles)
                     
         except Exception as e:
-            print(f"❌ Error fetching RSS feeds: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching RSS feeds: {str(e)}")
         
         return articles
 
@@ -918,37 +947,34 @@ class NewsService:
             if not self.guardian_api_key:
                 return articles
                 
-            async with httpx.AsyncClient() as client:
-                # Guardian API uses sections and queries
-                sections = ['world', 'politics', 'business', 'technology']
+            # Guardian API uses sections and queries
+            sections = ['world', 'politics', 'business', 'technology']
                 
-                for section in sections:
-                    params = {
-                        'api-key': self.guardian_api_key,
-                        'section': section,
-                        'page-size': 10,
-                        'show-fields': 'headline,byline,thumbnail,short-url'
-                    }
-                    
-                    if country_code == 'in':
-                        params['q'] = 'India'
+            for section in sections:
+                params = {
+                    'api-key': self.guardian_api_key,
+                    'section': section,
+                    'page-size': 10,
+                    'show-fields': 'headline,byline,thumbnail,short-url'
+                }
                     
-                    response = await client.get('https://content.guardianapis.com/search', params=params)
-                    response.raise_for_status()
+                if country_code == 'in':
+                    params['q'] = 'India'
                     
-                    data = response.json()
-                    for article in data.get('response', {}).get('results', []):
-                        articles.append({
-                            'title': article.get('webTitle', ''),
-                            'description': article.get('fields', {}).get('headline', ''),
-                            'url': article.get('webUrl', ''),
-                            'published_at': article.get('webPublicationDate', ''),
-                            'source': 'Guardian',
-                            'api_source': 'guardian'
-                        })
+                data = await provider_gateway.get_json('guardian', 'https://content.guardianapis.com/search', params=params, api_key=self.guardian_api_key)
+                for article in data.get('response', {}).get('results', []):
+                    articles.append({
+                        'title': article.get('webTitle', ''),
+                        'description': article.get('fields', {}).get('headline', ''),
+                        'url': article.get('webUrl', ''),
+                        'published_at': article.get('webPublicationDate', ''),
+                        'source': 'Guardian',
+                        'api_source': 'guardian'
+                    })
                         
         except Exception as e:
-            print(f"Error fetching from Guardian API: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from Guardian API: {str(e)}")
         
         return articles
 
@@ -958,41 +984,32 @@ class NewsService:
         articles = []
         
         try:
-            if not self.nytimes_api_key:
+            if not self.nytimes_keys:
                 return articles
                 
-            async with httpx.AsyncClient() as client:
-                # Try multiple NY Times endpoints
-                endpoints = [
-                    'https://api.nytimes.com/svc/topstories/v2/world.json',
-                    'https://api.nytimes.com/svc/topstories/v2/politics.json',
-                    'https://api.nytimes.com/svc/topstories/v2/business.json'
-                ]
+            # Try multiple NY Times endpoints
+            endpoints = [
+                'https://api.nytimes.com/svc/topstories/v2/world.json',
+                'https://api.nytimes.com/svc/topstories/v2/politics.json',
+                'https://api.nytimes.com/svc/topstories/v2/business.json'
+            ]
+            
+            for endpoint in endpoints:
+                data = await provider_gateway.get_json_pooled(self.nytimes_keys, endpoint)
                 
-                for endpoint in endpoints:
-                    params = {'api-key': self.nytimes_api_key}
-                    
-                    response = await client.get(endpoint, params=params)
-                    if response.status_code == 429 and self.nytimes_api_key_2:
-                        # Try second key if rate limited
-                        params = {'api-key': self.nytimes_api_key_2}
-                        response = await client.get(endpoint, params=params)
-                    
-                    response.raise_for_status()
+                for article in data.get('results', [])[:5]:  # Limit per endpoint
+                    articles.append({
+                        'title': article.get('title', ''),
+                        'description': article.get('abstract', ''),
+                        'url': article.get('url', ''),
+                        'published_at': article.get('published_date', ''),
+                        'source': 'New York Times',
+                        'api_source': 'nytimes'
+                    })
                     
-                    data = response.json()
-                    for article in data.get('results', [])[:5]:  # Limit per endpoint
-                        articles.append({
-                            'title': article.get('title', ''),
-                            'description': article.get('abstract', ''),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published_date', ''),
-                            'source': 'New York Times',
-                            'api_source': 'nytimes'
-                        })
-                        
         except Exception as e:
-            print(f"Error fetching from NY Times API: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from NY Times API: {str(e)}")
         
         return articles
 
@@ -1005,33 +1022,30 @@ class NewsService:
             if not self.serpapi_key:
                 return articles
                 
-            async with httpx.AsyncClient() as client:
-                query = "India news" if country_code == "in" else "latest news"
+            query = "India news" if country_code == "in" else "latest news"
                 
-                params = {
-                    'engine': 'google_news',
-                    'q': query,
-                    'gl': country_code,
-                    'hl': 'en',
-                    'api_key': self.serpapi_key
-                }
-                
-                response = await client.get('https://serpapi.com/search', params=params)
-                response.raise_for_status()
+            params = {
+                'engine': 'google_news',
+                'q': query,
+                'gl': country_code,
+                'hl': 'en',
+                'api_key': self.serpapi_key
+            }
                 
-                data = response.json()
-                for article in data.get('news_results', [])[:15]:
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('snippet', ''),
-                        'url': article.get('link', ''),
-                        'published_at': article.get('date', ''),
-                        'source': f"Google News - {article.get('source', 'Unknown')}",
-                        'api_source': 'serpapi'
-                    })
+            data = await provider_gateway.get_json('serpapi', 'https://serpapi.com/search', params=params, api_key=self.serpapi_key)
+            for article in data.get('news_results', [])[:15]:
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('snippet', ''),
+                    'url': article.get('link', ''),
+                    'published_at': article.get('date', ''),
+                    'source': f"Google News - {article.get('source', 'Unknown')}",
+                    'api_source': 'serpapi'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from SerpAPI: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from SerpAPI: {str(e)}")
         
         return articles
 
@@ -1044,30 +1058,27 @@ class NewsService:
             if not self.newsdata_io_key:
                 return articles
                 
-            async with httpx.AsyncClient() as client:
-                params = {
-                    'apikey': self.newsdata_io_key,
-                    'country': country_code,
-                    'language': 'en',
-                    'size': 10
-                }
-                
-                response = await client.get('https://newsdata.io/api/1/news', params=params)
-                response.raise_for_status()
+            params = {
+                'apikey': self.newsdata_io_key,
+                'country': country_code,
+                'language': 'en',
+                'size': 10
+            }
                 
-                data = response.json()
-                for article in data.get('results', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'url': article.get('link', ''),
-                        'published_at': article.get('pubDate', ''),
-                        'source': f"NewsData.io - {article.get('source_id', 'Unknown')}",
-                        'api_source': 'newsdata_io'
-                    })
+            data = await provider_gateway.get_json('newsdata_io', 'https://newsdata.io/api/1/news', params=params, api_key=self.newsdata_io_key)
+            for article in data.get('results', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('description', ''),
+                    'url': article.get('link', ''),
+                    'published_at': article.get('pubDate', ''),
+                    'source': f"NewsData.io - {article.get('source_id', 'Unknown')}",
+                    'api_source': 'newsdata_io'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from NewsData.io: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from NewsData.io: {str(e)}")
         
         return articles
 
@@ -1080,30 +1091,27 @@ class NewsService:
             if not self.worldnews_key:
                 return articles
                 
-            async with httpx.AsyncClient() as client:
-                params = {
-                    'api-key': self.worldnews_key,
-                    'source-countries': country_code,
-                    'language': 'en',
-                    'number': 10
-                }
-                
-                response = await client.get('https://api.worldnewsapi.com/search-news', params=params)
-                response.raise_for_status()
+            params = {
+                'api-key': self.worldnews_key,
+                'source-countries': country_code,
+                'language': 'en',
+                'number': 10
+            }
                 
-                data = response.json()
-                for article in data.get('news', []):
-                    articles.append({
-                        'title': article.get('title', ''),
-                        'description': article.get('summary', ''),
-                        'url': article.get('url', ''),
-                        'published_at': article.get('publish_date', ''),
-                        'source': f"WorldNews - {article.get('source', 'Unknown')}",
-                        'api_source': 'worldnews'
-                    })
+            data = await provider_gateway.get_json('worldnews', 'https://api.worldnewsapi.com/search-news', params=params, api_key=self.worldnews_key)
+            for article in data.get('news', []):
+                articles.append({
+                    'title': article.get('title', ''),
+                    'description': article.get('summary', ''),
+                    'url': article.get('url', ''),
+                    'published_at': article.get('publish_date', ''),
+                    'source': f"WorldNews - {article.get('source', 'Unknown')}",
+                    'api_source': 'worldnews'
+                })
                     
         except Exception as e:
-            print(f"Error fetching from WorldNews API: {str(e)}")
+            raise_if_propagating(e)
+            logger.warning(f"Error fetching from WorldNews API: {str(e)}")
         
         return articles
 
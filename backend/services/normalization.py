@@ -0,0 +1,278 @@
+import asyncio
+import html
+import logging
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter
+from datetime import datetime, timezone
+from functools import partial
+from html.parser import HTMLParser
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import feedparser
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    LexborHTMLParser = None
+    SELECTOLAX_AVAILABLE = False
+
+from config import Config
+from utils.dates import date_normalizer
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Module-level functions are pure and picklable so they can run in worker processes
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def strip_html(value: Optional[str]) -> str:
+    """Plain text of an HTML fragment: tags dropped, entities decoded, whitespace collapsed"""
+    if not value:
+        return ""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def simplify_title(title: Optional[str]) -> str:
+    """Lower-cased title with punctuation removed, used to spot the same story from different sources"""
+    title = (title or "").strip().lower()
+    return "".join(c for c in title if c.isalnum() or c.isspace()).strip()
+
+
+def unique_title_indices(titles: Sequence[Optional[str]]) -> List[int]:
+    """Indices of the first article for every distinct simplified title (empty titles are dropped)"""
+    seen = set()
+    keep = []
+    for index, title in enumerate(titles):
+        simplified = simplify_title(title)
+        if simplified and simplified not in seen:
+            seen.add(simplified)
+            keep.append(index)
+    return keep
+
+
+def unique_title_indices_batch(batches: Sequence[Sequence[Optional[str]]]) -> List[List[int]]:
+    return [unique_title_indices(titles) for titles in batches]
+
+
+def _entry_published_at(entry, source: str) -> str:
+    for field in ('published', 'updated'):
+        # feedparser has usually parsed the date already; the raw string is the fallback
+        parsed = date_normalizer.parse(getattr(entry, f'{field}_parsed', None))
+        if parsed is None:
+            parsed = date_normalizer.parse(getattr(entry, field, None), source)
+        if parsed is not None:
+            return parsed.isoformat()
+    return datetime.now(timezone.utc).isoformat()
+
+
+def normalize_feed(content: bytes, source: str, is_indian: bool, max_entries: int = 10) -> List[dict]:
+    """Parse a downloaded RSS/Atom document into canonical article dicts"""
+    feed_data = feedparser.parse(content)
+    articles = []
+    for entry in feed_data.entries[:max_entries]:
+        summary = strip_html(getattr(entry, 'summary', ''))
+        articles.append({
+            'title': strip_html(getattr(entry, 'title', '')),
+            'description': summary,
+            'url': getattr(entry, 'link', ''),
+            'published_at': _entry_published_at(entry, source),
+            'source': f"RSS - {source}",
+            'is_indian': is_indian,
+            'api_source': 'rss',
+            'image_url': '',
+            'content': summary,
+        })
+    return articles
+
+
+# Page furniture that never holds article text
+_BOILERPLATE_TAGS = {
+    "script", "style", "noscript", "template", "nav", "header", "footer", "aside", "form", "iframe", "svg",
+    "figure", "button", "select",
+}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Shorter paragraphs are mostly captions, bylines and share prompts
+_MIN_PARAGRAPH_CHARS = 40
+# A paragraph's text counts fully for its parent and 3/4 and 1/2 for the next two levels up, so a story
+# whose paragraphs sit in separate wrappers still beats a denser but shorter block
+_CONTAINER_DEPTH = 3
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+Paragraph = Tuple[Tuple[int, ...], str]
+
+
+def extract_article_text(page: bytes, charset: Optional[str] = None) -> str:
+    """Main text of an article page: the paragraphs of the element holding the most paragraph text"""
+    text = _decode_page(page, charset)
+    paragraphs = _lexbor_paragraphs(text) if SELECTOLAX_AVAILABLE else _stdlib_paragraphs(text)
+    scores: Counter = Counter()
+    for containers, paragraph in paragraphs:
+        for level, container in enumerate(containers):
+            scores[container] += len(paragraph) * (1 - level / 4)
+    if not scores:
+        return ""
+    best = scores.most_common(1)[0][0]
+    return "\n\n".join(paragraph for containers, paragraph in paragraphs if best in containers)
+
+
+def _decode_page(page: bytes, charset: Optional[str]) -> str:
+    if not charset:
+        match = _META_CHARSET_RE.search(page[:4096])
+        charset = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return page.decode(charset, errors="replace")
+    except LookupError:
+        return page.decode("utf-8", errors="replace")
+
+
+def _lexbor_paragraphs(text: str) -> List[Paragraph]:
+    tree = LexborHTMLParser(text)
+    tree.strip_tags(list(_BOILERPLATE_TAGS))
+    paragraphs = []
+    for node in tree.css("p"):
+        paragraph = _SPACE_RE.sub(" ", node.text(deep=True, separator=" ")).strip()
+        if len(paragraph) < _MIN_PARAGRAPH_CHARS:
+            continue
+        containers = []
+        parent = node.parent
+        while parent is not None and len(containers) < _CONTAINER_DEPTH:
+            containers.append(parent.mem_id)
+            parent = parent.parent
+        paragraphs.append((tuple(containers), paragraph))
+    return paragraphs
+
+
+class _ParagraphCollector(HTMLParser):
+    """Fallback when selectolax is not installed; tolerates unclosed tags like browsers do"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[Paragraph] = []
+        self._open: List[Tuple[str, int]] = []
+        self._next_id = 0
+        self._skipping = 0
+        self._paragraph: Optional[List[str]] = None
+        self._paragraph_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        if tag == "p" and self._paragraph is not None:
+            self._close(self._paragraph_depth)
+        self._next_id += 1
+        self._open.append((tag, self._next_id))
+        if tag in _BOILERPLATE_TAGS:
+            self._skipping += 1
+        elif tag == "p" and not self._skipping:
+            self._paragraph = []
+            self._paragraph_depth = len(self._open) - 1
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth][0] == tag:
+                self._close(depth)
+                return
+
+    def handle_data(self, data):
+        if self._paragraph is not None and not self._skipping:
+            self._paragraph.append(data)
+
+    def _close(self, depth: int):
+        """Close the element open at `depth` and everything opened inside it"""
+        if self._paragraph is not None and depth <= self._paragraph_depth:
+            paragraph = _SPACE_RE.sub(" ", " ".join(self._paragraph)).strip()
+            if len(paragraph) >= _MIN_PARAGRAPH_CHARS:
+                parents = self._open[max(0, self._paragraph_depth - _CONTAINER_DEPTH):self._paragraph_depth]
+                # Pages without <html>/<body> still have the document itself as a container
+                containers = tuple(element for _, element in reversed(parents)) or (0,)
+                self.paragraphs.append((containers, paragraph))
+            self._paragraph = None
+        self._skipping -= sum(1 for tag, _ in self._open[depth:] if tag in _BOILERPLATE_TAGS)
+        del self._open[depth:]
+
+
+def _stdlib_paragraphs(text: str) -> List[Paragraph]:
+    collector = _ParagraphCollector()
+    collector.feed(text)
+    collector.close()
+    if collector._paragraph is not None:
+        collector._close(collector._paragraph_depth)
+    return collector.paragraphs
+
+
+def _with_date_hits(fn: Callable[..., Any], args, kwargs) -> Tuple[Any, Dict[str, int]]:
+    """Run fn in a worker and return its result with the date-format hits it caused"""
+    before = Counter(date_normalizer.hits)
+    result = fn(*args, **kwargs)
+    return result, dict(date_normalizer.hits - before)
+
+
+class NormalizationPool:
+    """Runs CPU-bound normalization on a process pool, a thread pool or inline.
+
+    Process workers are started lazily with the spawn method (the API process
+    has threads running, which fork does not get along with). If the pool
+    breaks, for instance because a worker was killed, it is replaced on the
+    next call.
+    """
+
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None):
+        self.mode = (mode or Config.NORMALIZATION_EXECUTOR).lower()
+        self.workers = workers or Config.NORMALIZATION_WORKERS
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="normalize")
+        return self._executor
+
+    def warm(self):
+        """Start the workers now, so the first ingest does not pay for interpreter startup"""
+        executor = self._get_executor()
+        if executor is not None:
+            for _ in range(self.workers):
+                executor.submit(strip_html, "")
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with span("normalize", function=fn.__name__, executor=self.mode):
+            return await self._run(fn, *args, **kwargs)
+
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        executor = self._get_executor()
+        if executor is None:
+            return fn(*args, **kwargs)
+        if self.mode != "process":
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+        try:
+            result, date_hits = await self._run_in_process(executor, fn, args, kwargs)
+        except BrokenProcessPool:
+            logger.warning("Normalization process pool broke, starting a new one")
+            self._executor = None
+            result, date_hits = await self._run_in_process(self._get_executor(), fn, args, kwargs)
+        # Workers count date formats in their own process; fold them into this one's stats
+        date_normalizer.merge_hits(date_hits)
+        return result
+
+    @staticmethod
+    async def _run_in_process(executor: Executor, fn: Callable[..., Any], args, kwargs):
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(_with_date_hits, fn, args, kwargs))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+normalization_pool = NormalizationPool()
@@ -0,0 +1,230 @@
+import asyncio
+import html
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Stack = Tuple[str, ...]
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile or memory trace is requested while one is already running"""
+
+
+@dataclass
+class Profile:
+    samples: Counter
+    seconds: float
+    interval: float
+    pid: int
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, readable by flamegraph.pl, speedscope and inferno"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def flamegraph(self, title: str) -> str:
+        return render_flamegraph(self.samples, title)
+
+
+class SamplingProfiler:
+    """Samples thread stacks from a background thread; nothing is hooked into the profiled code"""
+
+    def __init__(self):
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def profile(self, seconds: float, interval: float, all_threads: bool = False) -> Profile:
+        """Sample the event loop thread (or every thread) for `seconds`, without blocking the loop"""
+        if self._running:
+            raise ProfilerBusy("A profile is already running on this worker")
+        self._running = True
+        try:
+            # Called from the loop, so this is the thread serving requests
+            target = None if all_threads else threading.get_ident()
+            samples: Counter = Counter()
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample, args=(samples, stop, interval, target), name="sampling-profiler", daemon=True
+            )
+            started = time.monotonic()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(sampler.join)
+            return Profile(samples, time.monotonic() - started, interval, os.getpid())
+        finally:
+            self._running = False
+
+    @staticmethod
+    def _sample(samples: Counter, stop: threading.Event, interval: float, target: Optional[int]):
+        # The sampler needs the GIL too, so samples land where the profiled thread releases it
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not stop.wait(interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (target is not None and ident != target):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                samples[tuple(reversed(stack))] += 1
+
+
+class MemoryProfiler:
+    """On-demand tracemalloc; tracing slows allocations, so it only runs between start() and stop()"""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int):
+        if tracemalloc.is_tracing():
+            raise ProfilerBusy("tracemalloc is already tracing on this worker")
+        tracemalloc.start(frames)
+        self._previous = None
+        logger.info(f"tracemalloc started ({frames} frames per allocation)")
+
+    def stop(self):
+        tracemalloc.stop()
+        self._previous = None
+        logger.info("tracemalloc stopped")
+
+    def snapshot(self, limit: int, group_by: str, compare: bool) -> dict:
+        """Top allocators grouped by 'lineno', 'filename' or 'traceback'; compare diffs against the last snapshot"""
+        if not tracemalloc.is_tracing():
+            raise ProfilerBusy("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        previous, self._previous = self._previous, snapshot
+        if compare and previous is not None:
+            stats = snapshot.compare_to(previous, group_by)
+        else:
+            stats = snapshot.statistics(group_by)
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "group_by": group_by,
+            "compared": compare and previous is not None,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "total_bytes": sum(stat.size for stat in stats),
+            "top": [_allocator(stat, group_by) for stat in stats[:limit]],
+        }
+
+
+def _allocator(stat, group_by: str) -> dict:
+    frame = stat.traceback[0]
+    entry = {
+        "location": _short_path(frame.filename) if group_by == "filename" else f"{_short_path(frame.filename)}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    if group_by == "traceback":
+        entry["traceback"] = [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+    return entry
+
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(filename: str) -> str:
+    """Trim site-packages, the standard library and the project root so frames stay readable"""
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    for prefix in (_PROJECT_ROOT, _STDLIB):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+FRAME_HEIGHT = 17
+FLAMEGRAPH_WIDTH = 1200
+
+
+def render_flamegraph(samples: Dict[Stack, int], title: str) -> str:
+    """A self-contained SVG flamegraph (roots at the bottom); hover a frame for its sample count"""
+    total = sum(samples.values())
+    root: dict = {"count": 0, "children": {}}
+    for stack, count in samples.items():
+        root["count"] += count
+        node = root
+        for frame in stack:
+            node = node["children"].setdefault(frame, {"count": 0, "children": {}})
+            node["count"] += count
+
+    def depth(node: dict) -> int:
+        return 1 + max((depth(child) for child in node["children"].values()), default=0)
+
+    levels = depth(root) - 1
+    height = (levels + 2) * FRAME_HEIGHT + 10
+    scale = FLAMEGRAPH_WIDTH / total if total else 0
+    rects: List[str] = []
+
+    def draw(node: dict, x: float, level: int):
+        for name, child in sorted(node["children"].items()):
+            width = child["count"] * scale
+            if width >= 0.5:
+                y = height - (level + 1) * FRAME_HEIGHT
+                label = html.escape(name)
+                share = child["count"] / total * 100
+                # Warm colours vary by name so neighbouring frames are told apart
+                hue = hash(name.split(" (", 1)[0]) % 60
+                text = html.escape(name[:int(width / 7)]) if width > 30 else ""
+                rects.append(
+                    f'<g><title>{label} ({child["count"]} samples, {share:.2f}%)</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FRAME_HEIGHT - 1}" '
+                    f'fill="hsl({hue},85%,60%)" rx="2"/>'
+                    f'<text x="{x + 3:.1f}" y="{y + FRAME_HEIGHT - 5}">{text}</text></g>'
+                )
+                draw(child, x, level + 1)
+            x += width
+
+    draw(root, 0.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{FLAMEGRAPH_WIDTH}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="{FLAMEGRAPH_WIDTH / 2}" y="14" text-anchor="middle" font-size="13">'
+        f'{html.escape(title)} ({total} samples)</text>'
+        + "".join(rects)
+        + "</svg>"
+    )
+
+
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,452 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from redis.exceptions import WatchError
+
+from config import Config
+from services.provider_health import provider_health
+from utils.cache import async_redis_client, skip_caching
+from utils.metrics import PROVIDER_FALLBACKS, PROVIDER_HTTP_SECONDS
+from utils.tracing import current_span, set_attributes, span
+
+logger = logging.getLogger(__name__)
+
+# Query parameter carrying the API key, for providers used through a KeyPool
+PROVIDER_KEY_PARAMS = {
+    "newsapi": "apiKey",
+    "nytimes": "api-key",
+}
+
+
+class ProviderUnavailable(Exception):
+    """The provider can't be called right now and no cached response exists"""
+
+
+class ProviderLimits:
+    def __init__(self, daily_quota: int, rate_per_second: float, burst: int):
+        self.daily_quota = daily_quota
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+
+
+def _key_id(api_key: Optional[str]) -> str:
+    """Short, non-reversible identifier so API keys never appear in Redis key names"""
+    if not api_key:
+        return "nokey"
+    return hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class ProviderGateway:
+    """Single entry point for outbound news-provider API calls.
+
+    Every call goes through, in order:
+
+    * a cooldown set after a 429, honouring Retry-After;
+    * a circuit breaker per provider (see provider_health), with the request
+      timeout derived from that provider's observed p95 latency, and an
+      optional hedged duplicate once a request outlives the p90;
+    * a token bucket per provider key for the per-second limit;
+    * a daily quota per provider key, paced so that the budget is spread over
+      the day instead of being burned at the first peak.
+
+    Cooldown, token bucket and quota live in Redis so every worker shares them,
+    reached through the asyncio client so no round-trip blocks the event loop;
+    breakers and latency windows are per process. Successful responses
+    are kept as long-lived stale copies; when a call is not allowed, the stale
+    copy is returned instead, and ProviderUnavailable is raised only if there is
+    none. A single pooled httpx client is shared by all calls.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pools: Dict[str, KeyPool] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(Config.PROVIDER_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+    @staticmethod
+    def limits(provider: str) -> ProviderLimits:
+        return ProviderLimits(*Config.PROVIDER_LIMITS.get(provider, Config.PROVIDER_LIMITS["default"]))
+
+    async def get_json(
+        self,
+        provider: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        api_key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        allow_stale: bool = True,
+        key_param: Optional[str] = None,
+        hedge_api_key: Optional[str] = None,
+    ) -> Any:
+        """GET a provider endpoint and return the decoded JSON body.
+
+        With ``allow_stale=False`` a blocked or failed call raises instead of
+        falling back to the cached copy, so a key pool can try its next key.
+        ``hedge_api_key`` (sent in the ``key_param`` query parameter) is the key
+        a hedged duplicate uses; without one the duplicate reuses ``api_key``.
+
+        Raises:
+            ProviderUnavailable: quota, rate limit, cooldown or an open circuit blocked the call and nothing is cached
+            httpx.HTTPError: the provider was called and failed
+        """
+        with span("provider.request", provider=provider, url=url) as current:
+            store_key = self._stale_key(provider, url, params, api_key)
+            stale_key = store_key if allow_stale else None
+            key_id = _key_id(api_key)
+            breaker = provider_health.breaker(provider)
+            latency = provider_health.latency(provider)
+
+            if await async_redis_client.exists(f"provider:cooldown:{provider}:{key_id}"):
+                return await self._serve_stale(provider, stale_key, "cooling down after 429")
+            if not breaker.allow():
+                return await self._serve_stale(provider, stale_key, "circuit open")
+            if not await self._acquire_token(provider, key_id):
+                breaker.release()
+                return await self._serve_stale(provider, stale_key, "rate limit")
+            if not await self._consume_daily_budget(provider, key_id):
+                breaker.release()
+                return await self._serve_stale(provider, stale_key, "daily budget")
+
+            started = time.monotonic()
+            timeout = latency.timeout()
+            try:
+                hedge_params = params
+                if hedge_api_key and key_param:
+                    hedge_params = {**(params or {}), key_param: hedge_api_key}
+                else:
+                    hedge_api_key = api_key
+                # A hedge may win, so the status below belongs to whichever key sent the response
+                response, key_id = await self._send(
+                    provider, url, params, headers, timeout, key_id, hedge_params, _key_id(hedge_api_key)
+                )
+            except asyncio.CancelledError:
+                # The caller gave up (e.g. a closed stream); that says nothing about the provider
+                breaker.release()
+                raise
+            except httpx.TransportError as e:
+                # Timeouts and connection failures: the provider is unhealthy
+                elapsed = time.monotonic() - started
+                PROVIDER_HTTP_SECONDS.labels(provider, "error").observe(elapsed)
+                if isinstance(e, httpx.TimeoutException):
+                    # Sampled at (at least) the timeout; leaving timeouts out would bias the p95,
+                    # and the timeout derived from it, low exactly when the provider slows down
+                    latency.record(max(elapsed, timeout))
+                breaker.record_failure(f"{type(e).__name__}: {e}")
+                return await self._serve_stale_or_raise(provider, stale_key, "request failed", e)
+            elapsed = time.monotonic() - started
+            PROVIDER_HTTP_SECONDS.labels(provider, str(response.status_code)).observe(elapsed)
+            current.set_attribute("http.status_code", response.status_code)
+
+            if response.status_code >= 500:
+                breaker.record_failure(f"HTTP {response.status_code}")
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    return await self._serve_stale_or_raise(provider, stale_key, f"HTTP {response.status_code}", e)
+            latency.record(elapsed)
+
+            if response.status_code == 429:
+                # Throttled, not healthy: the cooldown handles it, and the failure streak must not reset
+                breaker.release()
+                await self._start_cooldown(provider, key_id, response.headers.get("retry-after"))
+                try:
+                    return await self._serve_stale(provider, stale_key, "429 from provider")
+                except ProviderUnavailable:
+                    response.raise_for_status()
+            breaker.record_success(elapsed)
+            if response.is_error:
+                skip_caching()
+            response.raise_for_status()
+
+            data = response.json()
+            await async_redis_client.setex(store_key, Config.PROVIDER_STALE_TTL_SECONDS, response.text)
+            return data
+
+    async def _send(self, provider: str, url: str, params: Optional[Dict[str, Any]],
+                    headers: Optional[Dict[str, str]], timeout: float, key_id: str,
+                    hedge_params: Optional[Dict[str, Any]], hedge_key_id: str) -> Tuple[httpx.Response, str]:
+        """Send the request, hedging it if it outlives the provider's p90 latency.
+
+        The hedge is skipped when the hedge budget, the token bucket or the daily
+        quota of the hedge key has no room for it. The first response wins and
+        the other request is cancelled; an error only loses if the other
+        request still has a chance. Returns the response and the id of the key
+        that sent it.
+        """
+        hedge_budget = provider_health.hedge_budget(provider)
+        hedge_budget.record_request()
+        primary = asyncio.ensure_future(self.client.get(url, params=params, headers=headers, timeout=timeout))
+        key_ids = {primary: key_id}
+        pending = {primary}
+        try:
+            delay = provider_health.hedge_delay(provider)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and await self._can_hedge(provider, hedge_key_id, hedge_budget):
+                    logger.info(f"{provider} slower than its p90 ({delay:.2f}s), sending a hedged request")
+                    current_span().set_attribute("hedged", True)
+                    hedge = asyncio.ensure_future(
+                        self.client.get(url, params=hedge_params, headers=headers, timeout=timeout)
+                    )
+                    key_ids[hedge] = hedge_key_id
+                    pending.add(hedge)
+
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), key_ids[task]
+                if not pending:
+                    task = done.pop()
+                    return task.result(), key_ids[task]
+        finally:
+            for task in pending:
+                task.cancel()
+            # Wait for the losers to unwind so their connections go back to the pool
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _can_hedge(self, provider: str, key_id: str, hedge_budget) -> bool:
+        return (
+            hedge_budget.try_hedge()
+            and await self._take_token(provider, key_id) <= 0
+            and await self._consume_daily_budget(provider, key_id)
+        )
+
+    async def _consume_daily_budget(self, provider: str, key_id: str) -> bool:
+        """Count one request against today's quota, unless that would run ahead of the pacing curve"""
+        limits = self.limits(provider)
+        if limits.daily_quota <= 0:
+            return True
+
+        now = datetime.now(timezone.utc)
+        day_key = self._quota_key(provider, key_id, now)
+        async with async_redis_client.pipeline() as pipe:
+            # One round-trip; the expiry only matters for the first request of the day
+            used, _ = await pipe.incr(day_key).expire(day_key, 2 * 86400).execute()
+
+        if used > self.paced_allowance(limits.daily_quota, now):
+            await async_redis_client.decr(day_key)
+            return False
+        return True
+
+    @staticmethod
+    def _quota_key(provider: str, key_id: str, now: datetime) -> str:
+        return f"provider:quota:{provider}:{key_id}:{now:%Y%m%d}"
+
+    async def remaining_quota(self, provider: str, api_keys: List[Optional[str]]) -> List[float]:
+        """Requests left today for each key (infinite when the provider has no daily quota)"""
+        limits = self.limits(provider)
+        if limits.daily_quota <= 0 or not api_keys:
+            return [float("inf")] * len(api_keys)
+        now = datetime.now(timezone.utc)
+        used = await async_redis_client.mget([self._quota_key(provider, _key_id(key), now) for key in api_keys])
+        return [limits.daily_quota - int(count or 0) for count in used]
+
+    @staticmethod
+    def paced_allowance(daily_quota: int, now: datetime) -> int:
+        """Requests allowed so far today: a linear share of the quota plus a burst reserve"""
+        elapsed = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds() / 86400
+        reserve = max(1, int(daily_quota * Config.PROVIDER_PACING_RESERVE))
+        return min(daily_quota, int(daily_quota * elapsed) + reserve)
+
+    async def _acquire_token(self, provider: str, key_id: str) -> bool:
+        """Wait for a token-bucket slot, giving up after PROVIDER_MAX_RATE_WAIT_SECONDS"""
+        deadline = time.monotonic() + Config.PROVIDER_MAX_RATE_WAIT_SECONDS
+        while True:
+            wait = await self._take_token(provider, key_id)
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    async def _take_token(self, provider: str, key_id: str) -> float:
+        """Take a token if one is available; otherwise return the seconds until one will be"""
+        limits = self.limits(provider)
+        if limits.rate_per_second <= 0:
+            return 0.0
+
+        bucket_key = f"provider:bucket:{provider}:{key_id}"
+        async with async_redis_client.pipeline() as pipe:
+            for _ in range(5):
+                try:
+                    await pipe.watch(bucket_key)
+                    tokens, updated = await pipe.hmget(bucket_key, "tokens", "updated")
+                    now = time.time()
+                    tokens = float(tokens) if tokens is not None else float(limits.burst)
+                    updated = float(updated) if updated is not None else now
+                    tokens = min(float(limits.burst), tokens + (now - updated) * limits.rate_per_second)
+
+                    wait = 0.0
+                    if tokens >= 1:
+                        tokens -= 1
+                    else:
+                        wait = (1 - tokens) / limits.rate_per_second
+
+                    pipe.multi()
+                    pipe.hset(bucket_key, mapping={"tokens": tokens, "updated": now})
+                    pipe.expire(bucket_key, 3600)
+                    await pipe.execute()
+                    return wait
+                except WatchError:
+                    continue
+        # Heavy contention from other workers: back off for one token interval
+        return 1 / limits.rate_per_second
+
+    def key_pool(self, provider: str) -> "KeyPool":
+        pool = self._pools.get(provider)
+        if pool is None:
+            pool = KeyPool(self, provider, Config.PROVIDER_API_KEYS.get(provider, []), PROVIDER_KEY_PARAMS[provider])
+            self._pools[provider] = pool
+        return pool
+
+    async def get_json_pooled(
+        self,
+        pool: "KeyPool",
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """Like get_json, trying each usable key of the pool before falling back to the stale copy.
+
+        Key problems (401/403, 429, a key's quota or rate limit) move on to the next
+        key; transport errors and 5xx are the provider's, so they go straight to the
+        stale copy instead.
+        """
+        params = dict(params or {})
+        stale_key = self._stale_key(pool.provider, url, params, None)
+        last_error: Exception = ProviderUnavailable(f"{pool.provider} has no usable API key")
+        candidates = await pool.candidates()
+        for index, api_key in enumerate(candidates):
+            # A hedged duplicate goes out on the next key that is still usable, so it does not
+            # compete for the same rate limit; keys tried earlier may have been disabled since
+            hedge_api_key = await pool.first_usable(candidates[index + 1:] + candidates[:index])
+            try:
+                return await self.get_json(
+                    pool.provider, url, params={**params, pool.key_param: api_key}, api_key=api_key,
+                    headers=headers, allow_stale=False, key_param=pool.key_param, hedge_api_key=hedge_api_key,
+                )
+            except ProviderUnavailable as e:
+                last_error = e
+            except httpx.TransportError as e:
+                return await self._serve_stale_or_raise(pool.provider, stale_key, "request failed", e)
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status >= 500:
+                    return await self._serve_stale_or_raise(pool.provider, stale_key, f"HTTP {status}", e)
+                if status in (401, 403):
+                    # The hedged duplicate may have been the one rejected, so disable the key it carried
+                    rejected_key = e.request.url.params.get(pool.key_param) or api_key
+                    await pool.disable(rejected_key, Config.PROVIDER_KEY_DISABLE_SECONDS, f"HTTP {status}")
+                elif status != 429:
+                    # 429s already put the key into cooldown; anything else is not the key's fault
+                    raise
+                last_error = e
+        return await self._serve_stale_or_raise(pool.provider, stale_key, "no usable API key", last_error)
+
+    async def _start_cooldown(self, provider: str, key_id: str, retry_after: Optional[str]):
+        try:
+            seconds = int(retry_after) if retry_after else Config.PROVIDER_COOLDOWN_SECONDS
+        except ValueError:
+            seconds = Config.PROVIDER_COOLDOWN_SECONDS
+        await async_redis_client.setex(f"provider:cooldown:{provider}:{key_id}", max(1, seconds), 1)
+        logger.warning(f"{provider} returned 429, pausing calls for {seconds}s")
+
+    @staticmethod
+    def _stale_key(provider: str, url: str, params: Optional[Dict[str, Any]], api_key: Optional[str]) -> str:
+        # The API key is left out so every key of a provider shares the same stale copy
+        request_params = sorted((k, str(v)) for k, v in (params or {}).items() if v != api_key)
+        digest = hashlib.sha1(json.dumps([url, request_params]).encode("utf-8")).hexdigest()
+        return f"provider:stale:{provider}:{digest}"
+
+    @staticmethod
+    async def _serve_stale(provider: str, stale_key: Optional[str], reason: str) -> Any:
+        # Whatever the caller makes of this, it is not a fresh answer worth caching
+        skip_caching()
+        cached = await async_redis_client.get(stale_key) if stale_key else None
+        if stale_key is not None:
+            # Without a stale key the caller (a key pool) falls back itself and counts the outcome once
+            PROVIDER_FALLBACKS.labels(provider, reason, "unavailable" if cached is None else "stale").inc()
+        set_attributes(current_span(), fallback=reason, served_stale=cached is not None)
+        if cached is None:
+            raise ProviderUnavailable(f"{provider} skipped ({reason}) and no cached response is available")
+        logger.info(f"{provider} skipped ({reason}), serving cached response")
+        return json.loads(cached)
+
+    @classmethod
+    async def _serve_stale_or_raise(cls, provider: str, stale_key: Optional[str], reason: str, error: Exception) -> Any:
+        try:
+            return await cls._serve_stale(provider, stale_key, reason)
+        except ProviderUnavailable:
+            raise error
+
+
+class KeyPool:
+    """All API keys configured for one provider.
+
+    Keys are handed out most-remaining-quota first, rotating between keys with
+    equal headroom. A key leaves the rotation while it is cooling down after a
+    429, or for PROVIDER_KEY_DISABLE_SECONDS after a 401/403; both states are
+    kept in Redis so every worker skips the key.
+    """
+
+    def __init__(self, gateway: ProviderGateway, provider: str, keys: List[str], key_param: str):
+        self.gateway = gateway
+        self.provider = provider
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        self.key_param = key_param
+        self._rotation = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    async def candidates(self) -> List[str]:
+        """Usable keys in the order they should be tried"""
+        if not self.keys:
+            return []
+        offset = next(self._rotation) % len(self.keys)
+        usable = await self._usable(self.keys[offset:] + self.keys[:offset])
+        remaining = dict(zip(usable, await self.gateway.remaining_quota(self.provider, usable)))
+        # sorted() is stable, so keys with equal headroom keep their rotated order
+        return sorted(usable, key=lambda key: -remaining[key])
+
+    async def first_usable(self, keys: List[str]) -> Optional[str]:
+        """The first of `keys` that is neither disabled nor cooling down"""
+        usable = await self._usable(keys)
+        return usable[0] if usable else None
+
+    async def _usable(self, keys: List[str]) -> List[str]:
+        if not keys:
+            return []
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                key_id = _key_id(key)
+                pipe.exists(f"provider:disabled:{self.provider}:{key_id}", f"provider:cooldown:{self.provider}:{key_id}")
+            blocked = await pipe.execute()
+        return [key for key, flags in zip(keys, blocked) if not flags]
+
+    async def disable(self, api_key: str, seconds: int, reason: str):
+        await async_redis_client.setex(f"provider:disabled:{self.provider}:{_key_id(api_key)}", max(1, seconds), reason)
+        logger.warning(f"{self.provider} key {_key_id(api_key)} taken out of rotation for {seconds}s ({reason})")
+
+
+provider_gateway = ProviderGateway()
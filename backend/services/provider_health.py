@@ -0,0 +1,186 @@
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LatencyTracker:
+    """Rolling window of response times that derives a timeout from the observed p95
+
+    Requests that time out are recorded at their timeout, so a slowdown pushes the
+    p95 (and the timeout) up rather than leaving only the fast responses sampled.
+    """
+
+    def __init__(self, window: int, min_samples: int = 10):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    def timeout(self) -> float:
+        """p95 x multiplier, clamped; the configured ceiling until enough samples exist"""
+        ceiling = Config.PROVIDER_TIMEOUT_SECONDS
+        p95 = self.p95()
+        if p95 is None:
+            return ceiling
+        return max(Config.PROVIDER_MIN_TIMEOUT_SECONDS, min(ceiling, p95 * Config.PROVIDER_TIMEOUT_P95_MULTIPLIER))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one provider.
+
+    Errors, timeouts and responses slower than the latency SLO all count as
+    failures; a 429 counts as neither a failure nor a success. After ``failure_threshold`` of them in a row the breaker opens and
+    calls are refused; once ``reset_seconds`` have passed a single probe is let
+    through (half-open), and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int, reset_seconds: float, slo_seconds: float):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slo_seconds = slo_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Give back a probe slot when the call was not made after all"""
+        self._probe_in_flight = False
+
+    def record_success(self, latency: float):
+        if latency > self.slo_seconds:
+            self.record_failure(f"{latency:.2f}s exceeds the {self.slo_seconds}s SLO")
+            return
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.provider} closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, reason: str):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"Circuit for {self.provider} opened after {self.consecutive_failures} consecutive failures "
+                f"(last: {reason}); retrying in {self.reset_seconds}s"
+            )
+
+
+class HedgeBudget:
+    """Caps hedges at a share of the most recent requests sent to a provider"""
+
+    def __init__(self, window: int, max_ratio: float):
+        # One entry per request sent; True for hedges
+        self._hedged: Deque[bool] = deque(maxlen=window)
+        self.max_ratio = max_ratio
+
+    def record_request(self):
+        self._hedged.append(False)
+
+    def try_hedge(self) -> bool:
+        if sum(self._hedged) + 1 > self.max_ratio * len(self._hedged):
+            return False
+        self._hedged.append(True)
+        return True
+
+    @property
+    def hedged(self) -> int:
+        return sum(self._hedged)
+
+
+class ProviderHealth:
+    """Circuit breaker, latency tracker and hedge budget per provider, created on first use"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._hedges: Dict[str, HedgeBudget] = {}
+
+    def reset(self):
+        """Forget every breaker, latency window and hedge budget"""
+        self._breakers.clear()
+        self._latencies.clear()
+        self._hedges.clear()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                provider,
+                Config.PROVIDER_BREAKER_FAILURE_THRESHOLD,
+                Config.PROVIDER_BREAKER_RESET_SECONDS,
+                Config.PROVIDER_LATENCY_SLO_SECONDS,
+            )
+            self._breakers[provider] = breaker
+        return breaker
+
+    def latency(self, provider: str) -> LatencyTracker:
+        tracker = self._latencies.get(provider)
+        if tracker is None:
+            tracker = LatencyTracker(Config.PROVIDER_LATENCY_WINDOW)
+            self._latencies[provider] = tracker
+        return tracker
+
+    def hedge_budget(self, provider: str) -> HedgeBudget:
+        budget = self._hedges.get(provider)
+        if budget is None:
+            budget = HedgeBudget(Config.PROVIDER_LATENCY_WINDOW, Config.PROVIDER_HEDGE_MAX_RATIO)
+            self._hedges[provider] = budget
+        return budget
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """Seconds to wait before hedging (the observed p90), or None if the provider is not hedged"""
+        if provider not in Config.PROVIDER_HEDGE_PROVIDERS:
+            return None
+        return self.latency(provider).percentile(0.9)
+
+    def snapshot(self) -> Dict[str, dict]:
+        providers = set(self._breakers) | set(self._latencies)
+        return {
+            provider: {
+                "state": self.breaker(provider).state,
+                "consecutive_failures": self.breaker(provider).consecutive_failures,
+                "p95_seconds": self.latency(provider).p95(),
+                "timeout_seconds": self.latency(provider).timeout(),
+                "recent_hedges": self.hedge_budget(provider).hedged,
+            }
+            for provider in sorted(providers)
+        }
+
+
+provider_health = ProviderHealth()
@@ -0,0 +1,203 @@
+import html
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, bindparam, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# The database marks matches with these control characters; the text around them
+# is HTML-escaped before they are swapped for the real tags
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+# Set by ensure_search_index; search is disabled when the backend has no full-text support
+search_enabled = False
+
+# SQLite: external-content FTS5 table kept in sync with `articles` by triggers
+SQLITE_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, summary, content='articles', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+        INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END
+    """,
+]
+
+# Postgres: generated, weighted tsvector column with a GIN index
+POSTGRES_INDEX_DDL = [
+    """
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH_SQL = """
+    SELECT a.id, a.title, a.content, a.url, a.published_at, a.topic, a.summary,
+           s.name AS source_name, s.bias_score AS source_bias_score, s.country AS source_country,
+           bm25(articles_fts, 10.0, 2.0) AS rank,
+           snippet(articles_fts, 0, '{start}', '{end}', '…', 16) AS title_highlight,
+           snippet(articles_fts, 1, '{start}', '{end}', '…', 32) AS summary_highlight
+    FROM articles_fts
+    JOIN articles a ON a.id = articles_fts.rowid
+    LEFT JOIN news_sources s ON s.id = a.source_id
+    WHERE articles_fts MATCH :query {filters}
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+"""
+
+POSTGRES_SEARCH_SQL = """
+    SELECT a.id, a.title, a.content, a.url, a.published_at, a.topic, a.summary,
+           s.name AS source_name, s.bias_score AS source_bias_score, s.country AS source_country,
+           -ts_rank_cd(a.search_vector, q.query, 32) AS rank,
+           ts_headline('english', coalesce(a.title, ''), q.query,
+                       'StartSel={start}, StopSel={end}, HighlightAll=true') AS title_highlight,
+           ts_headline('english', coalesce(a.summary, ''), q.query,
+                       'StartSel={start}, StopSel={end}, MaxWords=35, MinWords=15') AS summary_highlight
+    FROM articles a
+    CROSS JOIN websearch_to_tsquery('english', :query) AS q(query)
+    LEFT JOIN news_sources s ON s.id = a.source_id
+    WHERE a.search_vector @@ q.query {filters}
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the full-text index structures for the engine's backend.
+
+    Returns whether search is available; a backend without full-text support
+    (e.g. SQLite built without FTS5) disables search instead of failing startup.
+    """
+    global search_enabled
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                is_new = not inspect(conn).has_table("articles_fts")
+                for statement in SQLITE_INDEX_DDL:
+                    conn.execute(text(statement))
+                if is_new:
+                    # Index the rows that existed before the triggers did
+                    conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+            elif dialect == "postgresql":
+                for statement in POSTGRES_INDEX_DDL:
+                    conn.execute(text(statement))
+            else:
+                logger.warning(f"Full-text search is not supported on '{dialect}'")
+                search_enabled = False
+                return False
+    except DBAPIError as e:
+        logger.error(f"Full-text search disabled, the search index could not be created: {e}")
+        search_enabled = False
+        return False
+    search_enabled = True
+    return True
+
+
+def highlight(value: Optional[str]) -> Optional[str]:
+    """HTML-escape a highlighted snippet, then turn the match markers into <mark> tags"""
+    if value is None:
+        return None
+    return html.escape(value).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+class SearchService:
+    """Ranked full-text search over article headlines and summaries"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """Turn free text into an FTS5 query of quoted terms (implicit AND).
+
+        Quoting every term keeps user input from being parsed as FTS5 syntax.
+        """
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"' for term in terms)
+
+    async def search(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        source: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict]:
+        if not search_enabled:
+            raise ValueError("Full-text search is not available on this database")
+        dialect = self.db.bind.dialect.name
+        if dialect == "sqlite":
+            query = self.build_match_query(query)
+            template = SQLITE_SEARCH_SQL
+        elif dialect == "postgresql":
+            template = POSTGRES_SEARCH_SQL
+        else:
+            raise ValueError(f"Full-text search is not supported on '{dialect}'")
+
+        if not query.strip():
+            return []
+
+        params = {"query": query, "limit": limit, "offset": offset}
+        filters = []
+        if country:
+            filters.append("AND lower(s.country) = :country")
+            params["country"] = country.lower()
+        if source:
+            filters.append("AND lower(s.name) LIKE :source")
+            params["source"] = f"%{source.lower()}%"
+        if start:
+            filters.append("AND a.published_at >= :start")
+            params["start"] = start
+        if end:
+            filters.append("AND a.published_at <= :end")
+            params["end"] = end
+
+        statement = text(
+            template.format(filters=" ".join(filters), start=_MATCH_START, end=_MATCH_END)
+        )
+        # Bind dates through the DateTime type so they compare in the column's storage format
+        date_params = [bindparam(name, type_=DateTime(timezone=True)) for name in ("start", "end") if name in params]
+        if date_params:
+            statement = statement.bindparams(*date_params)
+        statement = statement.columns(published_at=DateTime(timezone=True))
+
+        result = await self.db.execute(statement, params)
+        rows = []
+        for row in result.mappings().all():
+            row = dict(row)
+            # Article text is stored as received, so only the escaped highlight may carry markup
+            row["title_highlight"] = highlight(row["title_highlight"])
+            row["summary_highlight"] = highlight(row["summary_highlight"])
+            rows.append(row)
+        return rows
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Unit tests never talk to a real Redis; the in-process fake is shared by the sync and asyncio clients
+os.environ["USE_REAL_REDIS"] = "False"
+# ...nor to the development database: each run gets a fresh SQLite file
+TEST_DIR = tempfile.mkdtemp(prefix="news-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'news.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import models  # noqa: E402
+from database import database  # noqa: E402
+from database.database import SessionLocal, dispose_engines, engine, get_async_engine  # noqa: E402
+from utils.cache import async_redis_client  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def loop():
+    # One loop for the whole run: the asyncio Redis client keeps its connections bound to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    # Pooled aiosqlite connections each keep a thread alive, which would stop the interpreter from exiting
+    loop.run_until_complete(dispose_engines())
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine to completion on the shared loop"""
+    return loop.run_until_complete
+
+
+@pytest.fixture(autouse=True)
+def clean_redis(run):
+    run(async_redis_client.flushall())
+    yield
+
+
+@pytest.fixture
+def db():
+    """Sync session on an empty schema, for arranging rows"""
+    models.Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def async_db(db, run):
+    """AsyncSession on the same schema, as the read endpoints get it"""
+    get_async_engine()
+    session = database._AsyncSessionLocal()
+    yield session
+    run(session.close())
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database.models import Article, BiasAnalysis, NewsSource
+from services.archive_service import ArchiveService
+
+NOW = datetime(2024, 6, 15, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ArchiveService(archive_dir=str(tmp_path), retention_days=30)
+
+
+@pytest.fixture
+def articles(db):
+    hindu = NewsSource(name="The Hindu", country="in")
+    guardian = NewsSource(name="The Guardian", country="gb")
+    db.add_all([hindu, guardian])
+    db.flush()
+    rows = [
+        Article(title="April budget", topic="politics", source_id=hindu.id, published_at=datetime(2024, 4, 10)),
+        Article(title="April floods", topic="weather", source_id=guardian.id, published_at=datetime(2024, 4, 20)),
+        Article(title="March election", topic="politics", source_id=guardian.id, published_at=datetime(2024, 3, 5)),
+        Article(title="June match", topic="sport", source_id=hindu.id, published_at=datetime(2024, 6, 10)),
+    ]
+    db.add_all(rows)
+    db.flush()
+    db.add(BiasAnalysis(article_id=rows[0].id, bias_score=1.5))
+    db.commit()
+    return rows
+
+
+def test_retention_archives_old_articles_into_monthly_partitions(archive, articles, db):
+    archived = archive.run_retention(db, now=NOW)
+    assert archived == {"2024-04": 2, "2024-03": 1}
+    assert [article.title for article in db.query(Article)] == ["June match"]
+    assert db.query(BiasAnalysis).count() == 0
+    assert [p["partition"] for p in archive.list_partitions()] == ["2024-04", "2024-03"]
+
+
+def test_cutoff_is_taken_in_utc(archive, db):
+    source = NewsSource(name="Reuters", country="us")
+    db.add(source)
+    db.flush()
+    # 30 days before NOW is 2024-05-16 12:00 UTC; naive stored timestamps are UTC
+    db.add_all([
+        Article(title="just outside", source_id=source.id, published_at=datetime(2024, 5, 16, 11, 59)),
+        Article(title="just inside", source_id=source.id, published_at=datetime(2024, 5, 16, 12, 1)),
+    ])
+    db.commit()
+    ist_now = NOW.astimezone(timezone(timedelta(hours=5, minutes=30)))
+    assert archive.run_retention(db, now=ist_now) == {"2024-05": 1}
+    assert [article.title for article in db.query(Article)] == ["just inside"]
+
+
+def test_archived_records_keep_their_source_and_analyses(archive, articles, db):
+    archive.run_retention(db, now=NOW)
+    record = archive.query(topic="politics", country="in")[0]
+    assert record["title"] == "April budget"
+    assert record["source"]["name"] == "The Hindu"
+    assert record["bias_analyses"][0]["bias_score"] == 1.5
+    assert record["partition"] == "2024-04"
+
+
+def test_query_filters_by_date_range_newest_first(archive, articles, db):
+    archive.run_retention(db, now=NOW)
+    titles = [r["title"] for r in archive.query(start=datetime(2024, 3, 1), end=datetime(2024, 4, 15))]
+    assert titles == ["April budget", "March election"]
+    assert [r["title"] for r in archive.query(limit=1)] == ["April floods"]
+    assert [r["title"] for r in archive.query(source="guardian", topic="politics")] == ["March election"]
+
+
+def test_query_converts_aware_bounds_to_utc(archive, articles, db):
+    archive.run_retention(db, now=NOW)
+    # 2024-04-20 04:00 in UTC+5:30 is still 2024-04-19 in UTC, before the floods article
+    end = datetime(2024, 4, 20, 4, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert [r["title"] for r in archive.query(start=datetime(2024, 4, 1), end=end)] == ["April budget"]
+
+
+def test_retention_is_skipped_while_another_worker_holds_the_lock(archive, articles, db):
+    with archive.exclusive() as acquired:
+        assert acquired
+        assert archive.run_retention(db, now=NOW) == {}
+    assert db.query(Article).count() == 4
+    assert archive.run_retention(db, now=NOW) == {"2024-04": 2, "2024-03": 1}
+
+
+def test_zero_retention_keeps_everything(tmp_path, articles, db):
+    assert ArchiveService(archive_dir=str(tmp_path), retention_days=0).run_retention(db, now=NOW) == {}
+    assert db.query(Article).count() == 4
@@ -0,0 +1,59 @@
+import json
+
+from services.provider_gateway import ProviderUnavailable, _key_id, provider_gateway
+from utils.cache import async_redis_client, cache
+
+URL = "https://newsapi.example/v2/top-headlines"
+calls = []
+
+
+@cache("test_fetch", ttl=300)
+async def fetch_headlines(country: str):
+    """Stands in for the provider fetchers, which swallow gateway errors and return what they have"""
+    calls.append(country)
+    try:
+        data = await provider_gateway.get_json("newsapi", URL, params={"country": country}, api_key="key")
+    except ProviderUnavailable:
+        return []
+    return data["articles"]
+
+
+def cooling_down(run):
+    run(async_redis_client.setex(f"provider:cooldown:newsapi:{_key_id('key')}", 60, 1))
+
+
+def cached_keys(run):
+    return run(async_redis_client.keys("test_fetch:*"))
+
+
+def test_unavailable_provider_result_is_not_cached(run):
+    calls.clear()
+    cooling_down(run)
+    assert run(fetch_headlines("in")) == []
+    assert cached_keys(run) == []
+    # The next call goes back to the provider instead of serving the empty list for the whole TTL
+    run(fetch_headlines("in"))
+    assert calls == ["in", "in"]
+
+
+def test_stale_provider_copy_is_returned_but_not_cached(run):
+    calls.clear()
+    stale_key = provider_gateway._stale_key("newsapi", URL, {"country": "in"}, "key")
+    run(async_redis_client.set(stale_key, json.dumps({"articles": [{"title": "old"}]})))
+    cooling_down(run)
+    assert run(fetch_headlines("in")) == [{"title": "old"}]
+    assert cached_keys(run) == []
+
+
+def test_fresh_results_are_cached(run):
+    calls.clear()
+
+    @cache("test_fetch", ttl=300)
+    async def fetch_fresh(country: str):
+        calls.append(country)
+        return [{"title": "new"}]
+
+    assert run(fetch_fresh("us")) == [{"title": "new"}]
+    assert run(fetch_fresh("us")) == [{"title": "new"}]
+    assert calls == ["us"]
+    assert len(cached_keys(run)) == 1
@@ -0,0 +1,128 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from routers.news import ArticleResponse, CountryNewsResponse
+from services.feed_snapshot_service import FeedSnapshot
+from utils.compression import (
+    BROTLI_AVAILABLE, CompressionMiddleware, compress, decompress, encoded_etag, negotiate_encoding, precompress_variants,
+)
+
+LARGE_BODY = "headline " * 500
+
+
+def test_negotiation_honours_quality_values():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("gzip;q=bogus") is None
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli is not installed")
+def test_negotiation_prefers_brotli_on_ties_and_wildcards():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("*;q=0.5, gzip") == "gzip"
+
+
+def test_encoded_etags_differ_per_representation():
+    assert encoded_etag('"in-v3"', None) == '"in-v3"'
+    assert encoded_etag('"in-v3"', "gzip") == '"in-v3-gzip"'
+    assert encoded_etag("in-v3", "br") == "in-v3-br"
+
+
+def test_precompressed_variants_skip_small_bodies():
+    assert precompress_variants(b"tiny", {"gzip": 9}) == {None: b"tiny"}
+    body = LARGE_BODY.encode()
+    variants = precompress_variants(body, {"gzip": 9, "br": 9})
+    assert variants[None] == body
+    for encoding, compressed in variants.items():
+        if encoding:
+            assert len(compressed) < len(body)
+            assert decompress(compressed, encoding) == body
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(LARGE_BODY, headers={"ETag": '"large"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("short")
+
+    @app.get("/precompressed")
+    def precompressed():
+        return Response(compress(LARGE_BODY.encode(), "gzip"), headers={"Content-Encoding": "gzip"})
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter([b"data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_large_bodies_are_compressed_and_their_etag_weakened(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"large"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == LARGE_BODY
+
+
+def test_identity_responses_still_vary_on_accept_encoding(client):
+    for path, accept in (("/large", "identity"), ("/small", "gzip")):
+        response = client.get(path, headers={"Accept-Encoding": accept})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+    assert client.get("/large", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"large"'
+
+
+def test_encoded_and_streaming_responses_pass_through(client):
+    response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert "vary" not in response.headers
+    assert response.text == LARGE_BODY
+
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"data: 1\n\n" * 200
+
+
+def snapshot(article_count, buckets):
+    articles = [
+        ArticleResponse(id=None, title=f"Headline {number} " + "x" * 200, content="", published_at=None, url=f"https://example.com/{number}",
+                        topic="general", summary="", source_name="The Hindu", source_bias_score=0.0)
+        for number in range(article_count)
+    ]
+    return FeedSnapshot("in", 7, articles, ["gnews"], CountryNewsResponse, buckets)
+
+
+def test_snapshot_limits_round_up_to_prerendered_pages():
+    feed = snapshot(30, [10, 20, 50])
+    assert [feed.page_size(limit) for limit in (-1, 0, 5, 10, 11, 25, 500)] == [10, 10, 10, 10, 20, 30, 30]
+    assert CountryNewsResponse.model_validate_json(feed.body(15)).total_count == 20
+
+
+def test_snapshot_serves_a_precompressed_variant_per_page_and_encoding():
+    feed = snapshot(30, [10, 20])
+    encoding = feed.encoding_for(10, "gzip, br")
+    assert encoding is not None
+    assert decompress(feed.body(10, encoding), encoding) == feed.body(10)
+    assert feed.etag(10, encoding) == encoded_etag(feed.etag(10), encoding)
+    assert feed.etag(10).startswith('"in-v7-10-')
+    assert feed.etag(10) != feed.etag(20)
+    assert feed.encoding_for(10, "deflate") is None
+
+
+def test_small_snapshot_pages_are_only_served_uncompressed():
+    feed = snapshot(0, [10])
+    assert feed.page_size(10) == 0
+    assert feed.encoding_for(10, "gzip") is None
+    assert CountryNewsResponse.model_validate_json(feed.body(10)).articles == []
@@ -0,0 +1,91 @@
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import news
+from services.news_service import NewsService
+from services.provider_gateway import ProviderUnavailable, provider_gateway
+
+MEDIASTACK_DATA = {"data": [
+    {"title": "Budget passed", "url": "https://example.com/budget", "published_at": "2024-05-01T10:00:00+00:00",
+     "source": "The Hindu", "description": "Parliament passed the budget"},
+    {"title": "Monsoon arrives", "url": "https://example.com/monsoon", "published_at": "2024-05-02T10:00:00+00:00",
+     "source": "The Hindu", "description": "Rain reached Kerala"},
+    {"title": "budget passed ", "url": "https://example.com/budget-2", "published_at": "2024-05-01T11:00:00+00:00",
+     "source": "NDTV", "description": "Same story"},
+]}
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """gnews is down, newsapi answers with an HTTP error, mediastack works"""
+    async def get_json(provider, url, params=None, headers=None, api_key=None, **kwargs):
+        if provider == "gnews":
+            raise ProviderUnavailable("gnews skipped (circuit open) and no cached response is available")
+        return MEDIASTACK_DATA
+
+    async def get_json_pooled(pool, url, params=None, **kwargs):
+        request = httpx.Request("GET", url)
+        raise httpx.HTTPStatusError("Server error", request=request, response=httpx.Response(503, request=request))
+
+    def get_country_providers(self, country_code):
+        return [
+            ("gnews", lambda: self.fetch_gnews_by_country(country_code)),
+            ("newsapi", lambda: self.fetch_newsapi_by_country(country_code)),
+            ("mediastack", lambda: self.fetch_mediastack_by_country(country_code)),
+        ]
+
+    monkeypatch.setattr(provider_gateway, "get_json", get_json)
+    monkeypatch.setattr(provider_gateway, "get_json_pooled", get_json_pooled)
+    monkeypatch.setattr(NewsService, "get_country_providers", get_country_providers)
+
+
+def collect(run, country):
+    async def records():
+        return [record async for record in NewsService().stream_news_by_country(country)]
+    return run(records())
+
+
+def test_failing_providers_report_errors_while_the_others_stream(providers, run):
+    records = collect(run, "india")
+    articles, summary = records[:-1], records[-1]
+
+    assert [(record["provider"], record["article"]["title"]) for record in articles] == [
+        ("mediastack", "Budget passed"), ("mediastack", "Monsoon arrives"),
+    ]
+    assert summary["type"] == "summary" and summary["country"] == "in"
+    assert summary["total_count"] == 2
+    status = summary["providers"]
+    assert status["gnews"]["status"] == "error" and "circuit open" in status["gnews"]["error"]
+    assert status["newsapi"]["status"] == "error" and "Server error" in status["newsapi"]["error"]
+    assert status["mediastack"] == {**status["mediastack"], "status": "ok", "count": 3, "sent": 2, "duplicates": 1}
+
+
+def test_fetchers_still_swallow_errors_outside_the_stream(providers, run):
+    service = NewsService()
+    assert run(service.fetch_gnews_by_country("in")) == []
+    assert run(service.fetch_newsapi_by_country("in")) == []
+    assert [article["title"] for article in run(service.fetch_news_by_country("in"))] == [
+        "Monsoon arrives", "Budget passed",
+    ]
+
+
+def test_unsupported_country_yields_only_an_error_summary(providers, run):
+    assert collect(run, "atlantis") == [{
+        "type": "summary", "country": "atlantis", "error": "unsupported country", "providers": {}, "total_count": 0,
+    }]
+
+
+def test_stream_route_sends_ndjson_records(providers):
+    app = FastAPI()
+    app.include_router(news.router, prefix="/api/news")
+    response = TestClient(app).get("/api/news/country/in/stream")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["cache-control"] == "no-store"
+    records = [orjson.loads(line) for line in response.text.splitlines()]
+    assert records[0]["article"]["title"] == "Budget passed"
+    assert records[0]["article"]["is_indian"] is True
+    assert records[-1]["providers"]["gnews"]["status"] == "error"
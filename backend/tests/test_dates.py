@@ -0,0 +1,61 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils.dates import DATEUTIL, DateNormalizer
+
+
+def test_formats_are_parsed_to_aware_utc():
+    normalizer = DateNormalizer()
+    expected = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    for value in [
+        "2024-05-01T12:30:00Z",
+        "2024-05-01T14:30:00+02:00",
+        "2024-05-01T14:30:00+0200",
+        "Wed, 01 May 2024 12:30:00 GMT",
+        "2024-05-01 08:30:00 -0400",
+        "01 May 2024 12:30:00 +0000",
+    ]:
+        assert normalizer.parse(value) == expected, value
+
+
+def test_naive_values_are_taken_as_utc():
+    normalizer = DateNormalizer()
+    assert normalizer.parse("2024-05-01T12:30:00") == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert normalizer.parse(datetime(2024, 5, 1)) == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def test_aware_datetimes_are_converted():
+    value = datetime(2024, 5, 1, 5, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert DateNormalizer().parse(value) == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def test_struct_time_is_utc():
+    parsed = DateNormalizer().parse(time.struct_time((2024, 5, 1, 12, 0, 0, 2, 122, 0)))
+    assert parsed == datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def test_empty_and_unparseable_values():
+    normalizer = DateNormalizer()
+    assert normalizer.parse(None) is None
+    assert normalizer.parse("") is None
+    assert normalizer.parse("not a date at all") is None
+    assert normalizer.stats()["hits"] == {"unparseable": 1}
+
+
+def test_format_is_learned_per_source():
+    normalizer = DateNormalizer()
+    normalizer.parse("Wed, 01 May 2024 12:30:00 GMT", "rss")
+    assert normalizer.stats()["learned_formats"] == {"rss": "rfc822"}
+    normalizer.parse("Thu, 02 May 2024 12:30:00 GMT", "rss")
+    assert normalizer.hits["rfc822"] == 2
+
+
+def test_dateutil_is_the_fallback():
+    normalizer = DateNormalizer()
+    assert normalizer.parse("May 1st 2024, 12:30 PM UTC") == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert normalizer.hits[DATEUTIL] == 1
+
+
+def test_isoformat_uses_the_default_for_unparseable_values():
+    default = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert DateNormalizer().isoformat("garbage", default=default) == "2024-01-01T00:00:00+00:00"
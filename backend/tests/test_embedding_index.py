@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pytest
+
+from services.embedding_index import EmbeddingIndex, HashingEmbedder
+
+DOCUMENTS = [
+    (1, "Monsoon floods hit Kerala as rivers overflow"),
+    (2, "Kerala floods: rivers overflow after heavy monsoon rain"),
+    (3, "Central bank raises interest rates to curb inflation"),
+    (4, "Inflation pushes central bank toward higher interest rates"),
+    (5, "Cricket team wins the test series in Australia"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return EmbeddingIndex(index_dir=str(tmp_path), dim=256, tables=4, bits=6)
+
+
+def generations(index):
+    return sorted(entry for entry in os.listdir(index.index_dir) if entry.startswith("gen-"))
+
+
+def test_embeddings_are_unit_length_and_ignore_stopwords():
+    embedder = HashingEmbedder(128)
+    vector = embedder.embed("The floods in Kerala")
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert embedder.features("the of and") == {}
+    assert not embedder.embed("the of and").any()
+
+
+def test_related_ranks_similar_articles_first(index):
+    assert index.build(DOCUMENTS) == 5
+    assert index.size == 5
+
+    related = index.related(1, k=2)
+    assert related[0][0] == 2
+    assert all(article_id != 1 for article_id, _ in related)
+    assert index.related(3, k=1)[0][0] == 4
+
+
+def test_related_embeds_text_for_articles_newer_than_the_index(index):
+    index.build(DOCUMENTS)
+    assert index.related(99, k=1, text="Interest rates and inflation worry the central bank")[0][0] in (3, 4)
+    assert index.related(99) == []
+
+
+def test_lsh_candidates_match_brute_force_for_near_duplicates(index, monkeypatch):
+    index.build(DOCUMENTS)
+    expected = index.related(1, k=1)
+    monkeypatch.setattr(EmbeddingIndex, "BRUTE_FORCE_LIMIT", 0)
+    assert index.related(1, k=1) == expected
+
+
+def test_build_publishes_a_new_generation_and_keeps_the_previous_one(index):
+    index.build(DOCUMENTS[:2])
+    first = index.read_manifest()["generation"]
+    index.build(DOCUMENTS)
+    second = index.read_manifest()["generation"]
+    index.build(DOCUMENTS[2:])
+
+    assert generations(index) == sorted([second, index.read_manifest()["generation"]])
+    assert first not in generations(index)
+    assert index.read_manifest()["count"] == 3
+    assert index.age() < 60
+
+
+def test_other_workers_load_the_published_generation(index, tmp_path):
+    index.build(DOCUMENTS)
+    reader = EmbeddingIndex(index_dir=str(tmp_path), dim=256, tables=4, bits=6)
+    assert reader.load()
+    assert reader.size == 5
+    assert isinstance(reader._state.vectors, np.memmap)
+    assert reader.related(1, k=1) == index.related(1, k=1)
+
+
+def test_load_refuses_an_index_with_a_different_layout(index, tmp_path):
+    index.build(DOCUMENTS)
+    assert not EmbeddingIndex(index_dir=str(tmp_path), dim=128, tables=4, bits=6).load()
+    assert not EmbeddingIndex(index_dir=str(tmp_path / "empty")).load()
+
+
+def test_unreadable_manifest_counts_as_no_index(index, tmp_path):
+    (tmp_path / EmbeddingIndex.MANIFEST).write_text("{not json")
+    assert index.read_manifest() is None
+    assert index.age() is None
+
+
+def test_only_one_builder_holds_the_lock(index, tmp_path):
+    other_worker = EmbeddingIndex(index_dir=str(tmp_path), dim=256, tables=4, bits=6)
+    with index.exclusive() as acquired:
+        assert acquired
+        with other_worker.exclusive() as other_acquired:
+            assert not other_acquired
+    with other_worker.exclusive() as acquired:
+        assert acquired
+
+
+def test_empty_build_serves_no_results(index):
+    assert index.build([]) == 0
+    assert index.related(1) == []
+    assert index.read_manifest()["count"] == 0
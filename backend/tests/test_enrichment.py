@@ -0,0 +1,146 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from config import Config
+from services import enrichment_service
+from services.enrichment_service import ArticleEnricher, BlockedURL, check_url
+from services.normalization import NormalizationPool
+
+STORY = "<html><body><nav><p>Home</p></nav><article>" + "<p>" + "The council approved the budget. " * 20 + "</p></article></body></html>"
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/story",
+    "file:///etc/passwd",
+    "http:///no-host",
+    "http://127.0.0.1/",
+    "http://localhost:8000/",
+    "http://10.0.0.1/",
+    "http://169.254.169.254/latest/meta-data",
+    "http://0.0.0.0/",
+    "http://224.0.0.1/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "http://[fd00::1]/",
+])
+def test_check_url_blocks_non_public_targets(url, run):
+    with pytest.raises(BlockedURL):
+        run(check_url(url))
+
+
+def test_check_url_allows_public_addresses(run):
+    run(check_url("https://93.184.215.14/story"))
+    run(check_url("http://[2606:4700:4700::1111]:8080/story"))
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """An enricher talking to a mock news.example; hosts named *internal* count as private"""
+    async def fake_check_url(url):
+        if "internal" in url:
+            raise BlockedURL("internal host")
+
+    requests = []
+    robots = {"status": 200, "text": "User-agent: *\nDisallow: /private\n"}
+
+    def respond(request):
+        requests.append(request)
+        path = request.url.path
+        if path == "/robots.txt":
+            return httpx.Response(robots["status"], text=robots["text"])
+        if path == "/hop":
+            return httpx.Response(301, headers={"location": "/story"})
+        if path == "/escape":
+            return httpx.Response(302, headers={"location": "http://internal.example/admin"})
+        if path == "/loop":
+            return httpx.Response(302, headers={"location": "/loop"})
+        if path == "/pdf":
+            return httpx.Response(200, content=b"%PDF", headers={"content-type": "application/pdf"})
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=STORY, headers={
+            "content-type": "text/html; charset=utf-8", "etag": '"v1"', "cache-control": "max-age=600",
+        })
+
+    monkeypatch.setattr(enrichment_service, "check_url", fake_check_url)
+    monkeypatch.setattr(enrichment_service, "normalization_pool", NormalizationPool(mode="inline"))
+    monkeypatch.setattr(Config, "ENRICHMENT_ENABLED", True)
+    enricher = ArticleEnricher()
+    enricher._client = httpx.AsyncClient(transport=httpx.MockTransport(respond), follow_redirects=False)
+    return SimpleNamespace(enricher=enricher, requests=requests, robots=robots)
+
+
+def fetch(site, run, path, previous=None):
+    return run(site.enricher._fetch_page(f"http://news.example{path}", previous))
+
+
+def test_article_text_is_extracted_and_redirects_are_followed(site, run):
+    page = fetch(site, run, "/hop")
+    assert page.status == 200
+    assert page.text.startswith("The council approved the budget.")
+    assert "Home" not in page.text
+    assert page.etag == '"v1"'
+    assert [request.url.path for request in site.requests] == ["/robots.txt", "/hop", "/story"]
+
+
+def test_redirects_are_checked_and_capped(site, run):
+    page = fetch(site, run, "/escape")
+    assert page.text is None and page.status == 0
+    assert not any(request.url.host == "internal.example" for request in site.requests)
+    assert fetch(site, run, "/loop").text is None
+    assert sum(request.url.path == "/loop" for request in site.requests) == Config.ENRICHMENT_MAX_REDIRECTS + 1
+
+
+def test_robots_rules_are_honoured_and_cached(site, run):
+    assert fetch(site, run, "/private/story").text is None
+    assert fetch(site, run, "/story").text
+    assert [request.url.path for request in site.requests] == ["/robots.txt", "/story"]
+
+
+def test_unreachable_robots_blocks_and_missing_robots_allows(site, run):
+    site.robots["status"] = 503
+    assert fetch(site, run, "/story").text is None
+    site.enricher._robots.clear()
+    site.robots["status"] = 404
+    assert fetch(site, run, "/private/story").text
+
+
+def test_non_html_pages_are_not_extracted(site, run):
+    page = fetch(site, run, "/pdf")
+    assert page.text is None and page.status == 200
+
+
+def test_expired_pages_are_revalidated(site, run):
+    previous = fetch(site, run, "/story")
+    revalidated = fetch(site, run, "/story", previous)
+    assert revalidated.status == 304
+    assert revalidated.text == previous.text
+    assert site.requests[-1].headers["if-none-match"] == '"v1"'
+
+
+def test_domain_slots_are_released(site, run, monkeypatch):
+    monkeypatch.setattr(Config, "ENRICHMENT_PER_DOMAIN_CONCURRENCY", 1)
+
+    async def fetch_all():
+        return await asyncio.gather(*(site.enricher._fetch_page(f"http://news.example/story?id={n}", None) for n in range(3)))
+
+    assert all(page.text for page in run(fetch_all()))
+    assert site.enricher._domain_semaphores == {} and site.enricher._domain_users == {}
+
+
+def test_enrich_fills_short_articles_and_stores_pages(site, run, db):
+    articles = [
+        {"title": "Budget", "url": "http://news.example/story", "description": "Short summary"},
+        {"title": "Long", "url": "http://news.example/other", "content": "x" * 5000},
+    ]
+    assert run(site.enricher.enrich(articles)) == 1
+    assert articles[0]["content"].startswith("The council approved the budget.")
+
+    # Stored pages are used without any request
+    site.requests.clear()
+    again = [{"title": "Budget", "url": "http://news.example/story", "description": "Short summary"}]
+    assert run(site.enricher.enrich(again, fetch=False)) == 1
+    assert site.requests == []
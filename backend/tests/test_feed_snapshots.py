@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config import Config
+from routers import news
+from routers.news import ArticleResponse, CountryNewsResponse
+from services import feed_snapshot_service
+from services.feed_snapshot_service import FeedSnapshotService
+from services.news_service import NewsService
+
+
+def raw_article(title, source="The Hindu"):
+    return {
+        "title": title,
+        "description": f"{title} summary",
+        "url": f"https://example.com/{title.lower().replace(' ', '-')}",
+        "published_at": "2024-05-01T12:00:00Z",
+        "source": source,
+        "api_source": "gnews",
+    }
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """Country code -> articles the providers return; records every ingestion"""
+    responses = {"in": [raw_article("Budget passed"), raw_article("Monsoon arrives")]}
+    calls = []
+
+    async def fetch_news_by_country(self, country):
+        calls.append(country)
+        await asyncio.sleep(0)
+        return list(responses.get(country, []))
+
+    async def enrich(articles, fetch=True):
+        return False
+
+    monkeypatch.setattr(NewsService, "fetch_news_by_country", fetch_news_by_country)
+    monkeypatch.setattr(feed_snapshot_service.article_enricher, "enrich", enrich)
+    monkeypatch.setattr(Config, "ENRICHMENT_ENABLED", False)
+    return SimpleNamespace(responses=responses, calls=calls)
+
+
+@pytest.fixture
+def snapshots():
+    return FeedSnapshotService(response_model=CountryNewsResponse, article_model=ArticleResponse, buckets=[1, 10])
+
+
+def test_country_names_and_codes_share_one_snapshot(snapshots, feeds, run):
+    snapshot = run(snapshots.get_or_build("India"))
+    assert snapshot.country == "in"
+    assert run(snapshots.get_or_build(" IN ")) is snapshot
+    assert snapshots.get("india") is snapshot
+    assert feeds.calls == ["in"]
+    assert [article.is_indian for article in snapshot.articles] == [True, True]
+
+
+def test_unsupported_countries_never_create_entries(snapshots, feeds, run):
+    with pytest.raises(ValueError):
+        run(snapshots.get_or_build("atlantis"))
+    assert snapshots.get("atlantis") is None
+    assert snapshots.warm("atlantis") is None
+    assert snapshots._snapshots == {} and snapshots._last_requested == {} and snapshots._builds == {}
+    assert feeds.calls == []
+
+
+def test_concurrent_requests_share_one_build(snapshots, feeds, run):
+    async def first_requests():
+        return await asyncio.gather(*(snapshots.get_or_build("in") for _ in range(5)))
+
+    built = run(first_requests())
+    assert all(snapshot is built[0] for snapshot in built)
+    assert feeds.calls == ["in"]
+
+
+def test_refresh_swaps_in_a_new_version_and_keeps_the_last_good_feed(snapshots, feeds, run):
+    first = run(snapshots.get_or_build("in"))
+    feeds.responses["in"].append(raw_article("Election results"))
+    second = run(snapshots.refresh("in"))
+    assert second.version > first.version
+    assert snapshots.get("in") is second
+    assert len(second.articles) == 3
+
+    feeds.responses["in"] = []
+    assert run(snapshots.refresh("in")) is second
+
+
+def test_publish_never_replaces_a_newer_snapshot(snapshots, feeds, run):
+    newer = run(snapshots.get_or_build("in"))
+    stale = feed_snapshot_service.FeedSnapshot(
+        "in", newer.version - 1, [], [], CountryNewsResponse, [10]
+    )
+    snapshots._snapshots["in"] = stale
+    assert run(snapshots.publish("in", feeds.responses["in"])).version > stale.version
+
+
+def test_country_route_rejects_unsupported_countries(feeds, monkeypatch):
+    monkeypatch.setattr(news, "country_snapshots", FeedSnapshotService(CountryNewsResponse, ArticleResponse, [10]))
+    app = FastAPI()
+    app.include_router(news.router, prefix="/api/news")
+    client = TestClient(app)
+
+    response = client.get("/api/news/country/india?limit=1")
+    assert response.status_code == 200
+    assert response.json()["country"] == "in"
+    assert response.json()["total_count"] == 2
+    assert news.resolve_country_etag({"path": "/api/news/country/IN", "query_string": b"limit=1", "headers": []}) \
+        == response.headers["etag"]
+
+    assert client.get("/api/news/country/atlantis").status_code == 404
+    assert client.get("/api/news/stream?country=atlantis").status_code == 404
+    assert news.resolve_country_etag({"path": "/api/news/country/atlantis", "query_string": b"", "headers": []}) is None
+    assert list(news.country_snapshots._snapshots) == ["in"]
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import provider_gateway as gateway_module
+from services.provider_gateway import KeyPool, ProviderGateway, ProviderLimits, _key_id
+from services.provider_health import HedgeBudget, provider_health
+from utils.cache import async_redis_client
+
+URL = "https://gnews.test/api/v4/top-headlines"
+
+
+def test_hedge_budget_caps_the_hedge_ratio():
+    budget = HedgeBudget(window=100, max_ratio=0.1)
+    assert not budget.try_hedge()
+    for _ in range(20):
+        budget.record_request()
+    assert budget.try_hedge()
+    assert budget.try_hedge()
+    assert not budget.try_hedge()
+    assert budget.hedged == 2
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """A provider whose first key ("slow") stalls until cancelled; replies per key are set by the test"""
+    replies = {}
+    cancelled = []
+
+    async def respond(request):
+        key = request.url.params["apikey"]
+        if key == "slow":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(key)
+                raise
+        return replies[key]
+
+    monkeypatch.setattr(ProviderGateway, "limits", staticmethod(lambda provider: ProviderLimits(100, 0, 0)))
+    monkeypatch.setattr(provider_health, "hedge_delay", lambda provider: 0.01)
+    monkeypatch.setattr(provider_health, "hedge_budget", lambda provider: HedgeBudget(window=10, max_ratio=1.0))
+    gateway = ProviderGateway()
+    gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    yield gateway, replies, cancelled
+    provider_health.reset()
+
+
+def cooling_down(key, run):
+    return bool(run(async_redis_client.exists(f"provider:cooldown:gnews:{_key_id(key)}")))
+
+
+def test_hedge_wins_and_the_slow_request_is_cancelled(provider, run):
+    gateway, replies, cancelled = provider
+    replies["fast"] = httpx.Response(200, json={"articles": ["hedged"]})
+    data = run(gateway.get_json(
+        "gnews", URL, params={"apikey": "slow"}, api_key="slow", key_param="apikey", hedge_api_key="fast"
+    ))
+    assert data == {"articles": ["hedged"]}
+    # The loser was awaited before get_json returned
+    assert cancelled == ["slow"]
+
+
+def test_429_from_the_hedge_cools_down_the_hedge_key(provider, run):
+    gateway, replies, _ = provider
+    replies["fast"] = httpx.Response(429, headers={"Retry-After": "30"})
+    with pytest.raises(httpx.HTTPStatusError):
+        run(gateway.get_json(
+            "gnews", URL, params={"apikey": "slow"}, api_key="slow", key_param="apikey",
+            hedge_api_key="fast", allow_stale=False,
+        ))
+    assert cooling_down("fast", run)
+    assert not cooling_down("slow", run)
+
+
+def test_pool_disables_the_key_the_provider_rejected(provider, run):
+    gateway, replies, _ = provider
+    replies["revoked"] = httpx.Response(401)
+    replies["good"] = httpx.Response(200, json={"articles": ["fresh"]})
+    pool = KeyPool(gateway, "gnews", ["slow", "revoked", "good"], "apikey")
+
+    # "slow" is hedged with "revoked", whose 401 wins: only "revoked" leaves the rotation
+    assert run(gateway.get_json_pooled(pool, URL)) == {"articles": ["fresh"]}
+    assert run(pool.first_usable(["revoked"])) is None
+    assert run(pool.first_usable(["slow"])) == "slow"
@@ -0,0 +1,94 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from utils.http_cache import CacheRule, HTTPCacheMiddleware, body_etag, etag_matches
+
+calls = []
+
+
+async def articles(request):
+    calls.append(request.url.path)
+    return JSONResponse({"articles": [1, 2, 3]})
+
+
+async def snapshot(request):
+    calls.append(request.url.path)
+    return Response(b'{"v": 7}', media_type="application/json", headers={"ETag": '"v7"'})
+
+
+async def missing(request):
+    return JSONResponse({"detail": "not found"}, status_code=404)
+
+
+@pytest.fixture
+def client():
+    calls.clear()
+    app = Starlette(routes=[
+        Route("/articles", articles),
+        Route("/snapshot", snapshot),
+        Route("/missing", missing),
+        Route("/private", articles),
+    ])
+    app.add_middleware(HTTPCacheMiddleware, rules=[
+        CacheRule(r"/articles", max_age=60, stale_while_revalidate=30),
+        CacheRule(r"/snapshot", max_age=60, resolve_etag=lambda scope: '"v7"'),
+        CacheRule(r"/missing", max_age=60),
+        CacheRule(r"/private"),
+    ])
+    return TestClient(app)
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', 'W/"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_body_etag_and_cache_control_are_added(client):
+    response = client.get("/articles")
+    assert response.status_code == 200
+    assert response.headers["etag"] == body_etag(response.content)
+    assert response.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=30"
+
+
+def test_matching_if_none_match_gets_304(client):
+    etag = client.get("/articles").headers["etag"]
+    response = client.get("/articles", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_stale_if_none_match_gets_the_body(client):
+    response = client.get("/articles", headers={"If-None-Match": '"old"'})
+    assert response.status_code == 200
+    assert response.json() == {"articles": [1, 2, 3]}
+
+
+def test_resolved_etag_answers_304_without_running_the_endpoint(client):
+    response = client.get("/snapshot", headers={"If-None-Match": '"v7"'})
+    assert response.status_code == 304
+    assert calls == []
+
+
+def test_endpoint_etag_is_kept(client):
+    response = client.get("/snapshot")
+    assert response.headers["etag"] == '"v7"'
+    assert calls == ["/snapshot"]
+
+
+def test_error_responses_pass_through(client):
+    response = client.get("/missing")
+    assert response.status_code == 404
+    assert "etag" not in response.headers
+
+
+def test_uncacheable_rule_sets_no_store(client):
+    response = client.get("/private")
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from services.provider_gateway import KeyPool, ProviderGateway, ProviderLimits, _key_id
+from utils.cache import async_redis_client
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(ProviderGateway, "limits", staticmethod(lambda provider: ProviderLimits(100, 2.0, 3)))
+    return ProviderGateway()
+
+
+def test_key_pool_rotates_between_keys_with_equal_headroom(gateway, run):
+    pool = KeyPool(gateway, "newsapi", ["a", "b", "c"], "apiKey")
+    assert [run(pool.candidates())[0] for _ in range(4)] == ["a", "b", "c", "a"]
+
+
+def test_key_pool_prefers_the_key_with_most_quota_left(gateway, run):
+    now = datetime.now(timezone.utc)
+    run(async_redis_client.set(gateway._quota_key("newsapi", _key_id("a"), now), 50))
+    run(async_redis_client.set(gateway._quota_key("newsapi", _key_id("b"), now), 10))
+    pool = KeyPool(gateway, "newsapi", ["a", "b", "c"], "apiKey")
+    assert run(pool.candidates()) == ["c", "b", "a"]
+
+
+def test_key_pool_skips_disabled_and_cooling_down_keys(gateway, run):
+    pool = KeyPool(gateway, "newsapi", ["a", "b", "c", "a", ""], "apiKey")
+    assert pool.keys == ["a", "b", "c"]
+    run(pool.disable("a", 60, "HTTP 401"))
+    run(async_redis_client.setex(f"provider:cooldown:newsapi:{_key_id('b')}", 60, 1))
+    assert run(pool.candidates()) == ["c"]
+    assert run(pool.first_usable(["a", "b"])) is None
+    assert run(pool.first_usable(["b", "c"])) == "c"
+
+
+def test_pooled_request_moves_past_a_rejected_key(gateway, run):
+    def respond(request):
+        if request.url.params["apiKey"] == "a":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"articles": [{"title": "Budget passed"}]})
+
+    gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    pool = KeyPool(gateway, "newsapi", ["a", "b"], "apiKey")
+    data = run(gateway.get_json_pooled(pool, "https://newsapi.test/v2/top-headlines", params={"country": "in"}))
+    assert data["articles"][0]["title"] == "Budget passed"
+    assert run(async_redis_client.exists(f"provider:disabled:newsapi:{_key_id('a')}"))
+    assert run(pool.candidates()) == ["b"]
@@ -0,0 +1,102 @@
+import time
+
+import orjson
+import pytest
+
+from config import Config
+from services.live_feed import LiveFeedBroker
+
+
+def article(title, topic="politics", source="The Hindu"):
+    return {"title": title, "topic": topic, "source_name": source}
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return [event.article["title"] for event in events]
+
+
+@pytest.fixture
+def broker():
+    return LiveFeedBroker(buffer_size=10, queue_size=3)
+
+
+def test_events_reach_only_matching_subscribers(broker):
+    everything = broker.subscribe()
+    india = broker.subscribe(country="IN")
+    sport = broker.subscribe(topic="Sport", source="hindu")
+
+    broker.publish("in", [article("Budget passed"), article("Test won", topic="sport")])
+    broker.publish("gb", [article("Rain again", source="The Guardian")])
+
+    assert drain(everything) == ["Budget passed", "Test won", "Rain again"]
+    assert drain(india) == ["Budget passed", "Test won"]
+    assert drain(sport) == ["Test won"]
+    assert broker.subscribed_countries() == {"in"}
+
+
+def test_event_ids_are_ordered_within_one_boot(broker):
+    assert broker.publish("in", [article("First"), article("Second")]) == 2
+    first, second = broker._buffer
+    assert first.id == f"{broker.boot_id}-1" and second.id == f"{broker.boot_id}-2"
+    assert LiveFeedBroker().boot_id != broker.boot_id
+
+
+def test_reconnect_replays_only_missed_events(broker):
+    broker.publish("in", [article("First"), article("Second"), article("Third")])
+    subscription = broker.subscribe(last_event_id=f"{broker.boot_id}-1")
+    assert drain(subscription) == ["Second", "Third"]
+    assert drain(broker.subscribe(last_event_id=f"{broker.boot_id}-3")) == []
+
+
+def test_unknown_event_ids_replay_a_recent_window(broker, monkeypatch):
+    monkeypatch.setattr(Config, "LIVE_FEED_UNKNOWN_ID_REPLAY_SECONDS", 60)
+    broker.publish("in", [article("Old"), article("Recent")])
+    broker._buffer[0].published_at = time.monotonic() - 120
+
+    assert drain(broker.subscribe(last_event_id="otherworker-7")) == ["Recent"]
+    assert drain(broker.subscribe(last_event_id=f"{broker.boot_id}-x")) == ["Recent"]
+
+
+def test_slow_subscribers_overflow_instead_of_blocking(broker):
+    subscription = broker.subscribe()
+    broker.publish("in", [article(f"Story {number}") for number in range(5)])
+    assert subscription.overflowed
+    assert drain(subscription) == ["Story 0", "Story 1", "Story 2"]
+
+    backlog = broker.subscribe(last_event_id=f"{broker.boot_id}-0")
+    assert backlog.overflowed
+    assert drain(backlog) == ["Story 0", "Story 1", "Story 2"]
+
+
+def test_stream_frames_events_and_ends_after_an_overflow(broker, run, monkeypatch):
+    monkeypatch.setattr(Config, "LIVE_FEED_RETRY_MS", 2500)
+    subscription = broker.subscribe()
+    broker.publish("in", [article(f"Story {number}") for number in range(4)])
+
+    async def read_stream():
+        return [chunk async for chunk in broker.stream(subscription, keepalive_seconds=1)]
+
+    chunks = run(read_stream())
+    assert chunks[0] == b"retry: 2500\n\n"
+    assert chunks[1] == (
+        f"id: {broker.boot_id}-1\nevent: article\ndata: ".encode() + orjson.dumps(article("Story 0")) + b"\n\n"
+    )
+    assert len(chunks) == 5
+    assert chunks[-1] == b"event: overflow\ndata: {}\n\n"
+    assert broker.subscriber_count == 0
+
+
+def test_idle_streams_send_keepalives(broker, run):
+    subscription = broker.subscribe()
+
+    async def first_chunks():
+        stream = broker.stream(subscription, keepalive_seconds=0.01)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return chunks
+
+    assert run(first_chunks())[1] == b": keepalive\n\n"
+    assert broker.subscriber_count == 0
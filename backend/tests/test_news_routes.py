@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database.models import Article, NewsSource
+from routers import news
+
+
+@pytest.fixture
+def client(db):
+    source = NewsSource(name="The Hindu", bias_score=-0.5, country="in")
+    db.add(source)
+    db.flush()
+    db.add_all([
+        Article(title="Budget passed", url="https://example.com/1", topic="politics", source_id=source.id,
+                published_at=datetime(2024, 5, 1, tzinfo=timezone.utc)),
+        Article(title="Monsoon arrives", url="https://example.com/2", topic="weather", source_id=source.id,
+                published_at=datetime(2024, 5, 2, tzinfo=timezone.utc)),
+    ])
+    db.commit()
+    app = FastAPI()
+    app.include_router(news.router, prefix="/api/news")
+    return TestClient(app)
+
+
+def test_news_lists_stored_articles_newest_first(client):
+    body = client.get("/api/news/").json()
+    assert [article["title"] for article in body["articles"]] == ["Monsoon arrives", "Budget passed"]
+    assert body["articles"][0]["source_name"] == "The Hindu"
+    assert body["articles"][0]["is_indian"] is True
+    assert sorted(body["topics"]) == ["politics", "weather"]
+
+
+def test_news_filters_and_pages(client):
+    assert [a["title"] for a in client.get("/api/news/?topic=polit").json()["articles"]] == ["Budget passed"]
+    assert [a["title"] for a in client.get("/api/news/?limit=1&offset=1").json()["articles"]] == ["Budget passed"]
+    assert client.get("/api/news/?source=reuters").json()["total_count"] == 0
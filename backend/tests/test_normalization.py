@@ -0,0 +1,94 @@
+from services.normalization import (
+    NormalizationPool, extract_article_text, normalize_feed, simplify_title, strip_html, unique_title_indices,
+    unique_title_indices_batch,
+)
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>The Hindu</title>
+<item>
+  <title>Budget &amp; taxes: what changes</title>
+  <link>https://example.com/budget</link>
+  <description>&lt;p&gt;The &lt;b&gt;new&lt;/b&gt;   budget&lt;/p&gt;</description>
+  <pubDate>Wed, 01 May 2024 12:30:00 +0530</pubDate>
+</item>
+<item>
+  <title>Monsoon arrives</title>
+  <link>https://example.com/monsoon</link>
+</item>
+</channel></rss>"""
+
+
+def test_strip_html_decodes_entities_and_collapses_whitespace():
+    assert strip_html("<p>Tom &amp; Jerry</p>\n<br/>  return") == "Tom & Jerry return"
+    assert strip_html(None) == ""
+
+
+def test_normalize_feed_maps_entries_to_articles():
+    first, second = normalize_feed(RSS, "The Hindu", True)
+    assert first["title"] == "Budget & taxes: what changes"
+    assert first["description"] == first["content"] == "The new budget"
+    assert first["url"] == "https://example.com/budget"
+    assert first["published_at"] == "2024-05-01T07:00:00+00:00"
+    assert first["source"] == "RSS - The Hindu"
+    assert first["is_indian"] is True and first["api_source"] == "rss"
+    # Entries without a date get the ingestion time
+    assert second["published_at"].endswith("+00:00")
+
+
+def test_normalize_feed_caps_entries_and_tolerates_garbage():
+    assert len(normalize_feed(RSS, "The Hindu", True, max_entries=1)) == 1
+    assert normalize_feed(b"not a feed", "The Hindu", False) == []
+
+
+def test_unique_titles_ignore_case_punctuation_and_empty_titles():
+    assert simplify_title("  Budget: Passed! ") == "budget passed"
+    titles = ["Budget passed", "budget passed!", "", None, "Monsoon arrives", "BUDGET PASSED"]
+    assert unique_title_indices(titles) == [0, 4]
+    assert unique_title_indices_batch([titles, ["a", "a"]]) == [[0, 4], [0]]
+
+
+def test_thread_pool_runs_normalization_off_the_loop(run):
+    pool = NormalizationPool(mode="thread", workers=1)
+    try:
+        assert run(pool.run(unique_title_indices, ["a", "A", "b"])) == [0, 2]
+    finally:
+        pool.shutdown()
+    assert run(NormalizationPool(mode="inline").run(strip_html, "<b>x</b>")) == "x"
+
+
+ARTICLE_STORY = "The council approved the new budget after a long debate about schools and roads."
+RELATED = "Related: the mayor opens the new bridge across the river this week."
+
+
+def page(body: str, head: str = "") -> bytes:
+    return f"<html><head>{head}</head><body>{body}</body></html>".encode("utf-8")
+
+
+def test_article_paragraphs_win_over_navigation():
+    html = page(
+        f"<aside><p>{RELATED}</p></aside>"
+        f"<article><h1>Budget</h1><p>{ARTICLE_STORY}</p><p>{ARTICLE_STORY}</p></article>"
+        "<footer><p>Copyright</p></footer>"
+    )
+    assert extract_article_text(html) == f"{ARTICLE_STORY}\n\n{ARTICLE_STORY}"
+
+
+def test_scripts_and_styles_are_ignored():
+    html = page(f"<article><script>var x = 1;</script><style>p {{}}</style><p>{ARTICLE_STORY}</p></article>")
+    assert extract_article_text(html) == ARTICLE_STORY
+
+
+def test_short_paragraphs_are_dropped():
+    html = page(f"<article><p>Share this</p><p>{ARTICLE_STORY}</p><p>Read more</p></article>")
+    assert extract_article_text(html) == ARTICLE_STORY
+
+
+def test_meta_charset_is_used_when_none_is_given():
+    text = "Le café de la société est ouvert tous les jours de la semaine, sauf le dimanche."
+    html = page(f"<article><p>{text}</p></article>", '<meta charset="iso-8859-1">').decode("utf-8")
+    assert extract_article_text(html.encode("iso-8859-1")) == text
+
+
+def test_page_without_paragraphs_has_no_text():
+    assert extract_article_text(page("<div>just a div</div>")) == ""
+    assert extract_article_text(b"") == ""
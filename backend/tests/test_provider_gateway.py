@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from config import Config
+from services import provider_gateway as gateway_module
+from services.provider_gateway import KeyPool, ProviderGateway, ProviderLimits, _key_id
+from utils.cache import async_redis_client
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(ProviderGateway, "limits", staticmethod(lambda provider: ProviderLimits(100, 2.0, 3)))
+    return ProviderGateway()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time() for the token bucket, advanced by hand"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(gateway_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_paced_allowance_starts_the_day_with_the_reserve(monkeypatch):
+    monkeypatch.setattr(Config, "PROVIDER_PACING_RESERVE", 0.1)
+    midnight = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert ProviderGateway.paced_allowance(1000, midnight) == 100
+    assert ProviderGateway.paced_allowance(1000, midnight.replace(hour=12)) == 600
+    assert ProviderGateway.paced_allowance(1000, midnight.replace(hour=23, minute=59)) == 1000
+
+
+def test_paced_allowance_reserves_at_least_one_request():
+    assert ProviderGateway.paced_allowance(5, datetime(2024, 5, 1, tzinfo=timezone.utc)) == 1
+
+
+def test_token_bucket_allows_the_burst_then_asks_to_wait(gateway, clock, run):
+    assert [run(gateway._take_token("newsapi", "k")) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert run(gateway._take_token("newsapi", "k")) == pytest.approx(0.5)
+
+
+def test_token_bucket_refills_at_the_configured_rate(gateway, clock, run):
+    for _ in range(3):
+        run(gateway._take_token("newsapi", "k"))
+    clock[0] += 0.5
+    assert run(gateway._take_token("newsapi", "k")) == 0.0
+    assert run(gateway._take_token("newsapi", "k")) > 0
+
+
+def test_token_buckets_are_per_key(gateway, clock, run):
+    for _ in range(3):
+        run(gateway._take_token("newsapi", "a"))
+    assert run(gateway._take_token("newsapi", "b")) == 0.0
+
+
+def test_daily_budget_stops_at_the_pacing_curve(gateway, monkeypatch, run):
+    monkeypatch.setattr(ProviderGateway, "paced_allowance", staticmethod(lambda quota, now: 2))
+    assert run(gateway._consume_daily_budget("newsapi", "k"))
+    assert run(gateway._consume_daily_budget("newsapi", "k"))
+    assert not run(gateway._consume_daily_budget("newsapi", "k"))
+    # The refused request is not counted against the quota
+    assert run(gateway.remaining_quota("newsapi", ["k-raw"])) == [100]
+    assert run(async_redis_client.get(gateway._quota_key("newsapi", "k", datetime.now(timezone.utc)))) == "2"
+
+
+def test_remaining_quota_per_key(gateway, run):
+    key_id = _key_id("first")
+    run(async_redis_client.set(gateway._quota_key("newsapi", key_id, datetime.now(timezone.utc)), 40))
+    assert run(gateway.remaining_quota("newsapi", ["first", "second"])) == [60, 100]
+
+
+def fallbacks(provider, outcome):
+    return REGISTRY.get_sample_value(
+        "news_provider_fallbacks_total", {"provider": provider, "reason": "no usable API key", "outcome": outcome}
+    ) or 0.0
+
+
+def fallback_total(provider):
+    return sum(
+        sample.value
+        for metric in REGISTRY.collect() if metric.name == "news_provider_fallbacks"
+        for sample in metric.samples if sample.name.endswith("_total") and sample.labels["provider"] == provider
+    )
+
+
+@pytest.fixture
+def throttled(gateway):
+    """Every key of the pool gets a 429"""
+    gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(429)))
+    return KeyPool(gateway, "fallbacktest", ["a", "b"], "apiKey")
+
+
+def test_pooled_fallback_is_counted_once_when_nothing_is_cached(gateway, throttled, run):
+    before, unavailable = fallback_total("fallbacktest"), fallbacks("fallbacktest", "unavailable")
+    with pytest.raises(httpx.HTTPStatusError):
+        run(gateway.get_json_pooled(throttled, "https://provider.test/news"))
+    assert fallbacks("fallbacktest", "unavailable") == unavailable + 1
+    assert fallback_total("fallbacktest") == before + 1
+
+
+def test_pooled_fallback_is_counted_once_when_serving_stale(gateway, throttled, run):
+    stale_key = gateway._stale_key("fallbacktest", "https://provider.test/news", {}, None)
+    run(async_redis_client.set(stale_key, '{"articles": []}'))
+    before, stale = fallback_total("fallbacktest"), fallbacks("fallbacktest", "stale")
+    assert run(gateway.get_json_pooled(throttled, "https://provider.test/news")) == {"articles": []}
+    assert fallbacks("fallbacktest", "stale") == stale + 1
+    assert fallback_total("fallbacktest") == before + 1
@@ -0,0 +1,75 @@
+from config import Config
+from services.provider_health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyTracker
+
+
+def breaker(reset_seconds: float = 30.0) -> CircuitBreaker:
+    return CircuitBreaker("newsapi", failure_threshold=3, reset_seconds=reset_seconds, slo_seconds=2.0)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    circuit = breaker()
+    for _ in range(2):
+        circuit.record_failure("HTTP 500")
+    assert circuit.state == CLOSED and circuit.allow()
+    circuit.record_failure("HTTP 500")
+    assert circuit.state == OPEN
+    assert not circuit.allow()
+
+
+def test_success_resets_the_failure_streak():
+    circuit = breaker()
+    circuit.record_failure("HTTP 500")
+    circuit.record_failure("HTTP 500")
+    circuit.record_success(0.1)
+    circuit.record_failure("HTTP 500")
+    assert circuit.state == CLOSED
+    assert circuit.consecutive_failures == 1
+
+
+def test_success_slower_than_the_slo_counts_as_failure():
+    circuit = breaker()
+    for _ in range(3):
+        circuit.record_success(5.0)
+    assert circuit.state == OPEN
+
+
+def test_half_open_lets_a_single_probe_through():
+    circuit = breaker(reset_seconds=0)
+    for _ in range(3):
+        circuit.record_failure("timeout")
+    assert circuit.allow()
+    assert circuit.state == HALF_OPEN
+    assert not circuit.allow()
+    circuit.record_success(0.1)
+    assert circuit.state == CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    circuit = breaker(reset_seconds=0)
+    for _ in range(3):
+        circuit.record_failure("timeout")
+    assert circuit.allow()
+    circuit.record_failure("timeout")
+    assert circuit.state == OPEN
+
+
+def test_released_probe_can_be_retried():
+    circuit = breaker(reset_seconds=0)
+    for _ in range(3):
+        circuit.record_failure("timeout")
+    assert circuit.allow()
+    circuit.release()
+    assert circuit.allow()
+    assert circuit.state == HALF_OPEN
+
+
+def test_latency_timeout_follows_the_p95(monkeypatch):
+    monkeypatch.setattr(Config, "PROVIDER_TIMEOUT_SECONDS", 10.0)
+    monkeypatch.setattr(Config, "PROVIDER_MIN_TIMEOUT_SECONDS", 1.0)
+    monkeypatch.setattr(Config, "PROVIDER_TIMEOUT_P95_MULTIPLIER", 2.0)
+    tracker = LatencyTracker(window=20, min_samples=10)
+    assert tracker.timeout() == 10.0
+    for seconds in [1.0] * 19 + [3.0]:
+        tracker.record(seconds)
+    assert tracker.p95() == 1.0
+    assert tracker.timeout() == 2.0
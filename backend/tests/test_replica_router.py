@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from database import database
+from database.database import ReplicaRouter, get_async_read_db
+from database.models import NewsSource
+
+DEAD_REPLICA = "sqlite:////nonexistent-replica-dir/replica.db"
+
+
+@pytest.fixture
+def router(monkeypatch, db, run):
+    db.add(NewsSource(name="The Hindu", country="in"))
+    db.commit()
+    router = ReplicaRouter([DEAD_REPLICA, DEAD_REPLICA])
+    monkeypatch.setattr(database, "replica_router", router)
+    yield router
+    run(router.dispose())
+
+
+async def read_sources():
+    sessions = get_async_read_db()
+    session = await sessions.__anext__()
+    try:
+        return [source.name for source in (await session.execute(select(NewsSource))).scalars()]
+    finally:
+        await sessions.aclose()
+
+
+def test_pick_round_robins_healthy_replicas(router):
+    assert [router.pick() for _ in range(3)] == [0, 1, 0]
+    router.mark_unhealthy(1)
+    assert [router.pick() for _ in range(2)] == [0, 0]
+    router.mark_unhealthy(0)
+    assert router.pick() is None
+
+
+def test_failing_replica_is_marked_and_the_read_retried_on_the_primary(router, run):
+    assert run(read_sources()) == ["The Hindu"]
+    assert router.healthy == [False, True]
+    # The next read skips the bad replica, and also falls back once the other fails
+    assert run(read_sources()) == ["The Hindu"]
+    assert router.healthy == [False, False]
+    assert router.pick() is None
+
+
+def test_statement_errors_are_not_blamed_on_the_replica(router, run, monkeypatch):
+    monkeypatch.setattr(router, "urls", [database.DATABASE_URL])
+    router.pick()
+    session = router.session_makers[0]()
+
+    async def bad_query():
+        try:
+            await session.execute(text("SELECT * FROM no_such_table"))
+        finally:
+            await session.close()
+
+    with pytest.raises(OperationalError, match="no_such_table"):
+        run(bad_query())
+    assert router.healthy == [True]
+
+
+def test_health_check_keeps_dead_replicas_out(router, run):
+    run(router.check_health())
+    assert router.healthy == [False, False]
+
+
+def test_health_check_restores_a_replica(router, run, monkeypatch):
+    monkeypatch.setattr(router, "urls", [database.DATABASE_URL])
+    router.pick()
+    router.mark_unhealthy(0)
+    run(router.check_health())
+    assert router.healthy == [True]
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from database.database import engine
+from database.models import Article, NewsSource
+from routers import news
+from services import search_service
+from services.search_service import SearchService, ensure_search_index, highlight
+
+
+@pytest.fixture
+def indexed(db):
+    assert ensure_search_index(engine)
+    hindu = NewsSource(name="The Hindu", country="in")
+    guardian = NewsSource(name="The Guardian", country="gb")
+    db.add_all([hindu, guardian])
+    db.flush()
+    db.add_all([
+        Article(title="Parliament passes budget", summary="Spending on schools rises", source_id=hindu.id,
+                published_at=datetime(2024, 5, 1)),
+        Article(title="Markets rally", summary="Investors welcome the budget", source_id=guardian.id,
+                published_at=datetime(2024, 5, 3)),
+        Article(title="<script>alert(1)</script> budget row", summary="<b>bold</b> claims", source_id=guardian.id,
+                published_at=datetime(2024, 4, 1)),
+    ])
+    db.commit()
+    yield db
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS articles_fts"))
+
+
+def search(run, async_db, query, **filters):
+    return run(SearchService(async_db).search(query, **filters))
+
+
+def test_title_matches_rank_above_summary_matches(indexed, async_db, run):
+    titles = [row["title"] for row in search(run, async_db, "budget")]
+    assert titles.index("Parliament passes budget") < titles.index("Markets rally")
+    assert len(titles) == 3
+
+
+def test_matches_are_highlighted_and_the_rest_escaped(indexed, async_db, run):
+    row = next(row for row in search(run, async_db, "budget") if "alert" in row["title"])
+    assert "<script>" not in row["title_highlight"]
+    assert "&lt;script&gt;" in row["title_highlight"]
+    assert "<mark>budget</mark>" in row["title_highlight"]
+    assert "&lt;b&gt;" in row["summary_highlight"]
+
+
+def test_highlight_escapes_everything_but_the_markers():
+    assert highlight('a <i>"b"</i> \x02c\x03') == "a &lt;i&gt;&quot;b&quot;&lt;/i&gt; <mark>c</mark>"
+    assert highlight(None) is None
+
+
+def test_user_input_is_not_parsed_as_fts_syntax(indexed, async_db, run):
+    assert SearchService.build_match_query('budget" OR NEAR(x*') == '"budget" "OR" "NEAR" "x"'
+    assert search(run, async_db, '"-:*()') == []
+    assert [row["title"] for row in search(run, async_db, "schools AND")] == []
+
+
+def test_porter_stemming(indexed, async_db, run):
+    assert [row["title"] for row in search(run, async_db, "passing")] == ["Parliament passes budget"]
+
+
+def test_filters(indexed, async_db, run):
+    assert [r["title"] for r in search(run, async_db, "budget", country="IN")] == ["Parliament passes budget"]
+    assert len(search(run, async_db, "budget", source="guardian")) == 2
+    assert [r["title"] for r in search(run, async_db, "budget", start=datetime(2024, 5, 2))] == ["Markets rally"]
+    assert len(search(run, async_db, "budget", limit=1, offset=1)) == 1
+
+
+def test_triggers_keep_the_index_in_sync(indexed, async_db, run):
+    article = indexed.query(Article).filter_by(title="Markets rally").one()
+    article.title = "Stocks tumble"
+    indexed.commit()
+    assert search(run, async_db, "rally") == []
+    assert [r["title"] for r in search(run, async_db, "tumble")] == ["Stocks tumble"]
+    indexed.delete(article)
+    indexed.commit()
+    assert search(run, async_db, "tumble") == []
+
+
+def test_search_is_disabled_without_an_index(db, monkeypatch):
+    monkeypatch.setattr(search_service, "search_enabled", False)
+    app = FastAPI()
+    app.include_router(news.router, prefix="/api/news")
+    response = TestClient(app).get("/api/news/search?q=budget")
+    assert response.status_code == 501
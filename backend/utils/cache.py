@@ -1,10 +1,17 @@
 import os
 import json
-from typing import Any, Optional, Callable, TypeVar, Dict
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional, Callable, TypeVar, Dict, Tuple
 from functools import wraps
 import redis
+import redis.asyncio
 import fakeredis
+from fakeredis import aioredis as fake_aioredis
 from config import Config
+from utils.metrics import CACHE_REQUESTS, CACHE_SERIALIZATION_SECONDS
+from utils.tracing import span
 
 # Type variable for generic function return type
 T = TypeVar('T')
@@ -18,7 +25,8 @@ redis_port = int(os.getenv("REDIS_PORT", 6379))
 redis_password = os.getenv("REDIS_PASSWORD", None)
 redis_db = int(os.getenv("REDIS_DB", 0))
 
-# Create Redis client
+# Create Redis clients: the sync one for scripts and admin calls, the async one for
+# anything running on the event loop, where a blocking round-trip would stall every request
 if use_real_redis:
     redis_client = redis.Redis(
         host=redis_host,
@@ -27,9 +35,32 @@ if use_real_redis:
         db=redis_db,
         decode_responses=True
     )
+    async_redis_client = redis.asyncio.Redis(
+        host=redis_host,
+        port=redis_port,
+        password=redis_password,
+        db=redis_db,
+        decode_responses=True
+    )
 else:
-    # Use FakeRedis for development/testing
-    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    # Use FakeRedis for development/testing; both clients share one in-memory server
+    fake_server = fakeredis.FakeServer()
+    redis_client = fakeredis.FakeRedis(server=fake_server, decode_responses=True)
+    async_redis_client = fake_aioredis.FakeRedis(server=fake_server, decode_responses=True)
+
+# One flag per cached call in progress; skip_caching() sets them all
+_cache_scopes: ContextVar[Tuple[List[bool], ...]] = ContextVar("cache_scopes", default=())
+
+
+def skip_caching():
+    """Keep the results of the cached calls in progress out of the cache.
+
+    Called where a provider request fails or is answered from a stale copy, so
+    a fetcher that swallows the error and returns what it has (often []) does
+    not pin that result for the whole TTL.
+    """
+    for scope in _cache_scopes.get():
+        scope[0] = True
 
 
 def cache_key_builder(*args, **kwargs) -> str:
@@ -51,45 +82,74 @@ def cache_key_builder(*args, **kwargs) -> str:
 
 def cache(prefix: str, ttl: Optional[int] = None):
     """Cache decorator for functions
+
+    Empty results, and results of calls during which skip_caching() was called,
+    are returned but not cached.
     
     Args:
         prefix: Prefix for the cache key
         ttl: Time to live in seconds, defaults to CACHE_TTL_SECONDS from config
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        # Methods share entries across instances; `self` has no stable repr to key on
+        is_method = next(iter(inspect.signature(func).parameters), None) == "self"
+        # Metric children are bound once here so the hot path skips the label lookups
+        hits = CACHE_REQUESTS.labels(prefix, "hit")
+        misses = CACHE_REQUESTS.labels(prefix, "miss")
+        decode_seconds = CACHE_SERIALIZATION_SECONDS.labels(prefix, "decode")
+        encode_seconds = CACHE_SERIALIZATION_SECONDS.labels(prefix, "encode")
+        
         @wraps(func)
         async def wrapper(*args, **kwargs) -> T:
-            # Get TTL from config if not provided
-            cache_ttl = ttl if ttl is not None else Config.CACHE_TTL_SECONDS
+            with span(func.__qualname__, cache_prefix=prefix) as current:
+                # Get TTL from config if not provided
+                cache_ttl = ttl if ttl is not None else Config.CACHE_TTL_SECONDS
             
-            # Build cache key
-            key_suffix = cache_key_builder(*args, **kwargs)
-            cache_key = f"{prefix}:{func.__name__}:{key_suffix}"
+                # Build cache key
+                key_suffix = cache_key_builder(*(args[1:] if is_method else args), **kwargs)
+                cache_key = f"{prefix}:{func.__name__}:{key_suffix}"
             
-            # Try to get from cache
-            cached_value = redis_client.get(cache_key)
-            if cached_value:
-                try:
-                    return json.loads(cached_value)
-                except json.JSONDecodeError:
-                    # If not JSON, return as is
-                    return cached_value
+                # Try to get from cache
+                cached_value = await async_redis_client.get(cache_key)
+                if cached_value:
+                    hits.inc()
+                    current.set_attribute("cache_hit", True)
+                    started = time.perf_counter()
+                    try:
+                        return json.loads(cached_value)
+                    except json.JSONDecodeError:
+                        # If not JSON, return as is
+                        return cached_value
+                    finally:
+                        decode_seconds.observe(time.perf_counter() - started)
+                misses.inc()
+                current.set_attribute("cache_hit", False)
             
-            # If not in cache, call the function
-            result = await func(*args, **kwargs)
+                # If not in cache, call the function
+                scope = [False]
+                token = _cache_scopes.set(_cache_scopes.get() + (scope,))
+                try:
+                    result = await func(*args, **kwargs)
+                finally:
+                    _cache_scopes.reset(token)
+                if isinstance(result, list):
+                    current.set_attribute("articles", len(result))
+                if scope[0] or not result:
+                    # A failed or degraded call; the next one should try the provider again
+                    current.set_attribute("cache_skipped", True)
+                    return result
             
-            # Cache the result
-            try:
-                redis_client.setex(
-                    cache_key,
-                    cache_ttl,
-                    json.dumps(result) if not isinstance(result, str) else result
-                )
-            except (TypeError, json.JSONDecodeError) as e:
-                # Log the error but don't fail the function call
-                print(f"Error caching result: {e}")
+                # Cache the result
+                try:
+                    started = time.perf_counter()
+                    value = json.dumps(result) if not isinstance(result, str) else result
+                    encode_seconds.observe(time.perf_counter() - started)
+                    await async_redis_client.setex(cache_key, cache_ttl, value)
+                except (TypeError, json.JSONDecodeError) as e:
+                    # Log the error but don't fail the function call
+                    print(f"Error caching result: {e}")
             
-            return result
+                return result
         return wrapper
     return decorator
 
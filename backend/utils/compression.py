@@ -0,0 +1,155 @@
+import gzip
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Preferred first when the client accepts several with the same q-value
+SUPPORTED_ENCODINGS: List[str] = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+
+# Never compressed: already compressed media, and streams that must flush every event
+UNCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "text/event-stream", "application/zip", "application/gzip")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content-coding from an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress with the given content-coding; level is the brotli quality or gzip level"""
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if level is None else level)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.decompress(body)
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Distinct strong ETag per representation, e.g. "abc" -> "abc-br" """
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else f"{etag}-{encoding}"
+
+
+class CompressionMiddleware:
+    """Negotiates brotli/gzip for buffered responses.
+
+    Responses that already carry a Content-Encoding (pre-compressed snapshot
+    bodies) are passed through untouched, as are streaming responses, small
+    bodies and media that does not compress. ETags of bodies compressed here are
+    weakened, since the bytes differ from the identity representation.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] < 200
+                    or content_type.startswith(UNCOMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Identity and compressed responses alike depend on Accept-Encoding, so shared caches must key on it
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                if encoding is None or message["status"] in (204, 304):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if message.get("more_body", False):
+                    # Streaming response: send it as-is so chunks are not held back
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                if len(body) < self.minimum_size:
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressed = compress(body, encoding, self.levels[encoding])
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    headers["ETag"] = "W/" + headers["etag"]
+                await send(start_message)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def precompress_variants(body: bytes, levels: Dict[str, int], minimum_size: int = 1024) -> Dict[Optional[str], bytes]:
+    """Identity plus every supported encoding of a body, keyed by content-coding (None = identity)"""
+    variants: Dict[Optional[str], bytes] = {None: body}
+    if len(body) >= minimum_size:
+        for encoding in SUPPORTED_ENCODINGS:
+            variants[encoding] = compress(body, encoding, levels.get(encoding))
+    return variants
@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dateutil import parser
+
+DATEUTIL = "dateutil"
+
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def _parse_iso(value: str) -> datetime:
+    if not _ISO_RE.match(value):
+        raise ValueError("not ISO 8601")
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    elif len(value) > 5 and value[-5] in "+-" and value[-3] != ":":
+        # +0000 -> +00:00, which fromisoformat needs before Python 3.11
+        value = f"{value[:-2]}:{value[-2:]}"
+    return datetime.fromisoformat(value)
+
+
+def _parse_rfc822(value: str) -> datetime:
+    parsed = parsedate_to_datetime(value)
+    if parsed is None:
+        raise ValueError("not RFC 822")
+    return parsed
+
+
+def _strptime(fmt: str) -> Callable[[str], datetime]:
+    return lambda value: datetime.strptime(value, fmt)
+
+
+# Fast paths, cheapest and most common first; dateutil is the fallback when none matches
+FAST_FORMATS: List[Tuple[str, Callable[[str], datetime]]] = [
+    ("iso8601", _parse_iso),
+    ("rfc822", _parse_rfc822),
+    ("%Y-%m-%d %H:%M:%S %z", _strptime("%Y-%m-%d %H:%M:%S %z")),
+    ("%d %b %Y %H:%M:%S %z", _strptime("%d %b %Y %H:%M:%S %z")),
+    ("%B %d, %Y", _strptime("%B %d, %Y")),
+]
+_FORMATS_BY_NAME = dict(FAST_FORMATS)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Aware UTC datetime; naive values are taken to be UTC already"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class DateNormalizer:
+    """Parses provider and feed timestamps into aware UTC datetimes.
+
+    Each source (feed or provider) sticks to one date format, so the format
+    that first parses a source's date is remembered and tried first for that
+    source from then on; the other fast paths follow, and dateutil is only
+    used when none of them matches. Hits are counted per format.
+    """
+
+    def __init__(self):
+        self._learned: Dict[str, str] = {}
+        self.hits: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def parse(self, value, source: Optional[str] = None) -> Optional[datetime]:
+        """Aware UTC datetime, or None if the value is empty or unparseable"""
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return to_utc(value)
+        if isinstance(value, time.struct_time):
+            # feedparser's *_parsed fields are already normalized to UTC
+            self._record("struct_time")
+            return datetime(*value[:6], tzinfo=timezone.utc)
+
+        text = str(value).strip()
+        learned = self._learned.get(source) if source else None
+        candidates = FAST_FORMATS
+        if learned is not None:
+            candidates = [(learned, _FORMATS_BY_NAME[learned])] + [f for f in FAST_FORMATS if f[0] != learned]
+
+        for name, parse in candidates:
+            try:
+                parsed = parse(text)
+            except (ValueError, TypeError, OverflowError, IndexError):
+                continue
+            if source and name != learned:
+                self._learned[source] = name
+            self._record(name)
+            return to_utc(parsed)
+
+        try:
+            parsed = parser.parse(text)
+        except (ValueError, OverflowError):
+            self._record("unparseable")
+            return None
+        self._record(DATEUTIL)
+        return to_utc(parsed)
+
+    def isoformat(self, value, source: Optional[str] = None, default: Optional[datetime] = None) -> str:
+        parsed = self.parse(value, source) or default or datetime.now(timezone.utc)
+        return parsed.isoformat()
+
+    def _record(self, name: str):
+        with self._lock:
+            self.hits[name] += 1
+
+    def merge_hits(self, hits: Dict[str, int]):
+        """Fold in counts gathered in another process"""
+        with self._lock:
+            self.hits.update(hits)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = dict(self.hits)
+        total = sum(hits.values())
+        return {
+            "total": total,
+            "hit_rates": {name: round(count / total, 4) for name, count in sorted(hits.items())} if total else {},
+            "hits": hits,
+            "learned_formats": dict(self._learned),
+        }
+
+
+date_normalizer = DateNormalizer()
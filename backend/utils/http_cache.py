@@ -0,0 +1,192 @@
+import hashlib
+import re
+from typing import Callable, Dict, List, Optional, Pattern
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Resolves the current ETag for a request without running the endpoint, or None if unknown
+ETagResolver = Callable[[Scope], Optional[str]]
+
+NO_STORE = "no-store"
+
+
+class CacheRule:
+    """Caching policy for every path matching ``pattern``
+
+    Args:
+        pattern: Regex matched against the full request path
+        max_age: Seconds a response is fresh; None marks the path uncacheable
+        stale_while_revalidate: Seconds a stale response may still be served while refetching
+        resolve_etag: Optional cheap lookup (e.g. a snapshot version) that allows a 304
+            to be sent before the endpoint runs
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        max_age: Optional[int] = None,
+        stale_while_revalidate: int = 0,
+        resolve_etag: Optional[ETagResolver] = None,
+    ):
+        self.pattern: Pattern = re.compile(pattern)
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.resolve_etag = resolve_etag
+
+    @property
+    def cacheable(self) -> bool:
+        return self.max_age is not None
+
+    @property
+    def cache_control(self) -> str:
+        if not self.cacheable:
+            return NO_STORE
+        value = f"public, max-age={self.max_age}"
+        if self.stale_while_revalidate:
+            value += f", stale-while-revalidate={self.stale_while_revalidate}"
+        return value
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class HTTPCacheMiddleware:
+    """Adds Cache-Control and strong ETags to configured paths and answers revalidations with 304.
+
+    Endpoints may set their own ETag (snapshot-backed ones do); otherwise one is
+    derived from the response body. Rules with ``resolve_etag`` short-circuit a
+    matching If-None-Match before the endpoint runs, so polling clients never
+    reach the aggregation code.
+    """
+
+    def __init__(self, app: ASGIApp, rules: List[CacheRule]):
+        self.app = app
+        self.rules = rules
+
+    def _match(self, path: str) -> Optional[CacheRule]:
+        for rule in self.rules:
+            if rule.pattern.fullmatch(path):
+                return rule
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not rule.cacheable or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, self._with_headers(send, {"Cache-Control": NO_STORE}))
+            return
+        if scope["method"] == "HEAD":
+            await self.app(scope, receive, self._with_headers(send, {"Cache-Control": rule.cache_control}))
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if rule.resolve_etag and if_none_match:
+            etag = rule.resolve_etag(scope)
+            if etag and etag_matches(if_none_match, etag):
+                await self._send_not_modified(send, etag, rule)
+                return
+
+        await self._call_with_validators(scope, receive, send, rule, if_none_match)
+
+    @staticmethod
+    def _with_headers(send: Send, extra: Dict[str, str]) -> Send:
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in extra.items():
+                    headers[name] = value
+            await send(message)
+        return send_wrapper
+
+    @staticmethod
+    async def _send_not_modified(send: Send, etag: str, rule: CacheRule):
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (b"etag", etag.encode("latin-1")),
+                (b"cache-control", rule.cache_control.encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _call_with_validators(self, scope: Scope, receive: Receive, send: Send, rule: CacheRule,
+                                    if_none_match: Optional[str]):
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=message)
+                headers["Cache-Control"] = rule.cache_control
+                if "etag" in headers:
+                    etag = headers["etag"]
+                    if etag_matches(if_none_match, etag):
+                        start_message = message
+                        return
+                    passthrough = True
+                    await send(message)
+                    return
+                # No ETag from the endpoint: buffer the body so one can be derived from it
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body":
+                if start_message is not None and "etag" in MutableHeaders(scope=start_message):
+                    # Endpoint ETag matched; drain the body and answer 304
+                    if not message.get("more_body", False):
+                        await self._send_not_modified(send, MutableHeaders(scope=start_message)["etag"], rule)
+                    return
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                etag = body_etag(body)
+                if etag_matches(if_none_match, etag):
+                    await self._send_not_modified(send, etag, rule)
+                    return
+                headers = MutableHeaders(scope=start_message)
+                headers["ETag"] = etag
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Optional
+
+from config import Config
+from utils.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+# The same blocking call is logged at most once per this many seconds; stalls are still counted
+REPORT_COOLDOWN_SECONDS = 60
+
+
+class LoopMonitor:
+    """Measures event-loop lag and logs the stack of whatever blocks the loop past a threshold
+
+    A ticker task sleeps for `interval` and records how late it wakes up. A watchdog thread
+    watches the ticker's heartbeat; when it goes stale the loop is stuck in a callback, and the
+    loop thread's current stack is the culprit.
+    """
+
+    def __init__(self, interval: float, blocked_threshold: float, window: int = 1200):
+        self.interval = interval
+        self.blocked_threshold = blocked_threshold
+        self._lags = deque(maxlen=window)
+        self._stalls = 0
+        self._beat: Optional[float] = None
+        self._reported: Dict[str, float] = {}
+
+    async def run(self):
+        stop = threading.Event()
+        watchdog = threading.Thread(
+            target=self._watch, args=(threading.get_ident(), stop), name="loop-watchdog", daemon=True
+        )
+        watchdog.start()
+        try:
+            while True:
+                started = self._beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - started - self.interval)
+                self._lags.append(lag)
+                EVENT_LOOP_LAG_SECONDS.observe(lag)
+                if lag >= self.blocked_threshold:
+                    self._stalls += 1
+                    EVENT_LOOP_STALLS.inc()
+        finally:
+            stop.set()
+            self._beat = None
+
+    def start(self) -> asyncio.Task:
+        return asyncio.create_task(self.run())
+
+    def _watch(self, loop_thread: int, stop: threading.Event):
+        reported_beat = None
+        while not stop.wait(max(self.blocked_threshold / 4, 0.01)):
+            beat = self._beat
+            if beat is None or beat == reported_beat:
+                continue
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.blocked_threshold:
+                continue
+            # Once per stall; the loop thread is still inside the blocking call
+            reported_beat = beat
+            frame = sys._current_frames().get(loop_thread)
+            if frame is None:
+                continue
+            stack = _callback_stack(frame)
+            now = time.monotonic()
+            if now - self._reported.get(stack, float("-inf")) < REPORT_COOLDOWN_SECONDS:
+                continue
+            self._reported = {
+                reported: at for reported, at in self._reported.items() if now - at < REPORT_COOLDOWN_SECONDS
+            }
+            self._reported[stack] = now
+            logger.warning(f"Event loop blocked for over {blocked * 1000:.0f}ms; loop thread stack:\n{stack}")
+
+    def stats(self) -> dict:
+        """Lag percentiles over the recent window, in milliseconds"""
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0, "stalls": self._stalls}
+        return {
+            "samples": len(lags),
+            "p50_ms": round(_percentile(lags, 0.5) * 1000, 2),
+            "p95_ms": round(_percentile(lags, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(lags, 0.99) * 1000, 2),
+            "max_ms": round(lags[-1] * 1000, 2),
+            "stalls": self._stalls,
+        }
+
+    def reset(self):
+        self._lags.clear()
+        self._stalls = 0
+
+
+def _callback_stack(frame) -> str:
+    """The loop thread's stack from the running callback down; the event loop's own frames are noise"""
+    frames = traceback.extract_stack(frame)
+    for index in range(len(frames) - 1, -1, -1):
+        if frames[index].name == "_run" and frames[index].filename == asyncio.events.__file__:
+            frames = frames[index + 1:]
+            break
+    return "".join(traceback.format_list(frames))
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+loop_monitor = LoopMonitor(Config.LOOP_MONITOR_INTERVAL_MS / 1000, Config.LOOP_BLOCKED_THRESHOLD_MS / 1000)
+
+
+def start_loop_monitor() -> Optional[asyncio.Task]:
+    """Start the lag monitor unless it is disabled"""
+    if not Config.LOOP_MONITOR_ENABLED:
+        return None
+    return loop_monitor.start()
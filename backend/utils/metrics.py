@@ -0,0 +1,146 @@
+import os
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Sub-millisecond resolution for in-process work; the default buckets suit network calls
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PROVIDER_HTTP_SECONDS = Histogram(
+    "news_provider_http_request_seconds",
+    "Outbound provider HTTP request latency, hedges included",
+    ["provider", "status"],
+)
+PROVIDER_FALLBACKS = Counter(
+    "news_provider_fallbacks_total",
+    "Provider calls not answered live, by reason and whether a stale copy was served",
+    ["provider", "reason", "outcome"],
+)
+PROVIDER_FETCH_SECONDS = Histogram(
+    "news_provider_fetch_seconds",
+    "Time to fetch one provider's articles for one country",
+    ["provider", "country", "outcome"],
+)
+PROVIDER_ARTICLES = Counter(
+    "news_provider_articles_total",
+    "Articles returned by providers",
+    ["provider", "country"],
+)
+ARTICLES_DEDUPLICATED = Counter(
+    "news_articles_deduplicated_total",
+    "Articles dropped as duplicates",
+    ["stage"],
+)
+CACHE_REQUESTS = Counter(
+    "news_cache_requests_total",
+    "@cache lookups",
+    ["prefix", "result"],
+)
+CACHE_SERIALIZATION_SECONDS = Histogram(
+    "news_cache_serialization_seconds",
+    "Time spent encoding and decoding @cache values",
+    ["prefix", "operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "news_db_query_seconds",
+    "Database statement execution time",
+    ["database", "statement"],
+    buckets=FAST_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "news_http_request_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+)
+ENRICHMENT_PAGES = Counter(
+    "news_enrichment_pages_total",
+    "Article pages looked up for enrichment, by outcome (cached, fetched, not_modified, no_text, blocked, failed)",
+    ["outcome"],
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "news_event_loop_lag_seconds",
+    "How late the event loop ran a timer; sustained lag means something blocks the loop",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENT_LOOP_STALLS = Counter(
+    "news_event_loop_stalls_total",
+    "Times the event loop was blocked past LOOP_BLOCKED_THRESHOLD_MS",
+)
+
+_STATEMENT_TYPES = {"select", "insert", "update", "delete"}
+
+
+def record_provider_fetch(provider: str, country: str, seconds: float, articles: int, failed: bool = False):
+    PROVIDER_FETCH_SECONDS.labels(provider, country, "error" if failed else "ok").observe(seconds)
+    if articles:
+        PROVIDER_ARTICLES.labels(provider, country).inc(articles)
+
+
+def record_dedup(stage: str, before: int, after: int):
+    if before > after:
+        ARTICLES_DEDUPLICATED.labels(stage).inc(before - after)
+
+
+def instrument_engine(engine, database: str):
+    """Time every statement run on a (sync) SQLAlchemy engine; pass engine.sync_engine for async engines"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        DB_QUERY_SECONDS.labels(database, keyword if keyword in _STATEMENT_TYPES else "other").observe(
+            time.perf_counter() - started
+        )
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def render_metrics() -> bytes:
+    """Exposition text for /metrics; aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+class MetricsMiddleware:
+    """Observes every HTTP request under its route template (e.g. /api/news/country/{country_code})"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the shared scope; raw paths would explode cardinality
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status or 500)).observe(
+                time.perf_counter() - started
+            )
+
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.responses import Response
+
+from utils.dates import date_normalizer
+
+# Fields of ArticleResponse and the value used when a record lacks them
+ARTICLE_DEFAULTS: Dict[str, Any] = {
+    "id": None,
+    "title": "",
+    "content": "",
+    "url": "",
+    "published_at": None,
+    "topic": None,
+    "summary": None,
+    "source_name": "Unknown Source",
+    "source_bias_score": None,
+    "is_indian": False,
+    "api_source": None,
+}
+
+# Fields that are required strings in ArticleResponse, so None must not leak out
+REQUIRED_STRING_FIELDS = ("title", "content", "url", "source_name")
+
+
+def json_datetime(value: Any) -> Optional[str]:
+    """ISO 8601 the way Pydantic serializes a datetime field (UTC written as 'Z').
+
+    Provider and feed strings (RFC 822, '+0000' offsets, bare dates) are parsed
+    first, so every response carries the same format whatever the source used.
+    """
+    if not value:
+        return None
+    if not isinstance(value, datetime):
+        value = date_normalizer.parse(value)
+        if value is None:
+            return None
+    text = value.isoformat()
+    return f"{text[:-6]}Z" if text.endswith("+00:00") else text
+
+
+def article_record(article: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    """Shape a trusted article dict like ArticleResponse without Pydantic validation
+
+    Args:
+        article: Article built by our own services (DB rows, formatted provider data)
+        extra: Additional fields for ArticleResponse subclasses, e.g. similarity
+
+    Returns:
+        A plain dict ready for orjson
+    """
+    record = {field: article.get(field, default) for field, default in ARTICLE_DEFAULTS.items()}
+    for field in REQUIRED_STRING_FIELDS:
+        if record[field] is None:
+            record[field] = ARTICLE_DEFAULTS[field]
+    record["published_at"] = json_datetime(record["published_at"])
+    record.update(extra)
+    return record
+
+
+def article_records(articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [article_record(article) for article in articles]
+
+
+class RawJSONResponse(Response):
+    """Response for a body that was serialized ahead of time (e.g. feed snapshots)"""
+
+    media_type = "application/json"
+
+    def __init__(self, body: bytes, status_code: int = 200, headers: Dict[str, str] = None):
+        super().__init__(content=body, status_code=status_code, headers=headers)
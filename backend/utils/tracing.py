@@ -0,0 +1,188 @@
+import contextlib
+import logging
+import sys
+from typing import Any, Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import Config
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind
+    OTEL_AVAILABLE = True
+except ImportError:
+    propagate = trace = SpanKind = None
+    OTEL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "news-platform"
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off, so call sites never need to check"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Set by configure_tracing(); None means tracing is off
+_tracer = None
+_provider = None
+
+
+def tracing_requested() -> bool:
+    return Config.TRACING_EXPORTER != "none" and OTEL_AVAILABLE
+
+
+def configure_tracing() -> bool:
+    """Install a tracer provider for TRACING_EXPORTER; returns False when tracing stays off"""
+    global _tracer, _provider
+    exporter_name = Config.TRACING_EXPORTER
+    if exporter_name == "none" or _tracer is not None:
+        return _tracer is not None
+    if not OTEL_AVAILABLE:
+        logger.warning(f"TRACING_EXPORTER={exporter_name} but opentelemetry is not installed; tracing is off")
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=Config.TRACING_OTLP_ENDPOINT)
+    elif exporter_name in ("file", "console"):
+        # One JSON object per line, so the file can be tailed and grepped
+        out = open(Config.TRACING_FILE, "a") if exporter_name == "file" else sys.stdout
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    else:
+        logger.warning(f"Unknown TRACING_EXPORTER '{exporter_name}'; tracing is off")
+        return False
+
+    # Sampled at the root only; child spans and downstream services follow the root's decision
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": Config.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(Config.TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer(TRACER_NAME)
+    logger.info(f"Tracing to {exporter_name}, sampling {Config.TRACING_SAMPLE_RATIO:.0%} of traces")
+    return True
+
+
+def shutdown_tracing():
+    """Flush spans still buffered in the batch processor"""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Run the block in a child span of the current one; a no-op span when tracing is off (None attributes are dropped)"""
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+def current_span() -> Any:
+    if _tracer is None:
+        return NOOP_SPAN
+    return trace.get_current_span()
+
+
+def set_attributes(target: Any, **attributes: Any):
+    for key, value in _attributes(attributes).items():
+        target.set_attribute(key, value)
+
+
+def _attributes(attributes: dict) -> dict:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def trace_engine(engine, database: str):
+    """Span every statement run on a (sync) SQLAlchemy engine; pass engine.sync_engine for async engines"""
+    if not tracing_requested():
+        return
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None or context is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "QUERY"
+        context._trace_span = _tracer.start_span(f"db {operation}", kind=SpanKind.CLIENT, attributes={
+            "db.system": conn.dialect.name,
+            "db.name": database,
+            "db.operation": operation,
+            "db.statement": statement[:Config.TRACING_MAX_STATEMENT_LENGTH],
+        })
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, "_trace_span", None)
+        if current is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                current.set_attribute("db.rows", cursor.rowcount)
+            current.end()
+
+    def handle_error(exception_context):
+        current = getattr(exception_context.execution_context, "_trace_span", None)
+        if current is not None:
+            current.record_exception(exception_context.original_exception)
+            current.end()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+class TracingMiddleware:
+    """Opens a server span per HTTP request, continuing the caller's trace from its traceparent header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        method = scope["method"]
+        status: Optional[int] = None
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.target": scope["path"]},
+        ) as current:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    # Named after the route template so traces group like the metrics do
+                    current.update_name(f"{method} {route}")
+                    current.set_attribute("http.route", route)
+                current.set_attribute("http.status_code", status or 500)
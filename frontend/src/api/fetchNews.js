@@ -42,3 +42,27 @@ export const fetchFromAPI = async (endpoint, options = {}) => {
     throw error;
   }
 };
+
+// Subscribe to newly ingested articles over Server-Sent Events.
+// EventSource reconnects on its own and resumes from the last event id.
+// Returns a function that closes the stream.
+export const subscribeToLiveNews = ({ country, topic, source } = {}, onArticle) => {
+  const params = new URLSearchParams();
+  if (country) params.append('country', country);
+  if (topic) params.append('topic', topic);
+  if (source) params.append('source', source);
+
+  const eventSource = new EventSource(`${BACKEND_URL}/api/news/stream?${params.toString()}`);
+  eventSource.addEventListener('article', (event) => {
+    try {
+      onArticle(JSON.parse(event.data));
+    } catch (error) {
+      console.error('Error parsing live article:', error);
+    }
+  });
+  eventSource.onerror = (error) => {
+    console.error('Live news stream error, reconnecting:', error);
+  };
+
+  return () => eventSource.close();
+};
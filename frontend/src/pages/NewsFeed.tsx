@@ -8,7 +8,7 @@ import {
 } from '@heroicons/react/24/outline';
 import toast from 'react-hot-toast';
 import { format } from 'date-fns';
-import { fetchFromAPI } from '../api/fetchNews';
+import { fetchFromAPI, subscribeToLiveNews } from '../api/fetchNews';
 
 interface Article {
   id?: number;
@@ -42,6 +42,19 @@ const NewsFeed: React.FC = () => {
     loadNews();
   }, [selectedTopic, focusIndian]); // Added focusIndian to dependencies
 
+  // Prepend newly ingested articles pushed by the backend instead of re-polling the feed
+  useEffect(() => {
+    const unsubscribe = subscribeToLiveNews(
+      { country: focusIndian ? 'in' : undefined },
+      (article: Article) => {
+        setArticles(current =>
+          current.some(existing => existing.url === article.url) ? current : [article, ...current]
+        );
+      }
+    );
+    return unsubscribe;
+  }, [focusIndian]);
+
   const loadNews = async () => {
     try {
       setLoading(true);